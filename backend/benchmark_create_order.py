@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+BESTELL-LATENZ BENCHMARK
+
+Misst die Latenz von POST /api/orders gegen eine laufende Instanz und schlägt fehl
+(Exit-Code 1), wenn das p95 das Latenzbudget (ORDER_LATENCY_BUDGET_MS) überschreitet.
+
+Legt einen Benchmark-Mitarbeiter an, bestellt wiederholt ein Getränk, storniert die
+Bestellungen wieder und löscht den Mitarbeiter. Nur gegen Test-/Staging-Instanzen ausführen.
+
+    python benchmark_create_order.py --url http://localhost:8001 --department fw4abteilung1 -n 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latenz von POST /api/orders messen")
+    parser.add_argument("--url", default=os.environ.get("REACT_APP_BACKEND_URL", "http://localhost:8001"))
+    parser.add_argument("--department", default="fw4abteilung1")
+    parser.add_argument("-n", "--orders", type=int, default=100)
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("ORDER_LATENCY_BUDGET_MS", "150")))
+    args = parser.parse_args()
+
+    api = f"{args.url.rstrip('/')}/api"
+    session = requests.Session()
+
+    drinks = session.get(f"{api}/menu/drinks/{args.department}").json()
+    if not drinks:
+        print(f"❌ Keine Getränke in {args.department} gefunden")
+        return 1
+
+    employee = session.post(f"{api}/employees", json={
+        "name": f"Benchmark {int(time.time())}",
+        "department_id": args.department
+    }).json()
+    print(f"🔄 {args.orders} Bestellungen für {employee['name']} in {args.department}")
+
+    latencies = []
+    order_ids = []
+    try:
+        for _ in range(args.orders):
+            started = time.perf_counter()
+            response = session.post(f"{api}/orders", json={
+                "employee_id": employee["id"],
+                "department_id": args.department,
+                "order_type": "drinks",
+                "drink_items": {drinks[0]["id"]: 1}
+            })
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+            order_ids.append(response.json()["id"])
+    finally:
+        for order_id in order_ids:
+            session.delete(f"{api}/employee/{employee['id']}/orders/{order_id}")
+        session.delete(f"{api}/department-admin/employees/{employee['id']}")
+
+    p50 = statistics.median(latencies)
+    p95 = percentile(latencies, 0.95)
+    print(f"📊 p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {max(latencies):.1f} ms (Budget {args.budget_ms:.0f} ms)")
+    if p95 > args.budget_ms:
+        print("❌ Latenzbudget überschritten")
+        return 1
+    print("✅ Innerhalb des Latenzbudgets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+PREISBERECHNUNG
+
+Pure pricing of orders against a department's prices - no database access. Every
+endpoint that prices breakfast items (placing, editing, repricing, sponsoring, history,
+profile) goes through this module, so all of them apply the same rules:
+
+- rolls are priced per half (new format white/seeded halves, old format roll_type/roll_halves)
+- every topping is priced individually (usually 0.00 €)
+- boiled and fried eggs per piece, coffee as a daily flat rate per item
+- lunch once per order, at the lunch price of the order
+
+Unit prices are converted to integer cents once per call (see unit_prices), pricing a
+list of orders is then plain integer arithmetic in a single pass over the orders.
+"""
+
+import math
+
+# Components of a breakfast order, in display order
+COMPONENTS = ("rolls", "toppings", "boiled_eggs", "fried_eggs", "coffee", "lunch")
+
+# What a sponsor pays for per meal type - coffee is never sponsored
+SPONSORED_COMPONENTS = {
+    "breakfast": ("rolls", "toppings", "boiled_eggs", "fried_eggs"),
+    "lunch": ("lunch",)
+}
+
+
+def to_cents(amount):
+    """Euro amount -> integer cents (rounded half up); None, NaN and inf count as 0"""
+    if amount is None:
+        return 0
+    amount = float(amount)
+    if math.isnan(amount) or math.isinf(amount):
+        return 0
+    # The epsilon absorbs binary float noise like 2.675 * 100 = 267.49999999999997
+    cents = int(math.floor(abs(amount) * 100 + 0.5 + 1e-6))
+    return -cents if amount < 0 else cents
+
+
+def from_cents(cents):
+    """Integer cents -> euro amount, avoids -0.00"""
+    if not cents:
+        return 0.0
+    return int(round(cents)) / 100
+
+
+class UnitPrices:
+    """Unit prices of a department in integer cents"""
+
+    def __init__(self, roll_prices, topping_prices, boiled_eggs_price, fried_eggs_price, coffee_price):
+        self.rolls = {roll_type: to_cents(price) for roll_type, price in roll_prices.items()}
+        self.toppings = {topping: to_cents(price) for topping, price in topping_prices.items()}
+        self.boiled_eggs = to_cents(boiled_eggs_price)
+        self.fried_eggs = to_cents(fried_eggs_price)
+        self.coffee = to_cents(coffee_price)
+
+    def roll(self, roll_type):
+        return self.rolls.get(roll_type, 0)
+
+
+def unit_prices(price_book, changes=None):
+    """UnitPrices of a price book, optionally with price changes applied
+
+    changes: {"rolls": {roll_type: price}, "toppings": {topping_type: price},
+    "boiled_eggs_price", "fried_eggs_price", "coffee_price"} - only what changes.
+    """
+    changes = changes or {}
+    return UnitPrices(
+        {**price_book.breakfast_prices, **changes.get("rolls", {})},
+        {**price_book.topping_prices, **changes.get("toppings", {})},
+        changes.get("boiled_eggs_price", price_book.boiled_eggs_price),
+        changes.get("fried_eggs_price", price_book.fried_eggs_price),
+        changes.get("coffee_price", price_book.coffee_price)
+    )
+
+
+def roll_halves(item):
+    """(white_halves, seeded_halves) of a stored breakfast item, old format included"""
+    if "total_halves" in item or "roll_type" not in item:
+        return item.get("white_halves", 0), item.get("seeded_halves", 0)
+    halves = item.get("roll_halves", item.get("roll_count", 1))
+    return (halves, 0) if item["roll_type"] == "weiss" else (0, halves)
+
+
+def price_items(items, prices, lunch_price=0.0):
+    """Breakdown of breakfast items in cents: {component: cents, ..., "total": cents}
+
+    items are dicts as stored on orders. Lunch is charged once, even if several items
+    have it. Old format items (roll_type) are priced with their own roll type (see roll_halves).
+    """
+    breakdown = dict.fromkeys(COMPONENTS, 0)
+    has_lunch = False
+    for item in items or []:
+        white_halves, seeded_halves = roll_halves(item)
+        breakdown["rolls"] += prices.roll("weiss") * white_halves + prices.roll("koerner") * seeded_halves
+        for topping in item.get("toppings", []):
+            breakdown["toppings"] += prices.toppings.get(topping, 0)
+        breakdown["boiled_eggs"] += prices.boiled_eggs * item.get("boiled_eggs", 0)
+        breakdown["fried_eggs"] += prices.fried_eggs * item.get("fried_eggs", 0)
+        if item.get("has_coffee"):
+            breakdown["coffee"] += prices.coffee
+        has_lunch = has_lunch or bool(item.get("has_lunch"))
+    if has_lunch:
+        breakdown["lunch"] = to_cents(lunch_price)
+    breakdown["total"] = sum(breakdown[component] for component in COMPONENTS)
+    return breakdown
+
+
+def price_orders(orders, prices, lunch_price=None):
+    """Breakdowns of many breakfast orders (API shape, euro amounts) in one pass, in order of the input
+
+    lunch_price None prices lunch at the price stored on each order. Orders from before
+    lunch_price was stored charge the remainder of their total_price as lunch.
+    """
+    breakdowns = []
+    for order in orders:
+        if lunch_price is not None:
+            breakdowns.append(price_items(order.get("breakfast_items"), prices, lunch_price))
+            continue
+        breakdown = price_items(order.get("breakfast_items"), prices, order.get("lunch_price") or 0.0)
+        if breakdown["lunch"] == 0 and any(item.get("has_lunch") for item in order.get("breakfast_items") or []):
+            breakdown["lunch"] = max(0, to_cents(order.get("total_price", 0)) - breakdown["total"])
+            breakdown["total"] += breakdown["lunch"]
+        breakdowns.append(breakdown)
+    return breakdowns
+
+
+def price_quantities(quantities, prices):
+    """Cents of drink or sweet quantities ({item_id: quantity}) at {item_id: price}"""
+    return sum(to_cents(prices.get(item_id, 0.0)) * quantity for item_id, quantity in (quantities or {}).items())
+
+
+def sponsored_cents(breakdown, meal_types):
+    """Cents of a breakdown a sponsor covers for one or more meal types ("breakfast", "lunch")"""
+    if isinstance(meal_types, str):
+        meal_types = [meal_type for meal_type in meal_types.split(",") if meal_type]
+    return sum(
+        breakdown[component]
+        for meal_type in meal_types
+        for component in SPONSORED_COMPONENTS.get(meal_type, ())
+    )
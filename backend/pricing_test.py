@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Unit tests of the pure pricing module (no server or database needed)
+
+    python -m pytest -q backend/pricing_test.py
+"""
+
+from pricing import UnitPrices, price_items, price_orders, sponsored_cents
+
+PRICES = UnitPrices({"weiss": 0.50, "koerner": 0.60}, {"ruehrei": 0.0, "lachs": 0.75}, 0.50, 0.80, 1.50)
+
+
+def test_price_items_new_format():
+    items = [{
+        "total_halves": 3, "white_halves": 2, "seeded_halves": 1,
+        "toppings": ["ruehrei", "lachs", "lachs"], "boiled_eggs": 2, "fried_eggs": 1,
+        "has_coffee": True, "has_lunch": True
+    }]
+    breakdown = price_items(items, PRICES, lunch_price=4.25)
+    assert breakdown == {
+        "rolls": 160, "toppings": 150, "boiled_eggs": 100, "fried_eggs": 80,
+        "coffee": 150, "lunch": 425, "total": 1065
+    }
+
+
+def test_price_items_old_format_and_lunch_once():
+    items = [
+        {"roll_type": "koerner", "roll_halves": 2, "toppings": [], "has_lunch": True},
+        {"roll_type": "weiss", "roll_count": 1, "toppings": [], "has_lunch": True}
+    ]
+    breakdown = price_items(items, PRICES, lunch_price=5.0)
+    assert breakdown["rolls"] == 2 * 60 + 50
+    assert breakdown["lunch"] == 500
+    assert breakdown["total"] == 670
+
+
+def test_price_orders_uses_stored_lunch_price():
+    order = {"breakfast_items": [{"white_halves": 2, "seeded_halves": 0, "has_lunch": True}], "lunch_price": 3.5}
+    assert price_orders([order], PRICES)[0]["lunch"] == 350
+    assert price_orders([order], PRICES, lunch_price=4.0)[0]["lunch"] == 400
+
+
+def test_price_orders_legacy_lunch_remainder():
+    # Orders from before lunch_price was stored: lunch is whatever the total has on top of the items
+    order = {"breakfast_items": [{"white_halves": 2, "seeded_halves": 0, "has_lunch": True}], "total_price": 5.0}
+    breakdown = price_orders([order], PRICES)[0]
+    assert breakdown["rolls"] == 100
+    assert breakdown["lunch"] == 400
+    assert breakdown["total"] == 500
+
+
+def test_sponsored_cents_excludes_coffee():
+    breakdown = price_items(
+        [{"white_halves": 1, "seeded_halves": 1, "boiled_eggs": 1, "has_coffee": True, "has_lunch": True}],
+        PRICES, lunch_price=4.0
+    )
+    assert sponsored_cents(breakdown, "breakfast") == 50 + 60 + 50
+    assert sponsored_cents(breakdown, "lunch") == 400
+    assert sponsored_cents(breakdown, "breakfast,lunch") == 560
+    assert sponsored_cents(breakdown, "") == 0
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+SALDO-ABGLEICH
+
+Berechnet alle Mitarbeiter-Salden (Haupt- und Subkonten) aus Bestellungen und
+Zahlungen neu und zeigt Abweichungen zum gespeicherten Saldo an.
+
+    python reconcile_balances.py                  # nur Bericht
+    python reconcile_balances.py --apply          # Abweichungen korrigieren
+    python reconcile_balances.py --department ID  # nur Mitarbeiter einer Abteilung
+"""
+
+import argparse
+import asyncio
+
+from server import client, reconcile_balances
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Salden aus Bestellungen und Zahlungen neu berechnen")
+    parser.add_argument("--apply", action="store_true", help="Abweichungen korrigieren (sonst nur Bericht)")
+    parser.add_argument("--department", help="Nur Mitarbeiter dieser Abteilung prüfen")
+    args = parser.parse_args()
+
+    try:
+        result = await reconcile_balances(apply=args.apply, department_id=args.department)
+    finally:
+        client.close()
+
+    for drift in result["drifts"]:
+        reasons = []
+        if drift["legacy_sponsored_orders"]:
+            reasons.append(f"{drift['legacy_sponsored_orders']} alte Sponsoring-Bestellungen")
+        if drift["manual_ledger_changes"]:
+            reasons.append(f"{drift['manual_ledger_changes']} manuelle Saldo-Änderungen")
+        marker = "" if drift["verifiable"] else f"  (nicht prüfbar: {', '.join(reasons)})"
+        print(f"⚠️  {drift['employee_name']} ({drift['employee_id']}){marker}")
+        for difference in drift["differences"]:
+            print(
+                f"    {difference['path']}: gespeichert {difference['stored']:.2f} €, "
+                f"erwartet {difference['expected']:.2f} €, Differenz {difference['difference']:+.2f} €"
+            )
+
+    print(f"\n📊 {result['employees_checked']} Mitarbeiter in {result['departments']} Abteilungen geprüft "
+          f"({result['duration_seconds']:.2f}s)")
+    print(f"   Abweichungen: {result['employees_with_drift']} Mitarbeiter, gesamt {result['total_drift']:.2f} €")
+    print(f"   Nicht prüfbar: {result['unverifiable_employees']}, 8H-Dienst übersprungen: {result['skipped_8h_service']}")
+    if result["ledger_gaps"]:
+        print(f"   Ledger-Lücken: {result['ledger_gaps']} bei {len(result['employees_with_ledger_gaps'])} Mitarbeitern, "
+              f"repariert: {result['ledger_gaps_repaired']}")
+    if args.apply:
+        print(f"✅ {result['corrected_employees']} Salden korrigiert")
+        if result["changed_while_checking"]:
+            print(f"   {result['changed_while_checking']} während der Prüfung geändert - beim nächsten Lauf erneut prüfen")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,21 +1,33 @@
-from decimal import Decimal, ROUND_HALF_UP
-from fastapi import FastAPI, APIRouter, HTTPException, status
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
+import json
+import gzip
+import hashlib
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 import uuid
+import time
+import asyncio
+from collections import deque
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 import pytz
 import zoneinfo
 
+from pricing import (
+    from_cents, price_items, price_orders, price_quantities, roll_halves, sponsored_cents, to_cents, unit_prices
+)
+
 # Berlin timezone
 BERLIN_TZ = pytz.timezone('Europe/Berlin')
 
@@ -24,120 +36,962 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
+# Storage mode for timestamps:
+#   "iso"    - legacy, datetimes are stored as ISO strings
+#   "dual"   - rollout, new values are native BSON dates, queries match both representations
+#   "native" - all values are native BSON dates (after /api/admin/migrate-datetimes)
+DATETIME_STORAGE = os.environ.get('DATETIME_STORAGE', 'iso').lower()
+if DATETIME_STORAGE not in ("iso", "dual", "native"):
+    raise ValueError(f"Invalid DATETIME_STORAGE '{DATETIME_STORAGE}', use iso, dual or native")
+DATETIME_FIELDS = ("timestamp", "cancelled_at", "closed_at", "expires_at")
+
 # Create the main app without a prefix
 app = FastAPI()
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Money representation - balances, payment amounts, order totals and all prices are stored
+# as integer cents (<field>_cents), the API keeps speaking euros (floats). Conversion happens
+# at the edge (*_to_storage / *_to_api), arithmetic on stored amounts is plain integer math.
+# to_cents/from_cents live in pricing.py.
+
 # Helper functions for Balance Management
 def round_to_cents(amount):
     """Round amount to exactly 2 decimal places and avoid -0.00"""
-    if amount is None:
-        return 0.0
-    
-    # Use Decimal for precise rounding to avoid floating-point issues
-    # Convert to Decimal and round to 2 decimal places using ROUND_HALF_UP
-    decimal_amount = Decimal(str(float(amount)))
-    rounded = float(decimal_amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
-    
-    # Avoid -0.00 display
-    return 0.0 if rounded == -0.0 else rounded
+    return from_cents(to_cents(amount))
+
+def cents_field(field):
+    """Storage name of a money field (stored as integer cents)"""
+    return f"{field}_cents"
+
+MAIN_BALANCE_FIELDS = ("breakfast_balance", "drinks_sweets_balance")
+SUBACCOUNT_ACCOUNTS = ("breakfast", "drinks")
+PAYMENT_MONEY_FIELDS = ("amount", "balance_before", "balance_after")
+ORDER_MONEY_FIELDS = ("total_price", "lunch_price", "sponsored_amount", "sponsor_total_cost")
+MENU_MONEY_FIELDS = ("price",)
+# department_settings, lunch_settings and daily_lunch_prices
+PRICE_SETTINGS_MONEY_FIELDS = ("price", "lunch_price", "boiled_eggs_price", "fried_eggs_price", "coffee_price")
+
+def stored_cents(document, field):
+    """Cents value of a money field; a legacy euro value (not migrated yet) is folded in"""
+    return int(round(document.get(cents_field(field)) or 0)) + to_cents(document.get(field))
 
 # Helper functions for Multi-Department Balance Management
+def default_subaccount_balances():
+    """Subaccounts for all 4 departments, all balances at 0 (storage shape)"""
+    return {
+        department_id: {cents_field(account): 0 for account in SUBACCOUNT_ACCOUNTS}
+        for department_id in ("fw4abteilung1", "fw4abteilung2", "fw4abteilung3", "fw4abteilung4")
+    }
+
 def initialize_subaccount_balances(employee_data):
     """Initialize subaccount_balances for new employees or existing ones without it"""
     if not employee_data.get('subaccount_balances'):
-        # Initialize with all 4 departments, all balances at 0.0
+        employee_data['subaccount_balances'] = default_subaccount_balances()
+    return employee_data
+
+def employee_to_storage(employee_data):
+    """API/model shape -> storage shape: euro balances become integer cent fields"""
+    employee_data = dict(employee_data)
+    for field in MAIN_BALANCE_FIELDS:
+        employee_data[cents_field(field)] = stored_cents(employee_data, field)
+        employee_data.pop(field, None)
+    if employee_data.get('subaccount_balances'):
         employee_data['subaccount_balances'] = {
-            "fw4abteilung1": {"breakfast": 0.0, "drinks": 0.0},
-            "fw4abteilung2": {"breakfast": 0.0, "drinks": 0.0}, 
-            "fw4abteilung3": {"breakfast": 0.0, "drinks": 0.0},
-            "fw4abteilung4": {"breakfast": 0.0, "drinks": 0.0}
+            department_id: {cents_field(account): stored_cents(balances, account) for account in SUBACCOUNT_ACCOUNTS}
+            for department_id, balances in employee_data['subaccount_balances'].items()
         }
     return employee_data
 
+def employee_to_api(employee_data):
+    """Storage shape -> API shape: balances in euros, subaccounts as {"breakfast": ..., "drinks": ...}"""
+    employee_data = {k: v for k, v in employee_data.items() if k != '_id'}
+    for field in MAIN_BALANCE_FIELDS:
+        employee_data[field] = from_cents(stored_cents(employee_data, field))
+        employee_data.pop(cents_field(field), None)
+    employee_data['subaccount_balances'] = {
+        department_id: {account: from_cents(stored_cents(balances, account)) for account in SUBACCOUNT_ACCOUNTS}
+        for department_id, balances in (employee_data.get('subaccount_balances') or default_subaccount_balances()).items()
+    }
+    return employee_data
+
+def payment_log_to_storage(payment_data):
+    """PaymentLog dict -> storage shape with integer cent amounts"""
+    payment_data = dict(payment_data)
+    for field in PAYMENT_MONEY_FIELDS:
+        if payment_data.get(field) is not None:
+            payment_data[cents_field(field)] = to_cents(payment_data[field])
+        payment_data.pop(field, None)
+    return payment_data
+
+def payment_log_to_api(payment_data):
+    """Stored payment log -> API shape with euro amounts"""
+    payment_data = {k: v for k, v in payment_data.items() if k != '_id'}
+    for field in PAYMENT_MONEY_FIELDS:
+        if cents_field(field) in payment_data or payment_data.get(field) is not None:
+            payment_data[field] = from_cents(stored_cents(payment_data, field))
+        else:
+            payment_data[field] = None
+        payment_data.pop(cents_field(field), None)
+    return payment_data
+
+def money_to_storage(data, fields):
+    """API/model shape -> storage shape: the given euro fields become integer cent fields"""
+    data = dict(data)
+    for field in fields:
+        if field in data:
+            value = data.pop(field)
+            data[cents_field(field)] = None if value is None else to_cents(value)
+    return data
+
+def money_to_api(data, fields):
+    """Storage shape -> API shape: cent fields (and legacy euro fields) of the given fields become euros
+
+    Fields the document doesn't have stay absent, a stored None stays None.
+    """
+    data = {k: v for k, v in data.items() if k != '_id'}
+    for field in fields:
+        if cents_field(field) in data or field in data:
+            if data.get(cents_field(field)) is None and data.get(field) is None:
+                data[field] = None
+            else:
+                data[field] = from_cents(stored_cents(data, field))
+            data.pop(cents_field(field), None)
+    return data
+
+def money_update(values, fields, extra_fields=None):
+    """$set update for euro values of money fields; legacy euro fields are dropped in the same update"""
+    update = {"$set": {**money_to_storage(values, fields), **(extra_fields or {})}}
+    legacy_fields = {field: "" for field in fields if field in values}
+    if legacy_fields:
+        update["$unset"] = legacy_fields
+    return update
+
+def stored_euros(document, field):
+    """Euro value of a stored money field (0.0 if missing)"""
+    return from_cents(stored_cents(document, field))
+
+def order_to_storage(order_data):
+    return money_to_storage(order_data, ORDER_MONEY_FIELDS)
+
+def order_to_api(order_data):
+    return money_to_api(order_data, ORDER_MONEY_FIELDS)
+
+def menu_item_to_storage(item_data):
+    return money_to_storage(item_data, MENU_MONEY_FIELDS)
+
+def menu_item_to_api(item_data):
+    return money_to_api(item_data, MENU_MONEY_FIELDS)
+
+def price_settings_to_storage(settings_data):
+    return money_to_storage(settings_data, PRICE_SETTINGS_MONEY_FIELDS)
+
+def price_settings_to_api(settings_data):
+    return money_to_api(settings_data, PRICE_SETTINGS_MONEY_FIELDS)
+
 def get_employee_balance(employee_data, department_id, balance_type):
-    """Get balance for specific department and type, with fallback to main balances"""
-    # Ensure subaccount_balances exists
-    employee_data = initialize_subaccount_balances(employee_data)
+    """Get balance (euros) for specific department and type, with fallback to main balances"""
+    account = 'breakfast' if balance_type == 'breakfast' else 'drinks'
     
     # For main department, use main balance fields (RÜCKWÄRTSKOMPATIBILITÄT)
     if department_id == employee_data.get('department_id'):
-        if balance_type == 'breakfast':
-            return employee_data.get('breakfast_balance', 0.0)
-        elif balance_type in ['drinks', 'drinks_sweets']:
-            return employee_data.get('drinks_sweets_balance', 0.0)
+        return from_cents(stored_cents(employee_data, 'breakfast_balance' if account == 'breakfast' else 'drinks_sweets_balance'))
     
     # For other departments, use subaccount balances
-    subaccounts = employee_data.get('subaccount_balances', {})
-    dept_balances = subaccounts.get(department_id, {"breakfast": 0.0, "drinks": 0.0})
-    
-    if balance_type == 'breakfast':
-        return dept_balances.get('breakfast', 0.0)
-    elif balance_type in ['drinks', 'drinks_sweets']:
-        return dept_balances.get('drinks', 0.0)
-    
-    return 0.0
+    subaccounts = employee_data.get('subaccount_balances') or {}
+    return from_cents(stored_cents(subaccounts.get(department_id) or {}, account))
 
-async def update_employee_balance(employee_id, department_id, balance_type, amount_change):
-    """Update employee balance for specific department and type
-    
-    For 8H-Service employees: ALWAYS use subaccount balances, never main balances
-    For normal employees: Use main balance for home department, subaccounts for others
+def balance_field_paths(employee, department_id, balance_type):
+    """Cent field paths a balance change for department/type has to be written to
+
+    For 8H-Service employees: ALWAYS subaccount balances, never main balances
+    For normal employees: main balance for home department (mirrored into the subaccount), subaccounts for others
     """
-    employee = await db.employees.find_one({"id": employee_id})
-    if not employee:
-        raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
-    
-    # Initialize subaccounts if not exists
-    employee = initialize_subaccount_balances(employee)
-    
-    # CRITICAL: 8H-Service employees ALWAYS use subaccounts, never main balances
-    is_8h_service = employee.get('is_8h_service', False)
-    
-    # For main department AND not 8H-service, update main balance fields (RÜCKWÄRTSKOMPATIBILITÄT)
-    if department_id == employee.get('department_id') and not is_8h_service:
-        update_fields = {}
-        if balance_type == 'breakfast':
-            new_balance = round_to_cents(employee.get('breakfast_balance', 0.0) + amount_change)
-            update_fields['breakfast_balance'] = new_balance
-            # Also update subaccount for consistency
-            employee['subaccount_balances'][department_id]['breakfast'] = new_balance
-        elif balance_type in ['drinks', 'drinks_sweets']:
-            new_balance = round_to_cents(employee.get('drinks_sweets_balance', 0.0) + amount_change)
-            update_fields['drinks_sweets_balance'] = new_balance  
-            # Also update subaccount for consistency
-            employee['subaccount_balances'][department_id]['drinks'] = new_balance
-        
-        update_fields['subaccount_balances'] = employee['subaccount_balances']
-        
+    account = 'breakfast' if balance_type == 'breakfast' else 'drinks'
+    paths = [f"subaccount_balances.{department_id}.{cents_field(account)}"]
+    if department_id == employee.get('department_id') and not employee.get('is_8h_service', False):
+        paths.insert(0, cents_field('breakfast_balance' if account == 'breakfast' else 'drinks_sweets_balance'))
+    return paths
+
+def balance_increments(employee, department_id, balance_type, amount_change):
+    """$inc document (integer cents) for a balance change in euros, see balance_field_paths"""
+    cents = to_cents(amount_change)
+    return {path: cents for path in balance_field_paths(employee, department_id, balance_type)}
+
+def merge_increments(*increments):
+    """Sum several $inc documents into one"""
+    merged = {}
+    for increment in increments:
+        for path, amount in increment.items():
+            merged[path] = merged.get(path, 0) + amount
+    return merged
+
+# ===== BALANCE LEDGER =====
+# Every balance change is also written to ledger_entries as {path: cents} deltas, numbered
+# per employee by ledger_seq (incremented in the same update as the balance itself).
+# ledger_snapshots hold all balances at a given seq - one opening snapshot per employee
+# and one every LEDGER_SNAPSHOT_INTERVAL entries. The employee document stays the O(1)
+# materialized balance, the ledger answers "what was the balance at time X".
+# The entry is inserted after the balance update, so a crash in between leaves a seq
+# without entry. Reconciliation finds those gaps (find_ledger_gaps) and repairs them.
+LEDGER_SNAPSHOT_INTERVAL = max(1, int(os.environ.get('LEDGER_SNAPSHOT_INTERVAL', '50')))
+LEDGER_GAP_KIND = "gap"
+
+def get_path(document, path, default=None):
+    """Value at a dotted path of a (nested) document"""
+    for part in path.split("."):
+        if not isinstance(document, dict) or part not in document:
+            return default
+        document = document[part]
+    return document
+
+def ledger_balances(employee):
+    """All balance cent paths of a stored employee document as {path: cents}"""
+    balances = {cents_field(field): stored_cents(employee, field) for field in MAIN_BALANCE_FIELDS}
+    for department_id, dept_balances in (employee.get("subaccount_balances") or {}).items():
+        for account in SUBACCOUNT_ACCOUNTS:
+            balances[f"subaccount_balances.{department_id}.{cents_field(account)}"] = stored_cents(dept_balances or {}, account)
+    return balances
+
+def ledger_changes_list(changes):
+    """{path: cents} -> [{"path": ..., "cents": ...}] (dotted paths can't be stored as keys)"""
+    return [{"path": path, "cents": cents} for path, cents in changes.items() if cents]
+
+async def write_ledger_snapshot(employee_id, seq, balances, kind="interval"):
+    """Store all balances ({path: cents}) of an employee as of ledger entry seq"""
+    await db.ledger_snapshots.replace_one(
+        {"employee_id": employee_id, "seq": seq},
+        {
+            "employee_id": employee_id,
+            "seq": seq,
+            "kind": kind,
+            "timestamp": to_mongo_datetime(datetime.now(timezone.utc)),
+            "balances": ledger_changes_list(balances)
+        },
+        upsert=True
+    )
+
+async def write_opening_snapshot(employee):
+    """Snapshot of a stored employee document at its current ledger_seq"""
+    await write_ledger_snapshot(employee["id"], employee.get("ledger_seq", 0), ledger_balances(employee), kind="opening")
+
+def ledger_entry_document(employee_id, seq, changes, kind, reference_id=None):
+    """ledger_entries document for the update that incremented ledger_seq to seq"""
+    return {
+        "id": str(uuid.uuid4()),
+        "employee_id": employee_id,
+        "seq": seq,
+        "kind": kind,
+        "reference_id": reference_id,
+        "timestamp": to_mongo_datetime(datetime.now(timezone.utc)),
+        "changes": ledger_changes_list(changes)
+    }
+
+async def record_ledger_entry(employee_id, seq, changes, kind, reference_id=None, balances_after=None):
+    """Append the entry for an update that already incremented ledger_seq to seq
+
+    balances_after ({path: cents} after the update) is needed for the periodic snapshot.
+    """
+    await insert_ledger_entries([ledger_entry_document(employee_id, seq, changes, kind, reference_id)])
+    invalidate_coalesced("employees-with-subaccount-balances")
+    event_bus.publish(None, "payment_recorded" if kind == "payment" else "balance_changed", employee_ids=[employee_id])
+    if seq % LEDGER_SNAPSHOT_INTERVAL == 0 and balances_after is not None:
+        await write_ledger_snapshot(employee_id, seq, balances_after)
+
+async def insert_ledger_entries(entries):
+    """Insert ledger entries; one whose seq was meanwhile taken by a gap placeholder replaces it"""
+    try:
+        await db.ledger_entries.insert_many(entries, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        for error in errors:
+            entry = entries[error["index"]]
+            result = await db.ledger_entries.replace_one(
+                {"employee_id": entry["employee_id"], "seq": entry["seq"], "kind": LEDGER_GAP_KIND}, entry
+            )
+            if result.matched_count == 0:
+                raise
+
+async def record_ledger_event(employee_id, kind, reference_id=None):
+    """Ledger entry without balance changes, for events reconciliation has to know about"""
+    updated_employee = await db.employees.find_one_and_update(
+        {"id": employee_id},
+        {"$inc": {"ledger_seq": 1}},
+        projection={"_id": 0, "ledger_seq": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if updated_employee:
+        await record_ledger_entry(employee_id, updated_employee["ledger_seq"], {}, kind, reference_id)
+
+async def find_ledger_gaps(employee):
+    """ledger_seq numbers of a stored employee document (needs id, ledger_seq) without an entry
+
+    Only seqs after the opening snapshot count, the ledger starts there.
+    """
+    seq = employee.get("ledger_seq", 0)
+    opening = await db.ledger_snapshots.find_one({"employee_id": employee["id"]}, {"seq": 1}, sort=[("seq", 1)])
+    if not opening or opening["seq"] >= seq:
+        return []
+    seq_range = {"$gt": opening["seq"], "$lte": seq}
+    if await db.ledger_entries.count_documents({"employee_id": employee["id"], "seq": seq_range}) == seq - opening["seq"]:
+        return []
+    existing = set(await db.ledger_entries.distinct("seq", {"employee_id": employee["id"], "seq": seq_range}))
+    return [n for n in range(opening["seq"] + 1, seq + 1) if n not in existing]
+
+async def repair_ledger_gaps(employee, missing_seqs):
+    """Fill the gaps of find_ledger_gaps and re-anchor the ledger on the stored balances
+
+    The lost changes are unknown: every missing seq gets an empty "gap" entry, and a repair
+    snapshot of the balances at the employee's ledger_seq makes later balances exact again.
+    A write whose entry was only late (not lost) replaces its placeholder, see
+    insert_ledger_entries. The employee document must be the one the gaps were found on.
+    """
+    if not missing_seqs:
+        return 0
+    placeholders = [ledger_entry_document(employee["id"], seq, {}, LEDGER_GAP_KIND) for seq in missing_seqs]
+    try:
+        await db.ledger_entries.insert_many(placeholders, ordered=False)
+    except BulkWriteError as e:
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise  # duplicates are entries that arrived meanwhile
+    await write_ledger_snapshot(employee["id"], employee.get("ledger_seq", 0), ledger_balances(employee), kind="repair")
+    return len(missing_seqs)
+
+async def bootstrap_ledger():
+    """Opening snapshot (current balances) for every employee that has no snapshot yet"""
+    covered = set(await db.ledger_snapshots.distinct("employee_id"))
+    created = 0
+    async for employee in db.employees.find({"id": {"$nin": list(covered)}}, {"_id": 0}):
+        await write_opening_snapshot(employee)
+        created += 1
+    return created
+
+async def reset_ledger():
+    """Drop the whole ledger and start over from the current balances (after full resets)"""
+    await db.ledger_entries.delete_many({})
+    await db.ledger_snapshots.delete_many({})
+    invalidate_coalesced("employees-with-subaccount-balances")
+    event_bus.publish(None, "resync")
+    return await bootstrap_ledger()
+
+async def ledger_balance_at(employee_id, at=None):
+    """Balances {path: cents} at a point in time (None = now)
+
+    Latest snapshot at or before `at`, plus the entries after it. None if the ledger has
+    no data for the employee at that time.
+    """
+    snapshot_query = {"employee_id": employee_id}
+    entry_query = {"employee_id": employee_id}
+    if at is not None:
+        snapshot_query.update(datetime_filter("timestamp", lte=to_utc_datetime(at)))
+        entry_query.update(datetime_filter("timestamp", lte=to_utc_datetime(at)))
+    snapshot = await db.ledger_snapshots.find_one(snapshot_query, sort=[("seq", -1)])
+    if not snapshot:
+        return None
+    
+    balances = {balance["path"]: balance["cents"] for balance in snapshot["balances"]}
+    entry_query["seq"] = {"$gt": snapshot["seq"]}
+    async for entry in db.ledger_entries.find(entry_query, {"_id": 0, "changes": 1}).sort("seq", 1):
+        for change in entry["changes"]:
+            balances[change["path"]] = balances.get(change["path"], 0) + change["cents"]
+    return balances
+
+def ledger_balances_to_api(balances):
+    """{path: cents} -> API balance shape (euros), as returned for employees"""
+    document = {}
+    for path, cents in balances.items():
+        target = document
+        *parents, leaf = path.split(".")
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = cents
+    api_balances = employee_to_api(document)
+    return {key: api_balances[key] for key in (*MAIN_BALANCE_FIELDS, "subaccount_balances")}
+
+async def apply_balance_increments(employee_id, increments, employee=None, kind="adjustment", reference_id=None):
+    """Apply a $inc document to an employee with a single atomic update, returns the updated employee"""
+    if not increments:
+        return employee
+    if employee is None or 'subaccount_balances' not in employee:
+        employee = await db.employees.find_one({"id": employee_id}, {"_id": 0, "subaccount_balances": 1})
+        if not employee:
+            raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
+    if employee.get('subaccount_balances') is None:
+        # $inc cannot create paths below a null field - initialize once, guarded against concurrent writers
         await db.employees.update_one(
-            {"id": employee_id},
-            {"$set": update_fields}
+            {"id": employee_id, "subaccount_balances": None},
+            {"$set": {"subaccount_balances": default_subaccount_balances()}}
         )
-    else:
-        # For other departments OR 8H-service employees, only update subaccount balances
-        if balance_type == 'breakfast':
-            employee['subaccount_balances'][department_id]['breakfast'] = round_to_cents(employee['subaccount_balances'][department_id]['breakfast'] + amount_change)
-        elif balance_type in ['drinks', 'drinks_sweets']:
-            employee['subaccount_balances'][department_id]['drinks'] = round_to_cents(employee['subaccount_balances'][department_id]['drinks'] + amount_change)
-            
-        await db.employees.update_one(
+    updated_employee = await db.employees.find_one_and_update(
+        {"id": employee_id},
+        {"$inc": {**increments, "ledger_seq": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated_employee:
+        raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
+    await record_ledger_entry(
+        employee_id, updated_employee.get("ledger_seq", 0), increments, kind, reference_id, ledger_balances(updated_employee)
+    )
+    return updated_employee
+
+async def set_employee_balances(employee_id, values, kind, reference_id=None, extra_fields=None):
+    """Set balance cent paths to absolute values (resets, moves) and record the resulting deltas
+
+    Legacy euro fields of the set paths are dropped in the same update. Returns the
+    employee document as it was before the update.
+    """
+    update = {
+        "$set": {**values, **(extra_fields or {})},
+        "$inc": {"ledger_seq": 1}
+    }
+    legacy_fields = {path[:-len("_cents")]: "" for path in values if path.endswith("_cents")}
+    if legacy_fields:
+        update["$unset"] = legacy_fields
+    previous = await db.employees.find_one_and_update(
+        {"id": employee_id},
+        update,
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not previous:
+        raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
+    previous_balances = ledger_balances(previous)
+    changes = {path: cents - previous_balances.get(path, 0) for path, cents in values.items()}
+    await record_ledger_entry(
+        employee_id, previous.get("ledger_seq", 0) + 1, changes, kind, reference_id, {**previous_balances, **values}
+    )
+    return previous
+
+async def clamp_decrement_employee_balance(employee_id, balance_field, amount, kind, reference_id=None):
+    """Subtract a euro amount from a main balance but never go below 0, evaluated atomically by MongoDB"""
+    field = cents_field(balance_field)
+    cents = to_cents(amount)
+    previous = await db.employees.find_one_and_update(
+        {"id": employee_id},
+        [{"$set": {
+            field: {"$max": [0, {"$subtract": [{"$ifNull": [f"${field}", 0]}, cents]}]},
+            "ledger_seq": {"$add": [{"$ifNull": ["$ledger_seq", 0]}, 1]}
+        }}],
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not previous:
+        return None
+    previous_balances = ledger_balances(previous)
+    after = max(0, int(round(previous.get(field) or 0)) - cents)
+    await record_ledger_entry(
+        employee_id, previous.get("ledger_seq", 0) + 1, {field: after - previous_balances[field]}, kind, reference_id,
+        {**previous_balances, field: after}
+    )
+    return previous
+
+async def update_employee_balance(employee_id, department_id, balance_type, amount_change, employee=None, kind="adjustment", reference_id=None):
+    """Update employee balance for specific department and type
+
+    Written as one atomic $inc on the exact field paths (see balance_field_paths), so
+    concurrent orders and payments never overwrite each other, and recorded in the
+    ledger as kind/reference_id. Pass an already loaded employee document to save the
+    lookup. Returns the updated (stored) employee document.
+    """
+    if employee is None:
+        employee = await db.employees.find_one(
             {"id": employee_id},
-            {"$set": {"subaccount_balances": employee['subaccount_balances']}}
+            {"_id": 0, "department_id": 1, "is_8h_service": 1, "subaccount_balances": 1}
+        )
+        if not employee:
+            raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
+
+    return await apply_balance_increments(
+        employee_id,
+        balance_increments(employee, department_id, balance_type, amount_change),
+        employee,
+        kind,
+        reference_id
+    )
+
+async def apply_bulk_balance_increments(increments_by_employee, kind, reference_ids=None, employees=None, retry_conflicts=True):
+    """Apply {employee_id: $inc document} to many employees with one bulk_write
+
+    Every update is guarded on the ledger_seq read beforehand and tags the document with
+    a batch id, so the ledger entries get their exact seq and are inserted together.
+    Employees written concurrently in between fall back to apply_balance_increments
+    (retry_conflicts=False skips them); unknown employees are skipped. Pass already loaded
+    (full) employee documents to save the lookup. Returns the ids of the updated employees.
+    """
+    increments_by_employee = {employee_id: inc for employee_id, inc in increments_by_employee.items() if inc}
+    if not increments_by_employee:
+        return []
+    reference_ids = reference_ids or {}
+    if employees is None:
+        employees = await load_employees_by_ids(increments_by_employee.keys())
+    increments_by_employee = {
+        employee_id: inc for employee_id, inc in increments_by_employee.items() if employee_id in employees
+    }
+    
+    # $inc cannot create paths below a null field - initialize those maps first (guarded)
+    missing_maps = [
+        employee_id for employee_id in increments_by_employee
+        if employees[employee_id].get("subaccount_balances") is None
+    ]
+    if missing_maps:
+        await db.employees.update_many(
+            {"id": {"$in": missing_maps}, "subaccount_balances": None},
+            {"$set": {"subaccount_balances": default_subaccount_balances()}}
+        )
+        for employee_id in missing_maps:
+            employees[employee_id] = {**employees[employee_id], "subaccount_balances": default_subaccount_balances()}
+    
+    batch_id = str(uuid.uuid4())
+    operations = []
+    for employee_id, inc in increments_by_employee.items():
+        employee = employees[employee_id]
+        seq_guard = employee["ledger_seq"] if "ledger_seq" in employee else {"$exists": False}
+        operations.append(UpdateOne(
+            {"id": employee_id, "ledger_seq": seq_guard},
+            {"$inc": {**inc, "ledger_seq": 1}, "$set": {"ledger_batch_id": batch_id}}
+        ))
+    await db.employees.bulk_write(operations, ordered=False)
+    applied = set(await db.employees.distinct("id", {"id": {"$in": list(increments_by_employee)}, "ledger_batch_id": batch_id}))
+    
+    entries = []
+    for employee_id, inc in increments_by_employee.items():
+        if employee_id not in applied:
+            if retry_conflicts:
+                await apply_balance_increments(employee_id, inc, None, kind, reference_ids.get(employee_id))
+                applied.add(employee_id)
+            continue
+        employee = employees[employee_id]
+        seq = employee.get("ledger_seq", 0) + 1
+        entries.append(ledger_entry_document(employee_id, seq, inc, kind, reference_ids.get(employee_id)))
+        if seq % LEDGER_SNAPSHOT_INTERVAL == 0:
+            balances = ledger_balances(employee)
+            await write_ledger_snapshot(
+                employee_id, seq, {path: balances.get(path, 0) + inc.get(path, 0) for path in {*balances, *inc}}
+            )
+    if entries:
+        await insert_ledger_entries(entries)
+        invalidate_coalesced("employees-with-subaccount-balances")
+        event_bus.publish(None, "balance_changed", employee_ids=[entry["employee_id"] for entry in entries])
+    return [employee_id for employee_id in increments_by_employee if employee_id in applied]
+
+# Batched lookups - resolve all referenced documents with one $in query per request
+async def load_employees_by_ids(employee_ids):
+    """Load employees by id, returns {employee_id: employee}; unknown ids are left out"""
+    ids = list({employee_id for employee_id in employee_ids if employee_id})
+    if not ids:
+        return {}
+    employees = await db.employees.find({"id": {"$in": ids}}).to_list(len(ids))
+    return {employee["id"]: employee for employee in employees}
+
+async def load_departments_by_ids(department_ids):
+    """Load departments by id, returns {department_id: department}; unknown ids are left out"""
+    ids = list({department_id for department_id in department_ids if department_id})
+    if not ids:
+        return {}
+    departments = await db.departments.find({"id": {"$in": ids}}).to_list(len(ids))
+    return {department["id"]: department for department in departments}
+
+# Daily rollups - counters per (department, business day) over all non-cancelled, real breakfast orders
+# Every write increments the rollup's version. A rebuild reads the version before scanning the
+# orders and only replaces a rollup that still has it, so a concurrent delta isn't overwritten -
+# the rebuild of that day starts over instead.
+ROLLUP_REBUILD_ATTEMPTS = 5
+
+def encode_rollup_key(name):
+    """Make a topping name safe to use as a MongoDB field name"""
+    return str(name).replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+def decode_rollup_key(key):
+    """Reverse of encode_rollup_key"""
+    return key.replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+def rollup_contribution(order):
+    """Counters an order adds to its day's rollup as a flat {field: amount} dict
+
+    Empty for orders that don't count: drinks/sweets, cancelled orders and sponsor orders
+    (those only redistribute costs, they are no additional food).
+    """
+    if order.get("order_type") != "breakfast" or order.get("is_cancelled", False) is not False or order.get("is_sponsor_order"):
+        return {}
+    
+    contribution = {"order_count": 1, "total_revenue_cents": abs(stored_cents(order, "total_price"))}
+    
+    def add(field, amount):
+        if amount:
+            contribution[field] = contribution.get(field, 0) + amount
+    
+    for item in order.get("breakfast_items") or []:
+        # New format (white/seeded halves) or old format (roll_type, roll_halves)
+        white_halves, seeded_halves = roll_halves(item)
+        
+        add("white_halves", white_halves)
+        add("seeded_halves", seeded_halves)
+        add("boiled_eggs", item.get("boiled_eggs", 0))
+        add("fried_eggs", item.get("fried_eggs", 0))
+        add("lunch_count", 1 if item.get("has_lunch", False) else 0)
+        add("coffee_count", 1 if item.get("has_coffee", False) else 0)
+        
+        # Toppings are placed on the white halves first, then on the seeded ones
+        for topping_index, topping in enumerate(item.get("toppings") or []):
+            roll = "white" if topping_index < white_halves else "seeded"
+            add(f"toppings.{roll}.{encode_rollup_key(topping)}", 1)
+    
+    return contribution
+
+async def apply_rollup_delta(department_id, business_date, delta, sign=1):
+    """Atomically add (sign=1) or remove (sign=-1) counters on a day's rollup"""
+    if not delta or not department_id or not business_date:
+        return
+    await db.daily_rollups.update_one(
+        {"department_id": department_id, "business_date": business_date},
+        {"$inc": {**{field: sign * amount for field, amount in delta.items()}, "version": 1}},
+        upsert=True
+    )
+
+async def record_order_in_rollup(order, sign=1):
+    """Add an order to its day's rollup (sign=-1 removes it, e.g. on cancellation)"""
+    business_date = order.get("business_date") or get_business_date(order["timestamp"])
+    apply_order_to_live_summary(order, sign)
+    publish_order_event(order, "order_created" if sign > 0 else "order_cancelled")
+    await apply_rollup_delta(order.get("department_id"), business_date, rollup_contribution(order), sign)
+
+async def record_order_change_in_rollup(old_order, new_order):
+    """Apply the difference between two versions of the same order to the rollup"""
+    old_contribution = rollup_contribution(old_order)
+    new_contribution = rollup_contribution(new_order)
+    delta = {}
+    for field in set(old_contribution) | set(new_contribution):
+        amount = new_contribution.get(field, 0) - old_contribution.get(field, 0)
+        if amount:
+            delta[field] = amount
+    business_date = old_order.get("business_date") or get_business_date(old_order["timestamp"])
+    apply_order_to_live_summary(old_order, sign=-1)
+    apply_order_to_live_summary(new_order)
+    publish_order_event(new_order, "order_updated")
+    await apply_rollup_delta(old_order.get("department_id"), business_date, delta)
+
+def rollup_document(department_id, business_date, counters):
+    """Turn summed flat counters (with dotted topping paths) into a rollup document"""
+    document = {"department_id": department_id, "business_date": business_date}
+    for field, amount in counters.items():
+        target = document
+        *path, leaf = field.split(".")
+        for part in path:
+            target = target.setdefault(part, {})
+        target[leaf] = amount
+    return document
+
+def rollup_replacement(department_id, business_date, counters, version):
+    """(filter, document) to upsert a rebuilt rollup, only matching while the stored one still has version
+
+    version None means there was no rollup (or one from before versions). If the rollup was
+    changed or created in the meantime, the upsert fails on the unique index (code 11000).
+    """
+    document = rollup_document(department_id, business_date, counters)
+    document["version"] = (version or 0) + 1
+    return {"department_id": department_id, "business_date": business_date, "version": version}, document
+
+async def rebuild_daily_rollup(department_id, business_date):
+    """Recompute one day's rollup from its orders
+
+    Used after mutations that touch many orders of a day at once (sponsoring,
+    lunch repricing, deleting a breakfast day). The live summary is rebuilt as well.
+    Starts over if the rollup changed during the rebuild (see rollup_replacement).
+    """
+    drop_live_summary(department_id)
+    for _ in range(ROLLUP_REBUILD_ATTEMPTS):
+        rollup = await db.daily_rollups.find_one(
+            {"department_id": department_id, "business_date": business_date}, {"_id": 0, "version": 1}
         )
+        counters = {}
+        async for order in db.orders.find({"department_id": department_id, "business_date": business_date, "order_type": "breakfast"}):
+            for field, amount in rollup_contribution(order).items():
+                counters[field] = counters.get(field, 0) + amount
+        try:
+            await db.daily_rollups.replace_one(
+                *rollup_replacement(department_id, business_date, counters, (rollup or {}).get("version")), upsert=True
+            )
+            return
+        except DuplicateKeyError:
+            continue
+    logger.warning(f"Daily rollup {department_id}/{business_date} kept changing, rebuild gave up after {ROLLUP_REBUILD_ATTEMPTS} attempts")
+
+def rollup_breakfast_summary(rollup):
+    """breakfast_summary structure ({"weiss": {...}, "koerner": {...}}) from a rollup"""
+    toppings = rollup.get("toppings", {})
+    return {
+        "weiss": {
+            "halves": rollup.get("white_halves", 0),
+            "toppings": {decode_rollup_key(k): v for k, v in toppings.get("white", {}).items() if v}
+        },
+        "koerner": {
+            "halves": rollup.get("seeded_halves", 0),
+            "toppings": {decode_rollup_key(k): v for k, v in toppings.get("seeded", {}).items() if v}
+        }
+    }
+
+# ===== LIVE DAILY SUMMARY =====
+# In-memory counters behind GET /orders/daily-summary, one per department for the current
+# Berlin business day. Every order mutation goes through the rollup hooks above, which also
+# apply the order to the live summary (record_order_in_rollup/record_order_change_in_rollup).
+# Each order's contribution is kept by order id, so applying an order twice or removing an
+# order that was never added is a no-op. The rendered response is cached until the next
+# change - a poll without changes costs a dict lookup. Summaries are built from the orders
+# at startup, after a day rollover and on demand (rebuild endpoint, bulk day mutations).
+# State lives in the process; the backend runs as a single uvicorn worker.
+
+def live_summary_contribution(order):
+    """What an order adds to the daily summary, None for orders that don't show up there"""
+    if order.get("is_cancelled", False) is not False or order.get("is_sponsor_order"):
+        return None
+    if order.get("order_type") == "drinks" and order.get("drink_items"):
+        return {"drinks": dict(order["drink_items"])}
+    if order.get("order_type") == "sweets" and order.get("sweet_items"):
+        return {"sweets": dict(order["sweet_items"])}
+    if order.get("order_type") != "breakfast" or not order.get("breakfast_items"):
+        return None
+    
+    counters = {"white_halves": 0, "seeded_halves": 0, "boiled_eggs": 0, "fried_eggs": 0, "lunch_count": 0, "coffee_count": 0}
+    toppings = {}
+    for item in order["breakfast_items"]:
+        # New format (white/seeded halves) or old format (roll_type, roll_halves)
+        white_halves, seeded_halves = roll_halves(item)
+        counters["white_halves"] += white_halves
+        counters["seeded_halves"] += seeded_halves
+        counters["boiled_eggs"] += item.get("boiled_eggs", 0)
+        counters["fried_eggs"] += item.get("fried_eggs", 0)
+        counters["lunch_count"] += 1 if item.get("has_lunch", False) else 0
+        counters["coffee_count"] += 1 if item.get("has_coffee", False) else 0
+        # Toppings are placed on the white halves first, then on the seeded ones
+        for topping_index, topping in enumerate(item.get("toppings") or []):
+            roll = "white" if topping_index < white_halves else "seeded"
+            toppings.setdefault(topping, {"white": 0, "seeded": 0})[roll] += 1
+    
+    notes = [note.strip() for note in (order.get("notes") or "").split(";") if note.strip()]
+    return {"employee_id": order["employee_id"], "counters": counters, "toppings": toppings, "notes": notes}
+
+class LiveDailySummary:
+    """Summed contributions of one department's orders of one business day"""
+
+    def __init__(self, department_id, business_date):
+        self.department_id = department_id
+        self.business_date = business_date
+        self.contributions = {}  # order_id -> live_summary_contribution
+        self.employees = {}  # employee_id -> {"orders", counters..., "toppings", "notes": {note: count}}
+        self.drinks = {}
+        self.sweets = {}
+        self.response = None  # Rendered daily summary, dropped on every change
+        self.version = 0
+
+    def apply(self, order, sign=1):
+        """Add an order (sign=1) or remove it (sign=-1)"""
+        order_id = order["id"]
+        if sign < 0:
+            contribution = self.contributions.pop(order_id, None)
+        else:
+            if order_id in self.contributions:
+                return
+            contribution = live_summary_contribution(order)
+            if contribution is None:
+                return
+            self.contributions[order_id] = contribution
+        if contribution is None:
+            return
+        self.response = None
+        self.version += 1
+        
+        for key, totals in (("drinks", self.drinks), ("sweets", self.sweets)):
+            for item_id, quantity in contribution.get(key, {}).items():
+                totals[item_id] = totals.get(item_id, 0) + sign * quantity
+                if not totals[item_id]:
+                    del totals[item_id]
+        if "employee_id" not in contribution:
+            return
+        
+        employee = self.employees.setdefault(contribution["employee_id"], {"orders": 0, "toppings": {}, "notes": {}})
+        employee["orders"] += sign
+        for field, amount in contribution["counters"].items():
+            employee[field] = employee.get(field, 0) + sign * amount
+        for topping, counts in contribution["toppings"].items():
+            topping_counts = employee["toppings"].setdefault(topping, {"white": 0, "seeded": 0})
+            topping_counts["white"] += sign * counts["white"]
+            topping_counts["seeded"] += sign * counts["seeded"]
+            if not topping_counts["white"] and not topping_counts["seeded"]:
+                del employee["toppings"][topping]
+        for note in contribution["notes"]:
+            employee["notes"][note] = employee["notes"].get(note, 0) + sign
+            if not employee["notes"][note]:
+                del employee["notes"][note]
+        if employee["orders"] <= 0:
+            del self.employees[contribution["employee_id"]]
+
+    async def render(self):
+        """Daily summary response (same structure as before), cached until the next change"""
+        if self.response is not None:
+            return self.response
+        
+        version = self.version
+        employees_by_id = await load_employees_by_ids(self.employees)
+        employee_orders = {}
+        for employee_id, counts in self.employees.items():
+            employee = employees_by_id.get(employee_id)
+            employee_name = employee["name"] if employee else "Unknown"
+            # Employees with the same name are listed together
+            entry = employee_orders.setdefault(employee_name, {
+                "white_halves": 0,
+                "seeded_halves": 0,
+                "boiled_eggs": 0,
+                "fried_eggs": 0,
+                "has_lunch": False,
+                "has_coffee": False,
+                "notes": [],
+                "toppings": {},
+                "employee_department_id": employee.get("department_id") if employee else None,
+                "order_department_id": self.department_id,
+                "is_8h_service": employee.get("is_8h_service", False) if employee else False,
+                "total_amount": 0.0
+            })
+            for field in ("white_halves", "seeded_halves", "boiled_eggs", "fried_eggs"):
+                entry[field] += counts.get(field, 0)
+            entry["has_lunch"] = entry["has_lunch"] or counts.get("lunch_count", 0) > 0
+            entry["has_coffee"] = entry["has_coffee"] or counts.get("coffee_count", 0) > 0
+            entry["notes"] += [note for note in counts["notes"] if note not in entry["notes"]]
+            for topping, topping_counts in counts["toppings"].items():
+                entry_counts = entry["toppings"].setdefault(topping, {"white": 0, "seeded": 0})
+                entry_counts["white"] += topping_counts["white"]
+                entry_counts["seeded"] += topping_counts["seeded"]
+        for entry in employee_orders.values():
+            entry["notes"] = "; ".join(entry["notes"])
+        
+        breakfast_summary = {}
+        if employee_orders:
+            breakfast_summary = {"weiss": {"halves": 0, "toppings": {}}, "koerner": {"halves": 0, "toppings": {}}}
+            for entry in employee_orders.values():
+                breakfast_summary["weiss"]["halves"] += entry["white_halves"]
+                breakfast_summary["koerner"]["halves"] += entry["seeded_halves"]
+                for topping, counts in entry["toppings"].items():
+                    for roll_type, roll in (("weiss", "white"), ("koerner", "seeded")):
+                        if counts[roll]:
+                            roll_toppings = breakfast_summary[roll_type]["toppings"]
+                            roll_toppings[topping] = roll_toppings.get(topping, 0) + counts[roll]
+        
+        # Shopping list (halves to whole rolls, rounded up) and topping totals
+        shopping_list = {}
+        total_toppings = {}
+        for roll_type, data in breakfast_summary.items():
+            shopping_list[roll_type] = {"halves": data["halves"], "whole_rolls": (data["halves"] + 1) // 2}
+            for topping, count in data["toppings"].items():
+                total_toppings[topping] = total_toppings.get(topping, 0) + count
+        
+        response = {
+            "date": self.business_date,
+            "breakfast_summary": breakfast_summary,
+            "employee_orders": employee_orders,
+            "drinks_summary": dict(self.drinks),
+            "sweets_summary": dict(self.sweets),
+            "shopping_list": shopping_list,
+            "total_toppings": total_toppings,
+            "total_boiled_eggs": sum(entry["boiled_eggs"] for entry in employee_orders.values()),
+            "total_fried_eggs": sum(entry["fried_eggs"] for entry in employee_orders.values()),
+            "notes_summary": {name: entry["notes"] for name, entry in employee_orders.items() if entry["notes"].strip()}
+        }
+        # Orders that arrived while the employees were loading invalidate this rendering
+        if self.version == version:
+            self.response = response
+        return response
+
+    def forget_rendering(self):
+        """Drop the cached response, e.g. after an employee was renamed"""
+        self.response = None
+
+_live_summaries = {}
+_live_summary_generations = {}  # department_id -> bumped on every change, guards builds against lost updates
+
+def apply_order_to_live_summary(order, sign=1):
+    """Apply an order change to its department's live summary (if one is loaded for its day)"""
+    department_id = order.get("department_id")
+    _live_summary_generations[department_id] = _live_summary_generations.get(department_id, 0) + 1
+    summary = _live_summaries.get(department_id)
+    business_date = order.get("business_date") or get_business_date(order["timestamp"])
+    if summary and summary.business_date == business_date:
+        summary.apply(order, sign)
+
+def drop_live_summary(department_id: str = None):
+    """Forget live summaries (one department or all), the next poll rebuilds them from the orders"""
+    if department_id:
+        _live_summary_generations[department_id] = _live_summary_generations.get(department_id, 0) + 1
+        _live_summaries.pop(department_id, None)
+    else:
+        for summary_department_id in list(_live_summary_generations):
+            _live_summary_generations[summary_department_id] += 1
+        _live_summaries.clear()
+
+def forget_live_summary_renderings():
+    """Re-render all live summaries on their next poll (employee names/departments changed)"""
+    for summary in _live_summaries.values():
+        summary.forget_rendering()
+
+async def get_live_summary(department_id: str):
+    """Live summary of today, built from today's orders if missing or from a previous day"""
+    business_date = get_berlin_date().isoformat()
+    summary = _live_summaries.get(department_id)
+    if summary and summary.business_date == business_date:
+        return summary
+    
+    generation = _live_summary_generations.get(department_id, 0)
+    summary = LiveDailySummary(department_id, business_date)
+    async for order in db.orders.find({"department_id": department_id, "business_date": business_date}):
+        summary.apply(order)
+    
+    # Don't keep a summary when an order changed while it was loading
+    if _live_summary_generations.get(department_id, 0) == generation:
+        _live_summaries[department_id] = summary
+    return summary
+
+async def rebuild_live_summaries():
+    """Build the live summaries of all departments from today's orders"""
+    drop_live_summary()
+    department_ids = await db.departments.distinct("id")
+    await asyncio.gather(*(get_live_summary(department_id) for department_id in department_ids))
+    return len(department_ids)
 
 # Helper functions for MongoDB date serialization
+def to_utc_datetime(value):
+    """Read a stored timestamp (ISO string or BSON date) as timezone-aware UTC datetime"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        # Legacy values without offset (datetime.utcnow()) are UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def to_mongo_datetime(value):
+    """Convert a datetime into its storage representation (ISO string or native BSON date)"""
+    if value is None:
+        return None
+    if DATETIME_STORAGE == "iso":
+        return value.isoformat()
+    return to_utc_datetime(value)
+
 def prepare_for_mongo(data):
-    """Convert date/time objects to ISO strings for MongoDB storage"""
+    """Convert date/time objects for MongoDB storage
+
+    Fields in DATETIME_FIELDS are stored as native dates unless DATETIME_STORAGE is "iso",
+    all other datetime values are stored as ISO strings.
+    """
     if isinstance(data, dict):
         for key, value in data.items():
             if isinstance(value, datetime):
-                data[key] = value.isoformat()
+                data[key] = to_mongo_datetime(value) if key in DATETIME_FIELDS else value.isoformat()
     return data
 
 def parse_from_mongo(item):
@@ -147,33 +1001,270 @@ def parse_from_mongo(item):
             item['timestamp'] = datetime.fromisoformat(item['timestamp'])
     return item
 
-async def get_department_prices(department_id: str):
-    """Get department-specific prices with fallback to global settings"""
-    dept_settings = await db.department_settings.find_one({"department_id": department_id})
-    
-    if dept_settings:
-        return {
-            "boiled_eggs_price": dept_settings.get("boiled_eggs_price", 0.50),
-            "fried_eggs_price": dept_settings.get("fried_eggs_price", 0.50),
-            "coffee_price": dept_settings.get("coffee_price", 1.50)
-        }
-    
-    # Fallback to global lunch settings
-    lunch_settings = await db.lunch_settings.find_one()
-    if lunch_settings:
-        return {
-            "boiled_eggs_price": lunch_settings.get("boiled_eggs_price", 0.50),
-            "fried_eggs_price": lunch_settings.get("fried_eggs_price", 0.50),
-            "coffee_price": lunch_settings.get("coffee_price", 1.50)
-        }
-    
-    # Final fallback to defaults
+def datetime_filter(field, **bounds):
+    """Build a range filter on a datetime field for the current storage mode
+
+    Usage: db.orders.find({"department_id": ..., **datetime_filter("timestamp", gte=start, lte=end)})
+    In "dual" mode both representations are matched, because MongoDB never compares
+    strings with dates.
+    """
+    iso_range = {f"${op}": value.isoformat() for op, value in bounds.items()}
+    native_range = {f"${op}": to_utc_datetime(value) for op, value in bounds.items()}
+
+    if DATETIME_STORAGE == "iso":
+        return {field: iso_range}
+    if DATETIME_STORAGE == "native":
+        return {field: native_range}
+    return {"$and": [{"$or": [{field: iso_range}, {field: native_range}]}]}
+
+def resolve_department_prices(dept_settings, lunch_settings):
+    """Egg and coffee prices: department settings, else global lunch settings, else defaults"""
+    source = dept_settings or lunch_settings or {}
     return {
-        "boiled_eggs_price": 0.50,
-        "fried_eggs_price": 0.50,
-        "coffee_price": 1.50
+        "boiled_eggs_price": source.get("boiled_eggs_price", 0.50),
+        "fried_eggs_price": source.get("fried_eggs_price", 0.50),
+        "coffee_price": source.get("coffee_price", 1.50)
     }
 
+async def get_department_prices(department_id: str):
+    """Get department-specific prices with fallback to global settings"""
+    price_book = await get_price_book(department_id)
+    return dict(price_book.department_prices)
+
+# ===== PRICE BOOK =====
+# All prices of a department in one object, cached in memory. Every endpoint that changes
+# menus, department settings or lunch prices calls invalidate_price_book(), the TTL only
+# bounds staleness for changes made outside the API (scripts, manual DB edits).
+PRICE_BOOK_TTL_SECONDS = float(os.environ.get('PRICE_BOOK_TTL_SECONDS', '300'))
+
+class PriceBook:
+    """Snapshot of one department's menus and settings (API shape, prices in euros)"""
+
+    def __init__(self, department_id, version, breakfast_menu, toppings_menu, drinks_menu, sweets_menu,
+                 dept_settings, lunch_settings):
+        self.department_id = department_id
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.breakfast_menu = breakfast_menu
+        self.toppings_menu = toppings_menu
+        self.drinks_menu = drinks_menu
+        self.sweets_menu = sweets_menu
+        self.lunch_settings = lunch_settings or {}
+        self.department_settings = dept_settings  # None until the department has settings
+        self.breakfast_prices = {item["roll_type"]: item["price"] for item in breakfast_menu}
+        self.topping_prices = {item["topping_type"]: item["price"] for item in toppings_menu}
+        self.drink_prices = {item["id"]: item["price"] for item in drinks_menu}
+        self.sweet_prices = {item["id"]: item["price"] for item in sweets_menu}
+        self.department_prices = resolve_department_prices(dept_settings, lunch_settings)
+        self.boiled_eggs_price = self.department_prices["boiled_eggs_price"]
+        self.fried_eggs_price = self.department_prices["fried_eggs_price"]
+        self.coffee_price = self.department_prices["coffee_price"]
+        self._daily_lunch = {}  # date -> daily_lunch_prices document (or None), filled on demand
+        self._menu_response = None  # (etag, body) of GET /departments/{id}/menu, built on first request
+
+    def is_expired(self):
+        return time.monotonic() - self.loaded_at > PRICE_BOOK_TTL_SECONDS
+
+    def roll_price(self, roll_type, default=0.0):
+        return self.breakfast_prices.get(roll_type, default)
+
+    async def daily_lunch(self, date: str):
+        """daily_lunch_prices document of a day (None if not set), read once per price book"""
+        if date not in self._daily_lunch:
+            daily_price = await db.daily_lunch_prices.find_one({
+                "department_id": self.department_id,
+                "date": date
+            })
+            self._daily_lunch[date] = price_settings_to_api(daily_price) if daily_price else None
+        return self._daily_lunch[date]
+
+    async def daily_lunch_price(self, date: str):
+        """Lunch price of a day - 0.0 until the admin sets it"""
+        daily_price = await self.daily_lunch(date)
+        return daily_price["lunch_price"] if daily_price else 0.0
+
+    def menu_response(self):
+        """(etag, body) of the department's combined menu, serialized once per price book"""
+        if self._menu_response is None:
+            body = json_body({
+                "breakfast": [MenuItemBreakfast(**item) for item in self.breakfast_menu],
+                "toppings": [MenuItemToppings(**item) for item in self.toppings_menu],
+                "drinks": [MenuItemDrink(**item) for item in self.drinks_menu],
+                "sweets": [MenuItemSweet(**item) for item in self.sweets_menu],
+                "department_prices": self.department_prices
+            })
+            # A content hash stays valid across restarts, unlike the price book generation
+            self._menu_response = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+        return self._menu_response
+
+_price_books = {}
+_price_book_generation = 0  # Bumped on every invalidation, used as price book version
+
+async def get_price_book(department_id: str):
+    """Cached PriceBook of a department, loaded on first use or after invalidation"""
+    price_book = _price_books.get(department_id)
+    if price_book and not price_book.is_expired():
+        return price_book
+
+    version = _price_book_generation
+    breakfast_menu, toppings_menu, drinks_menu, sweets_menu, dept_settings, lunch_settings = await asyncio.gather(
+        db.menu_breakfast.find({"department_id": department_id}).to_list(100),
+        db.menu_toppings.find({"department_id": department_id}).to_list(100),
+        db.menu_drinks.find({"department_id": department_id}).to_list(100),
+        db.menu_sweets.find({"department_id": department_id}).to_list(100),
+        db.department_settings.find_one({"department_id": department_id}),
+        db.lunch_settings.find_one()
+    )
+    price_book = PriceBook(
+        department_id, version,
+        *([menu_item_to_api(item) for item in menu] for menu in (breakfast_menu, toppings_menu, drinks_menu, sweets_menu)),
+        price_settings_to_api(dept_settings) if dept_settings else None,
+        price_settings_to_api(lunch_settings) if lunch_settings else None
+    )
+
+    # Don't cache a book when an invalidation happened while it was loading
+    if _price_book_generation == version:
+        _price_books[department_id] = price_book
+    return price_book
+
+def invalidate_price_book(department_id: str = None):
+    """Drop cached price books - one department, or all (global settings changed)"""
+    global _price_book_generation
+    _price_book_generation += 1
+    if department_id:
+        _price_books.pop(department_id, None)
+    else:
+        _price_books.clear()
+    event_bus.publish(department_id, "menu_changed")
+
+# ===== EVENT BUS =====
+# In-process publish/subscribe for change events, streamed to the tablets over
+# Server-Sent Events (GET /api/events/{department_id}) so they refresh only on change.
+# Events carry what changed, not the data - clients reload the affected view.
+#   order_created / order_updated / order_cancelled   {order_id, employee_id, order_type}
+#   balance_changed / payment_recorded                {employee_ids}            (all departments)
+#   breakfast_closed / breakfast_reopened, sponsoring_applied {meal_type}, menu_changed
+#   employee_changed / employee_deleted               {employee_ids}
+#   temporary_employees_changed
+#   resync - sent on (re)connect and after dropped events: reload everything
+# The bus also keeps the last EVENT_HISTORY_SIZE events - that is the change log behind
+# GET /api/changes/{department_id}?since=<cursor> (see DELTA SYNC).
+EVENT_QUEUE_SIZE = 100
+EVENT_HISTORY_SIZE = int(os.environ.get('EVENT_HISTORY_SIZE', '10000'))
+
+class EventBus:
+    """Subscriber queues per department; publishing never blocks the request that changed data"""
+
+    def __init__(self):
+        self.subscribers = {}  # department_id -> set of asyncio.Queue
+        self.seq = 0
+        self.boot_id = uuid.uuid4().hex[:8]  # Cursors of an earlier process are unknown
+        self.history = deque(maxlen=EVENT_HISTORY_SIZE)
+
+    def subscribe(self, department_id):
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.subscribers.setdefault(department_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, department_id, queue):
+        queues = self.subscribers.get(department_id)
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[department_id]
+
+    def publish(self, department_id, event_type, **data):
+        """Send an event to one department's subscribers (department_id None: to all)"""
+        self.seq += 1
+        event = {"id": self.seq, "type": event_type, "department_id": department_id, **data}
+        self.history.append(event)
+        if department_id is None:
+            targets = [queue for queues in self.subscribers.values() for queue in queues]
+        else:
+            targets = list(self.subscribers.get(department_id, ()))
+        for queue in targets:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client - drop what it hasn't read yet and let it reload everything
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"id": self.seq, "type": "resync", "department_id": department_id})
+
+    def cursor(self):
+        return f"{self.boot_id}-{self.seq}"
+
+    def events_since(self, cursor, department_id):
+        """Events of a department after a cursor, None if they are no longer known (full reload)"""
+        boot_id, _, seq = (cursor or "").partition("-")
+        if boot_id != self.boot_id or not seq.isdigit() or int(seq) > self.seq:
+            return None
+        seq = int(seq)
+        if seq < self.seq and (not self.history or self.history[0]["id"] > seq + 1):
+            return None
+        return [
+            event for event in self.history
+            if event["id"] > seq and event["department_id"] in (None, department_id)
+        ]
+
+event_bus = EventBus()
+
+def publish_order_event(order, event_type):
+    event_bus.publish(
+        order.get("department_id"), event_type,
+        order_id=order.get("id"), employee_id=order.get("employee_id"), order_type=order.get("order_type")
+    )
+
+# ===== REQUEST COALESCING =====
+# Hot department GET endpoints (polled by every tablet of a department at the same moment)
+# run their queries once per department: concurrent identical requests share one in-flight
+# computation, and the result is kept for COALESCE_TTL_SECONDS. Writes that change a
+# result call invalidate_coalesced(), so nobody waits out the TTL after their own change.
+COALESCE_TTL_SECONDS = float(os.environ.get('COALESCE_TTL_SECONDS', '2'))
+
+_coalesced_inflight = {}  # key -> asyncio.Task
+_coalesced_results = {}  # key -> (expires_at, result)
+_coalesced_generations = {}  # key -> bumped on every invalidation
+
+async def coalesced(key, compute, ttl=None):
+    """Result of compute() shared by all concurrent callers with the same key
+
+    key is a tuple (route, *params). Exceptions reach every waiting caller and are not kept.
+    """
+    ttl = COALESCE_TTL_SECONDS if ttl is None else ttl
+    cached = _coalesced_results.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    task = _coalesced_inflight.get(key)
+    if task is None:
+        generation = _coalesced_generations.get(key, 0)
+        task = asyncio.ensure_future(compute())
+        _coalesced_inflight[key] = task
+        
+        def finished(task):
+            if _coalesced_inflight.get(key) is task:
+                del _coalesced_inflight[key]
+            # Don't keep a result when it was invalidated while computing
+            if ttl > 0 and not task.cancelled() and task.exception() is None and _coalesced_generations.get(key, 0) == generation:
+                _coalesced_results[key] = (time.monotonic() + ttl, task.result())
+        task.add_done_callback(finished)
+    
+    # A caller that disconnects must not cancel the computation the others are waiting for
+    return await asyncio.shield(task)
+
+def invalidate_coalesced(route, *params):
+    """Forget results of a route (all of them, or those starting with params)
+
+    Requests arriving afterwards start a new computation instead of joining one that
+    may have read the old data.
+    """
+    for key in {*_coalesced_results, *_coalesced_inflight}:
+        if key[0] == route and key[1:1 + len(params)] == params:
+            _coalesced_generations[key] = _coalesced_generations.get(key, 0) + 1
+            _coalesced_results.pop(key, None)
+            _coalesced_inflight.pop(key, None)
+
 # Berlin timezone helper functions
 def get_berlin_now():
     """Get current time in Berlin timezone"""
@@ -198,6 +1289,16 @@ def get_berlin_day_bounds(date_obj):
     
     return start_of_day_utc, end_of_day_utc
 
+def get_business_date(timestamp=None):
+    """Get the Berlin calendar day (YYYY-MM-DD) an order timestamp belongs to
+
+    Stored on every order as business_date, so day-scoped queries are a plain equality
+    lookup on (department_id, business_date) instead of a timestamp range.
+    """
+    if timestamp is None:
+        return get_berlin_date().isoformat()
+    return to_utc_datetime(timestamp).astimezone(BERLIN_TZ).date().isoformat()
+
 async def check_order_payment_protection(employee_id: str, order: dict):
     """Check if order is protected by payment timestamp (prevents cancellation after payment)"""
     # Get the most recent payment for this employee
@@ -209,13 +1310,9 @@ async def check_order_payment_protection(employee_id: str, order: dict):
     if not recent_payment:
         return  # No payments found, order can be cancelled
     
-    # Parse timestamps for comparison
-    order_timestamp = datetime.fromisoformat(order["timestamp"].replace('Z', '+00:00'))
-    payment_timestamp = recent_payment["timestamp"]
-    
-    # If payment timestamp is a string, parse it
-    if isinstance(payment_timestamp, str):
-        payment_timestamp = datetime.fromisoformat(payment_timestamp.replace('Z', '+00:00'))
+    # Timestamps may be ISO strings or native dates depending on DATETIME_STORAGE
+    order_timestamp = to_utc_datetime(order["timestamp"])
+    payment_timestamp = to_utc_datetime(recent_payment["timestamp"])
     
     # If order was placed BEFORE the most recent payment, it's protected
     if order_timestamp < payment_timestamp:
@@ -360,6 +1457,7 @@ class Order(BaseModel):
     lunch_price: Optional[float] = None  # The specific lunch price used for this order
     notes: Optional[str] = None  # Free text field for special requests/notes
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    business_date: Optional[str] = None  # Berlin calendar day of timestamp (YYYY-MM-DD)
 
 # Request/Response Models
 class DepartmentLogin(BaseModel):
@@ -568,13 +1666,13 @@ async def initialize_default_data():
         
         # Insert menu items for this department
         for item in breakfast_items:
-            await db.menu_breakfast.insert_one(item.dict())
+            await db.menu_breakfast.insert_one(menu_item_to_storage(item.dict()))
         for item in toppings:
-            await db.menu_toppings.insert_one(item.dict())
+            await db.menu_toppings.insert_one(menu_item_to_storage(item.dict()))
         for item in drinks:
-            await db.menu_drinks.insert_one(item.dict())
+            await db.menu_drinks.insert_one(menu_item_to_storage(item.dict()))
         for item in sweets:
-            await db.menu_sweets.insert_one(item.dict())
+            await db.menu_sweets.insert_one(menu_item_to_storage(item.dict()))
     
     # Create default lunch settings with explicit boiled eggs price and coffee price
     # NUR für Development-Umgebung - NIE in Production überschreiben!
@@ -585,7 +1683,7 @@ async def initialize_default_data():
         existing_lunch_settings = await db.lunch_settings.find_one()
         if not existing_lunch_settings:
             # Insert new lunch settings ONLY if none exist
-            await db.lunch_settings.insert_one(lunch_settings.dict())
+            await db.lunch_settings.insert_one(price_settings_to_storage(lunch_settings.dict()))
             print("🔧 DEBUG: Created new lunch settings for development")
         else:
             # KRITISCHER SICHERHEITSFIX: Nur in Development und nur bei fehlendem coffee_price
@@ -594,18 +1692,20 @@ async def initialize_default_data():
             # if "boiled_eggs_price" not in existing_lunch_settings or existing_lunch_settings["boiled_eggs_price"] == 999.99:
             #     update_fields["boiled_eggs_price"] = 0.50  # ← DEAKTIVIERT - VERURSACHTE DEN BUG
             
-            if "coffee_price" not in existing_lunch_settings:
+            if "coffee_price" not in existing_lunch_settings and cents_field("coffee_price") not in existing_lunch_settings:
                 update_fields["coffee_price"] = 1.50
             
             if update_fields:
                 await db.lunch_settings.update_one(
                     {"id": existing_lunch_settings["id"]},
-                    {"$set": update_fields}
+                    money_update(update_fields, PRICE_SETTINGS_MONEY_FIELDS)
                 )
                 print(f"🔧 DEBUG: Updated lunch settings fields: {update_fields}")
     else:
         print("🔒 PRODUCTION: Lunch settings initialization skipped for safety")
     
+    invalidate_price_book()
+    
     return {"message": "Daten erfolgreich initialisiert"}
 
 @api_router.post("/safe-init-empty-database")
@@ -681,37 +1781,37 @@ async def migrate_to_department_specific():
     existing_breakfast = await db.menu_breakfast.find({"department_id": {"$exists": False}}).to_list(100)
     for breakfast_item in existing_breakfast:
         # Remove MongoDB _id and create department-specific copies
-        clean_item = {k: v for k, v in breakfast_item.items() if k != '_id'}
+        clean_item = menu_item_to_api(breakfast_item)
         for dept in departments:
             new_item = MenuItemBreakfast(**clean_item, department_id=dept["id"])
-            await db.menu_breakfast.insert_one(new_item.dict())
+            await db.menu_breakfast.insert_one(menu_item_to_storage(new_item.dict()))
             migration_results["breakfast_items"] += 1
     
     # Migrate topping items
     existing_toppings = await db.menu_toppings.find({"department_id": {"$exists": False}}).to_list(100)
     for topping_item in existing_toppings:
-        clean_item = {k: v for k, v in topping_item.items() if k != '_id'}
+        clean_item = menu_item_to_api(topping_item)
         for dept in departments:
             new_item = MenuItemToppings(**clean_item, department_id=dept["id"])
-            await db.menu_toppings.insert_one(new_item.dict())
+            await db.menu_toppings.insert_one(menu_item_to_storage(new_item.dict()))
             migration_results["topping_items"] += 1
     
     # Migrate drink items
     existing_drinks = await db.menu_drinks.find({"department_id": {"$exists": False}}).to_list(100)
     for drink_item in existing_drinks:
-        clean_item = {k: v for k, v in drink_item.items() if k != '_id'}
+        clean_item = menu_item_to_api(drink_item)
         for dept in departments:
             new_item = MenuItemDrink(**clean_item, department_id=dept["id"])
-            await db.menu_drinks.insert_one(new_item.dict())
+            await db.menu_drinks.insert_one(menu_item_to_storage(new_item.dict()))
             migration_results["drink_items"] += 1
     
     # Migrate sweet items
     existing_sweets = await db.menu_sweets.find({"department_id": {"$exists": False}}).to_list(100)
     for sweet_item in existing_sweets:
-        clean_item = {k: v for k, v in sweet_item.items() if k != '_id'}
+        clean_item = menu_item_to_api(sweet_item)
         for dept in departments:
             new_item = MenuItemSweet(**clean_item, department_id=dept["id"])
-            await db.menu_sweets.insert_one(new_item.dict())
+            await db.menu_sweets.insert_one(menu_item_to_storage(new_item.dict()))
             migration_results["sweet_items"] += 1
     
     # Remove old global items (optional - comment out if you want to keep them)
@@ -719,6 +1819,7 @@ async def migrate_to_department_specific():
     await db.menu_toppings.delete_many({"department_id": {"$exists": False}})
     await db.menu_drinks.delete_many({"department_id": {"$exists": False}})
     await db.menu_sweets.delete_many({"department_id": {"$exists": False}})
+    invalidate_price_book()
     
     return {
         "message": "Migration zu abteilungsspezifischen Menüs erfolgreich abgeschlossen",
@@ -834,18 +1935,21 @@ async def get_department_employees(department_id: str):
         ]
     }).sort("sort_order", 1).to_list(100)
     
+    return await department_employee_models(employees)
+
+async def department_employee_models(employees):
+    """Employee models of a department's employee list"""
     # Initialize subaccount balances for existing employees that don't have them
     updated_employees = []
     for emp in employees:
-        emp = initialize_subaccount_balances(emp)
-        updated_employees.append(emp)
-        
         # Update database if subaccount_balances was missing
-        if 'subaccount_balances' not in emp or emp['subaccount_balances'] is None:
+        if not emp.get('subaccount_balances'):
+            emp = initialize_subaccount_balances(emp)
             await db.employees.update_one(
                 {"id": emp["id"]},
                 {"$set": {"subaccount_balances": emp['subaccount_balances']}}
             )
+        updated_employees.append(employee_to_api(emp))
     
     return [Employee(**emp) for emp in updated_employees]
 
@@ -859,6 +1963,7 @@ async def update_employees_sort_order(department_id: str, employee_ids: List[str
                 {"id": employee_id, "department_id": department_id},
                 {"$set": {"sort_order": index}}
             )
+        event_bus.publish(department_id, "employee_changed", employee_ids=employee_ids)
         
         return {
             "message": "Mitarbeiter-Sortierung erfolgreich gespeichert",
@@ -887,8 +1992,15 @@ async def create_employee(employee_data: EmployeeCreate):
         employee_dict['breakfast_balance'] = 0.0
         employee_dict['drinks_sweets_balance'] = 0.0
     
+    employee_dict = employee_to_storage(employee_dict)
     await db.employees.insert_one(employee_dict)
-    return Employee(**employee_dict)
+    await write_opening_snapshot(employee_dict)
+    # 8H-Service employees show up in every department
+    event_bus.publish(
+        None if employee_dict.get('is_8h_service') else employee_dict["department_id"],
+        "employee_changed", employee_ids=[employee_dict["id"]]
+    )
+    return Employee(**employee_to_api(employee_dict))
 
 
 @api_router.put("/developer/employees/{employee_id}/name")
@@ -910,10 +2022,12 @@ async def update_employee_name(employee_id: str, name: str):
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
+    forget_live_summary_renderings()
+    event_bus.publish(None, "employee_changed", employee_ids=[employee_id])
     
     # Get updated employee
     employee = await db.employees.find_one({"id": employee_id})
-    return Employee(**employee)
+    return Employee(**employee_to_api(employee))
 
 
 @api_router.post("/admin/migrate-subaccounts")
@@ -932,35 +2046,31 @@ async def migrate_employee_subaccounts():
         updated_count = 0
         
         for employee in all_employees:
-            needs_update = False
-            
             # Initialize subaccount balances if not exists
             if not employee.get('subaccount_balances'):
                 employee = initialize_subaccount_balances(employee)
-                needs_update = True
+                await db.employees.update_one(
+                    {"id": employee["id"]},
+                    {"$set": {"subaccount_balances": employee['subaccount_balances']}}
+                )
                 migration_count += 1
             
             # Sync main balances with subaccount balances for main department
             main_dept = employee.get('department_id')
             if main_dept and main_dept in employee['subaccount_balances']:
-                main_breakfast = employee.get('breakfast_balance', 0.0)
-                main_drinks = employee.get('drinks_sweets_balance', 0.0)
+                main_breakfast = stored_cents(employee, 'breakfast_balance')
+                main_drinks = stored_cents(employee, 'drinks_sweets_balance')
+                main_subaccount = employee['subaccount_balances'][main_dept]
                 
-                # Update subaccount to match main balances
-                if (employee['subaccount_balances'][main_dept]['breakfast'] != main_breakfast or 
-                    employee['subaccount_balances'][main_dept]['drinks'] != main_drinks):
+                # Update subaccount to match main balances (integer cents, recorded in the ledger)
+                if (stored_cents(main_subaccount, 'breakfast') != main_breakfast or 
+                    stored_cents(main_subaccount, 'drinks') != main_drinks):
                     
-                    employee['subaccount_balances'][main_dept]['breakfast'] = main_breakfast
-                    employee['subaccount_balances'][main_dept]['drinks'] = main_drinks
-                    needs_update = True
+                    await set_employee_balances(employee["id"], {
+                        f"subaccount_balances.{main_dept}.{cents_field('breakfast')}": main_breakfast,
+                        f"subaccount_balances.{main_dept}.{cents_field('drinks')}": main_drinks
+                    }, kind="correction")
                     updated_count += 1
-            
-            # Update employee in database if needed
-            if needs_update:
-                await db.employees.update_one(
-                    {"id": employee["id"]},
-                    {"$set": {"subaccount_balances": employee['subaccount_balances']}}
-                )
         
         return {
             "message": f"✅ Migration erfolgreich abgeschlossen!",
@@ -988,6 +2098,9 @@ async def complete_system_reset():
         
         # 1. DELETE ALL ORDERS
         delete_orders_result = await db.orders.delete_many({})
+        await db.daily_rollups.delete_many({})
+        drop_live_summary()
+        event_bus.publish(None, "resync")
         
         # 2. DELETE ALL PAYMENT LOGS  
         delete_payments_result = await db.payment_logs.delete_many({})
@@ -997,18 +2110,17 @@ async def complete_system_reset():
             {},
             {
                 "$set": {
-                    "breakfast_balance": 0.0,
-                    "drinks_sweets_balance": 0.0,
-                    "subaccount_balances": {
-                        "fw4abteilung1": {"breakfast": 0.0, "drinks": 0.0},
-                        "fw4abteilung2": {"breakfast": 0.0, "drinks": 0.0}, 
-                        "fw4abteilung3": {"breakfast": 0.0, "drinks": 0.0},
-                        "fw4abteilung4": {"breakfast": 0.0, "drinks": 0.0}
-                    }
-                }
+                    "breakfast_balance_cents": 0,
+                    "drinks_sweets_balance_cents": 0,
+                    "subaccount_balances": default_subaccount_balances()
+                },
+                "$unset": {"breakfast_balance": "", "drinks_sweets_balance": ""}
             }
         )
         
+        # 4. START THE BALANCE LEDGER OVER
+        await reset_ledger()
+        
         return {
             "message": "🗑️ KOMPLETTER SYSTEM-RESET ERFOLGREICH!",
             "summary": {
@@ -1035,7 +2147,7 @@ class TemporaryAssignment(BaseModel):
     employee_id: str  # Mitarbeiter der temporär hinzugefügt wird
     target_department_id: str  # Ziel-Wachabteilung wo der Mitarbeiter temporär arbeitet
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-    expires_at: str  # Läuft um 23:59 Berlin Zeit ab
+    expires_at: datetime  # Läuft um 23:59 Berlin Zeit ab
 
 @api_router.post("/departments/{department_id}/temporary-employees")
 async def add_temporary_employee(department_id: str, employee_data: dict):
@@ -1055,7 +2167,7 @@ async def add_temporary_employee(department_id: str, employee_data: dict):
         existing = await db.temporary_assignments.find_one({
             "employee_id": employee_id,
             "target_department_id": department_id,
-            "expires_at": {"$gte": datetime.now(timezone.utc).isoformat()}
+            **datetime_filter("expires_at", gte=datetime.now(timezone.utc))
         })
         
         if existing:
@@ -1070,11 +2182,12 @@ async def add_temporary_employee(department_id: str, employee_data: dict):
         assignment = TemporaryAssignment(
             employee_id=employee_id,
             target_department_id=department_id,
-            expires_at=expires_utc.isoformat()
+            expires_at=expires_utc
         )
         
         # Speichere in Datenbank
-        await db.temporary_assignments.insert_one(assignment.dict())
+        await db.temporary_assignments.insert_one(prepare_for_mongo(assignment.dict()))
+        event_bus.publish(department_id, "temporary_employees_changed")
         
         return {
             "message": "Mitarbeiter temporär hinzugefügt",
@@ -1091,36 +2204,42 @@ async def get_temporary_employees(department_id: str):
     """Get all temporary employees for a department (geräteübergreifend)"""
     try:
         # Finde alle aktiven temporären Zuordnungen
-        now = datetime.now(timezone.utc).isoformat()
+        now = datetime.now(timezone.utc)
         assignments = await db.temporary_assignments.find({
             "target_department_id": department_id,
-            "expires_at": {"$gte": now}
+            **datetime_filter("expires_at", gte=now)
         }).to_list(100)
         
-        # Lade Mitarbeiter-Details
-        temporary_employees = []
-        for assignment in assignments:
-            employee = await db.employees.find_one({"id": assignment["employee_id"]})
-            if employee:
-                # Lade Abteilungs-Details
-                dept = await db.departments.find_one({"id": employee["department_id"]})
-                dept_name = dept["name"] if dept else employee["department_id"]
-                
-                temporary_employees.append({
-                    "id": employee["id"],
-                    "name": employee["name"],
-                    "department_id": employee["department_id"],
-                    "department_name": dept_name,
-                    "assignment_id": assignment["id"],
-                    "expires_at": assignment["expires_at"],
-                    "isTemporary": True
-                })
+        # Lade Mitarbeiter- und Abteilungs-Details gesammelt
+        employees_by_id = await load_employees_by_ids(a["employee_id"] for a in assignments)
+        departments_by_id = await load_departments_by_ids(e["department_id"] for e in employees_by_id.values())
         
-        return temporary_employees
+        return temporary_employee_entries(assignments, employees_by_id, departments_by_id)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Laden: {str(e)}")
 
+def temporary_employee_entries(assignments, employees_by_id, departments_by_id):
+    """Temporary employees of a department's active assignments, for the dashboard"""
+    temporary_employees = []
+    for assignment in assignments:
+        employee = employees_by_id.get(assignment["employee_id"])
+        if employee:
+            dept = departments_by_id.get(employee["department_id"])
+            dept_name = dept["name"] if dept else employee["department_id"]
+            
+            temporary_employees.append({
+                "id": employee["id"],
+                "name": employee["name"],
+                "department_id": employee["department_id"],
+                "department_name": dept_name,
+                "assignment_id": assignment["id"],
+                "expires_at": assignment["expires_at"],
+                "isTemporary": True
+            })
+    
+    return temporary_employees
+
 @api_router.delete("/departments/{department_id}/temporary-employees/{assignment_id}")
 async def remove_temporary_employee(department_id: str, assignment_id: str):
     """Remove temporary employee assignment"""
@@ -1132,6 +2251,7 @@ async def remove_temporary_employee(department_id: str, assignment_id: str):
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Temporäre Zuordnung nicht gefunden")
+        event_bus.publish(department_id, "temporary_employees_changed")
         
         return {"message": "Temporäre Zuordnung entfernt"}
         
@@ -1142,10 +2262,10 @@ async def remove_temporary_employee(department_id: str, assignment_id: str):
 async def cleanup_expired_assignments():
     """Cleanup expired temporary assignments (Cron-Job)"""
     try:
-        now = datetime.now(timezone.utc).isoformat()
-        result = await db.temporary_assignments.delete_many({
-            "expires_at": {"$lt": now}
-        })
+        now = datetime.now(timezone.utc)
+        result = await db.temporary_assignments.delete_many(
+            datetime_filter("expires_at", lt=now)
+        )
         
         return {
             "message": "Abgelaufene Zuordnungen bereinigt",
@@ -1158,12 +2278,23 @@ async def cleanup_expired_assignments():
 # ERWEITERT: Subaccount Balance Management für Multi-Department System
 
 @api_router.post("/department-admin/subaccount-payment/{employee_id}")
-async def subaccount_flexible_payment(employee_id: str, payment_data: FlexiblePaymentRequest, admin_department: str):
+async def subaccount_flexible_payment(employee_id: str, payment_data: FlexiblePaymentRequest, admin_department: str,
+                                      idempotency_key: Optional[str] = Header(None)):
     """Department Admin: Process flexible payment for employee's subaccount in admin's department
     
     This allows admins to manage balance for employees from other departments who have
     orders/balances in the admin's department (subaccount management).
+    Idempotent with an Idempotency-Key header (see run_idempotent).
     """
+    return await run_idempotent(
+        idempotency_key,
+        f"subaccount-payment:{employee_id}:{admin_department}",
+        payment_data,
+        lambda claim: book_subaccount_payment(employee_id, payment_data, admin_department, claim)
+    )
+
+async def book_subaccount_payment(employee_id: str, payment_data: FlexiblePaymentRequest, admin_department: str, claim=None):
+    """Book a payment on the employee's subaccount in admin_department and log it"""
     try:
         employee = await db.employees.find_one({"id": employee_id})
         if not employee:
@@ -1176,15 +2307,18 @@ async def subaccount_flexible_payment(employee_id: str, payment_data: FlexiblePa
         if admin_department not in employee.get('subaccount_balances', {}):
             raise HTTPException(status_code=400, detail="Mitarbeiter hat kein Subkonto in dieser Abteilung")
         
-        # Get current subaccount balance for this department and balance type
         balance_type = payment_data.get_balance_type()
-        current_balance = get_employee_balance(employee, admin_department, balance_type)
         
         # Payment INCREASES balance (reduces debt or adds credit)
-        new_balance = current_balance + payment_data.amount
-        
-        # Update ONLY the subaccount balance for this department
-        await update_employee_balance(employee_id, admin_department, balance_type, payment_data.amount)
+        # Update ONLY the subaccount balance for this department; before/after come from the atomic update
+        payment_log_id = str(uuid.uuid4())
+        updated_employee = await update_employee_balance(
+            employee_id, admin_department, balance_type, payment_data.amount, kind="payment", reference_id=payment_log_id
+        )
+        if claim:
+            claim.mark_persisted()
+        updated_balance = get_employee_balance(updated_employee, admin_department, balance_type)
+        current_balance = round_to_cents(updated_balance - payment_data.amount)
         
         # Get readable department name
         department_doc = await db.departments.find_one({"id": admin_department})
@@ -1192,6 +2326,7 @@ async def subaccount_flexible_payment(employee_id: str, payment_data: FlexiblePa
         
         # Create payment log with subaccount tracking
         payment_log = PaymentLog(
+            id=payment_log_id,
             employee_id=employee_id,
             department_id=admin_department,  # The admin's department (subaccount)
             amount=payment_data.amount,
@@ -1200,18 +2335,13 @@ async def subaccount_flexible_payment(employee_id: str, payment_data: FlexiblePa
             admin_user=department_name,  # KORRIGIERT: Benutzerfreundlicher Name statt ID
             notes=f"Zahlung in {department_name} - {payment_data.notes or ''}".strip(' -'),
             balance_before=current_balance,
-            balance_after=new_balance
+            balance_after=updated_balance
         )
         
         # Save payment log
-        payment_dict = prepare_for_mongo(payment_log.dict())
+        payment_dict = prepare_for_mongo(payment_log_to_storage(payment_log.dict()))
         await db.payment_logs.insert_one(payment_dict)
         
-        # Get updated employee data for response
-        updated_employee = await db.employees.find_one({"id": employee_id})
-        updated_employee = initialize_subaccount_balances(updated_employee)
-        updated_balance = get_employee_balance(updated_employee, admin_department, balance_type)
-        
         return {
             "message": f"Subkonto-Zahlung erfolgreich verbucht",
             "employee_name": employee["name"],
@@ -1249,7 +2379,10 @@ async def reset_subaccount_balance(employee_id: str, balance_type: str, admin_de
         
         # Reset only the subaccount balance (set to 0)
         reset_amount = -current_balance  # Amount needed to bring balance to 0
-        await update_employee_balance(employee_id, admin_department, balance_type, reset_amount)
+        payment_log_id = str(uuid.uuid4())
+        await update_employee_balance(
+            employee_id, admin_department, balance_type, reset_amount, kind="reset", reference_id=payment_log_id
+        )
         
         # Get readable department name
         department_doc = await db.departments.find_one({"id": admin_department})
@@ -1257,6 +2390,7 @@ async def reset_subaccount_balance(employee_id: str, balance_type: str, admin_de
         
         # Create payment log for the reset
         payment_log = PaymentLog(
+            id=payment_log_id,
             employee_id=employee_id,
             department_id=admin_department,
             amount=reset_amount,
@@ -1269,7 +2403,7 @@ async def reset_subaccount_balance(employee_id: str, balance_type: str, admin_de
         )
         
         # Save payment log
-        payment_dict = prepare_for_mongo(payment_log.dict())
+        payment_dict = prepare_for_mongo(payment_log_to_storage(payment_log.dict()))
         await db.payment_logs.insert_one(payment_dict)
         
         return {
@@ -1306,29 +2440,33 @@ async def get_other_department_employees(department_id: str):
             ]
         }).sort("name", 1).to_list(1000)
         
-        # Group by department for easier frontend handling
-        employees_by_dept = {}
-        for emp in other_employees:
-            dept_id = emp["department_id"]
-            if dept_id not in employees_by_dept:
-                employees_by_dept[dept_id] = []
-            
-            # Get department name for display
-            dept = await db.departments.find_one({"id": dept_id})
-            dept_name = dept["name"] if dept else dept_id
-            
-            employees_by_dept[dept_id].append({
-                "id": emp["id"],
-                "name": emp["name"],
-                "department_id": dept_id,
-                "department_name": dept_name
-            })
-        
-        return employees_by_dept
+        departments_by_id = await load_departments_by_ids(emp["department_id"] for emp in other_employees)
+        return other_employees_by_department(other_employees, departments_by_id)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Mitarbeiter: {str(e)}")
 
+def other_employees_by_department(other_employees, departments_by_id):
+    """Employees of other departments grouped by department for easier frontend handling"""
+    employees_by_dept = {}
+    for emp in other_employees:
+        dept_id = emp["department_id"]
+        if dept_id not in employees_by_dept:
+            employees_by_dept[dept_id] = []
+        
+        # Department name for display
+        dept = departments_by_id.get(dept_id)
+        dept_name = dept["name"] if dept else dept_id
+        
+        employees_by_dept[dept_id].append({
+            "id": emp["id"],
+            "name": emp["name"],
+            "department_id": dept_id,
+            "department_name": dept_name
+        })
+    
+    return employees_by_dept
+
 @api_router.get("/employees/{employee_id}/all-balances")
 async def get_employee_all_balances(employee_id: str):
     """Get all balances (main + subaccounts) for an employee"""
@@ -1337,8 +2475,8 @@ async def get_employee_all_balances(employee_id: str):
         if not employee:
             raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
         
-        # Initialize subaccounts if needed
-        employee = initialize_subaccount_balances(employee)
+        # Balances in euros, subaccounts initialized if needed
+        employee = employee_to_api(employee)
         
         # Prepare response with all balances
         result = {
@@ -1365,7 +2503,7 @@ async def get_employee_all_balances(employee_id: str):
                 "department_name": dept_names.get(dept_id, dept_id),
                 "breakfast": balances.get("breakfast", 0.0),
                 "drinks": balances.get("drinks", 0.0),
-                "total": balances.get("breakfast", 0.0) + balances.get("drinks", 0.0)
+                "total": round_to_cents(balances.get("breakfast", 0.0) + balances.get("drinks", 0.0))
             }
         
         return result
@@ -1373,6 +2511,38 @@ async def get_employee_all_balances(employee_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Kontostände: {str(e)}")
 
+@api_router.get("/employees/{employee_id}/balance-at")
+async def get_employee_balance_at(employee_id: str, at: str):
+    """Balances of an employee at a point in time, from the ledger
+
+    `at` is an ISO datetime or a date (YYYY-MM-DD, meaning the end of that Berlin day).
+    """
+    try:
+        if len(at) == 10:
+            point_in_time = get_berlin_day_bounds(at)[1]
+        else:
+            point_in_time = to_utc_datetime(at)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ungültiges Datumsformat. Verwenden Sie YYYY-MM-DD oder ISO-Zeitstempel.")
+    
+    balances = await ledger_balance_at(employee_id, point_in_time)
+    if balances is None:
+        raise HTTPException(status_code=404, detail="Für diesen Zeitpunkt liegen keine Saldo-Daten vor")
+    
+    return {
+        "employee_id": employee_id,
+        "at": point_in_time.isoformat(),
+        **ledger_balances_to_api(balances)
+    }
+
+@api_router.get("/employees/{employee_id}/ledger")
+async def get_employee_ledger(employee_id: str, limit: int = 100):
+    """Latest balance ledger entries of an employee (amounts in euros)"""
+    entries = await db.ledger_entries.find({"employee_id": employee_id}, {"_id": 0}).sort("seq", -1).limit(limit).to_list(limit)
+    for entry in entries:
+        entry["changes"] = [{"path": change["path"], "amount": from_cents(change["cents"])} for change in entry["changes"]]
+    return [parse_from_mongo(entry) for entry in entries]
+
 # Lunch settings routes (UNVERÄNDERT - bestehende Kompatibilität)
 @api_router.get("/lunch-settings")
 async def get_lunch_settings():
@@ -1381,12 +2551,11 @@ async def get_lunch_settings():
     if not lunch_settings:
         # Create default if none exists
         default_settings = LunchSettings()
-        await db.lunch_settings.insert_one(default_settings.dict())
+        await db.lunch_settings.insert_one(price_settings_to_storage(default_settings.dict()))
         return default_settings
     
-    # Clean the document by removing MongoDB _id field
-    clean_settings = {k: v for k, v in lunch_settings.items() if k != '_id'}
-    return clean_settings
+    # API shape: prices in euros, without MongoDB _id
+    return price_settings_to_api(lunch_settings)
 
 @api_router.put("/lunch-settings")
 async def update_lunch_settings(price: float, department_id: str = None):
@@ -1395,118 +2564,26 @@ async def update_lunch_settings(price: float, department_id: str = None):
     if lunch_settings:
         await db.lunch_settings.update_one(
             {"id": lunch_settings["id"]},
-            {"$set": {"price": price}}
+            money_update({"price": price}, PRICE_SETTINGS_MONEY_FIELDS)
         )
     else:
         new_settings = LunchSettings(price=price)
-        await db.lunch_settings.insert_one(new_settings.dict())
-    
-    # Retroactively update all today's breakfast orders with lunch
-    today = datetime.now(timezone.utc).date()
-    start_of_day = datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc)
-    end_of_day = datetime.combine(today, datetime.max.time()).replace(tzinfo=timezone.utc)
-    
-    # Find all today's breakfast orders with lunch (optionally filtered by department)
-    query = {
-        "order_type": "breakfast",
-        "timestamp": {
-            "$gte": start_of_day.isoformat(),
-            "$lte": end_of_day.isoformat()
-        }
-    }
+        await db.lunch_settings.insert_one(price_settings_to_storage(new_settings.dict()))
+    invalidate_price_book()
     
-    # If department_id is provided, only update orders from that department
+    # Retroactively update all today's breakfast orders with lunch (Berlin business day),
+    # optionally only those of one department
+    today = get_berlin_date().isoformat()
     if department_id:
-        query["department_id"] = department_id
-    
-    todays_orders = await db.orders.find(query).to_list(1000)
+        department_ids = [department_id]
+    else:
+        department_ids = await db.orders.distinct("department_id", {"order_type": "breakfast", "business_date": today})
     
     updated_orders = 0
-    for order in todays_orders:
-        if order.get("breakfast_items"):
-            # Check if any breakfast item has lunch
-            has_lunch_items = any(item.get("has_lunch", False) for item in order["breakfast_items"])
-            if has_lunch_items:
-                # Recalculate total price with new lunch price
-                new_total = 0.0
-                
-                # Get current menu prices (department-specific)
-                breakfast_menu = await db.menu_breakfast.find({"department_id": order["department_id"]}).to_list(100)
-                toppings_menu = await db.menu_toppings.find({"department_id": order["department_id"]}).to_list(100)
-                breakfast_prices = {item["roll_type"]: item["price"] for item in breakfast_menu}
-                topping_prices = {item["topping_type"]: item["price"] for item in toppings_menu}
-                
-                for item in order["breakfast_items"]:
-                    # Handle both old and new breakfast item formats
-                    if "roll_type" in item:
-                        # Old format
-                        roll_price = breakfast_prices.get(item["roll_type"], 0.0)
-                        roll_halves = item.get("roll_halves", item.get("roll_count", 1))
-                        new_total += roll_price * roll_halves
-                    else:
-                        # New format with white_halves and seeded_halves
-                        white_halves = item.get("white_halves", 0)
-                        seeded_halves = item.get("seeded_halves", 0)
-                        
-                        white_price = breakfast_prices.get("weiss", 0.0)
-                        seeded_price = breakfast_prices.get("koerner", 0.0)
-                        
-                        # Prices are per-half (NOT divided by 2)
-                        new_total += (white_price * white_halves) + (seeded_price * seeded_halves)
-                    
-                    # Toppings price
-                    for topping in item.get("toppings", []):
-                        topping_price = topping_prices.get(topping, 0.0)
-                        new_total += topping_price
-                    
-                    # Add boiled eggs price if applicable
-                    boiled_eggs = item.get("boiled_eggs", 0)
-                    if boiled_eggs > 0:
-                        # Get boiled eggs price from lunch settings
-                        lunch_settings_obj = await db.lunch_settings.find_one({}) or {}
-                        boiled_eggs_price = lunch_settings_obj.get("boiled_eggs_price", 0.50)
-                        new_total += boiled_eggs * boiled_eggs_price
-                    
-                    # New lunch price (FIXED: lunch price should be per order, not per roll halves)
-                    if item.get("has_lunch"):
-                        # Add lunch price once per order, regardless of roll count
-                        new_total += price
-                
-                # Update order with new total price
-                old_total = order["total_price"]
-                await db.orders.update_one(
-                    {"id": order["id"]},
-                    {"$set": {"total_price": new_total}}
-                )
-                
-                # Update employee balance with the difference
-                balance_diff = new_total - old_total
-                print(f"DEBUG: Order {order['id'][:8]}: old_total={old_total}, new_total={new_total}, balance_diff={balance_diff}")
-                if balance_diff != 0:
-                    # KORRIGIERT: Invert balance_diff because when order price decreases, 
-                    # employee should owe LESS money (balance improves)
-                    balance_improvement = -balance_diff
-                    
-                    # Check if this is a home department order or guest order
-                    employee = await db.employees.find_one({"id": order["employee_id"]})
-                    if employee:
-                        employee_home_dept = employee.get("department_id")
-                        order_dept = order.get("department_id")
-                        
-                        print(f"DEBUG: Employee {order['employee_id'][:8]}: home_dept={employee_home_dept}, order_dept={order_dept}, balance_improvement={balance_improvement}")
-                        if employee_home_dept == order_dept:
-                            # HOME DEPARTMENT ORDER: Update main balance
-                            print(f"DEBUG: Updating main balance for home department order")
-                            await db.employees.update_one(
-                                {"id": order["employee_id"]},
-                                {"$inc": {"breakfast_balance": balance_improvement}}
-                            )
-                        else:
-                            # GUEST DEPARTMENT ORDER: Update subaccount balance
-                            print(f"DEBUG: Updating subaccount balance for guest department order")
-                            await update_employee_balance(order["employee_id"], order_dept, 'breakfast', balance_improvement)
-                
-                updated_orders += 1
+    for repricing_department_id in department_ids:
+        plan = await plan_repricing(repricing_department_id, today, today, {"lunch_price": price})
+        await apply_repricing_plan(plan)
+        updated_orders += len(plan["orders"])
     
     return {
         "message": "Lunch-Preis erfolgreich aktualisiert", 
@@ -1521,19 +2598,19 @@ async def get_department_settings(department_id: str):
     if not dept_settings:
         # Create default settings if none exist
         default_settings = DepartmentSettings(department_id=department_id)
-        await db.department_settings.insert_one(default_settings.dict())
+        await db.department_settings.insert_one(price_settings_to_storage(default_settings.dict()))
+        invalidate_price_book(department_id)
         return default_settings
     
-    # Clean the document by removing MongoDB _id field
-    clean_settings = {k: v for k, v in dept_settings.items() if k != '_id'}
-    return clean_settings
+    # API shape: prices in euros, without MongoDB _id
+    return price_settings_to_api(dept_settings)
 
 @api_router.get("/department-settings/{department_id}/boiled-eggs-price")
 async def get_department_boiled_eggs_price(department_id: str):
     """Get boiled eggs price for a specific department"""
     dept_settings = await db.department_settings.find_one({"department_id": department_id})
     if dept_settings:
-        return {"department_id": department_id, "boiled_eggs_price": dept_settings["boiled_eggs_price"]}
+        return {"department_id": department_id, "boiled_eggs_price": price_settings_to_api(dept_settings)["boiled_eggs_price"]}
     else:
         # Return default price if no department-specific settings exist
         return {"department_id": department_id, "boiled_eggs_price": 0.50}
@@ -1548,11 +2625,12 @@ async def update_department_boiled_eggs_price(department_id: str, price: float):
     if dept_settings:
         await db.department_settings.update_one(
             {"department_id": department_id},
-            {"$set": {"boiled_eggs_price": price}}
+            money_update({"boiled_eggs_price": price}, PRICE_SETTINGS_MONEY_FIELDS)
         )
     else:
         new_settings = DepartmentSettings(department_id=department_id, boiled_eggs_price=price)
-        await db.department_settings.insert_one(new_settings.dict())
+        await db.department_settings.insert_one(price_settings_to_storage(new_settings.dict()))
+    invalidate_price_book(department_id)
     
     return {"message": "Abteilungsspezifischer Kochei-Preis erfolgreich aktualisiert", "department_id": department_id, "price": price}
 
@@ -1561,7 +2639,7 @@ async def get_department_fried_eggs_price(department_id: str):
     """Get fried eggs price for a specific department"""
     dept_settings = await db.department_settings.find_one({"department_id": department_id})
     if dept_settings:
-        return {"department_id": department_id, "fried_eggs_price": dept_settings.get("fried_eggs_price", 0.50)}
+        return {"department_id": department_id, "fried_eggs_price": price_settings_to_api(dept_settings).get("fried_eggs_price", 0.50)}
     else:
         # Return default price if no department-specific settings exist
         return {"department_id": department_id, "fried_eggs_price": 0.50}
@@ -1576,11 +2654,12 @@ async def update_department_fried_eggs_price(department_id: str, price: float):
     if dept_settings:
         await db.department_settings.update_one(
             {"department_id": department_id},
-            {"$set": {"fried_eggs_price": price}}
+            money_update({"fried_eggs_price": price}, PRICE_SETTINGS_MONEY_FIELDS)
         )
     else:
         new_settings = DepartmentSettings(department_id=department_id, fried_eggs_price=price)
-        await db.department_settings.insert_one(new_settings.dict())
+        await db.department_settings.insert_one(price_settings_to_storage(new_settings.dict()))
+    invalidate_price_book(department_id)
     
     return {"message": "Abteilungsspezifischer Spiegelei-Preis erfolgreich aktualisiert", "department_id": department_id, "price": price}
 
@@ -1589,7 +2668,7 @@ async def get_department_coffee_price(department_id: str):
     """Get coffee price for a specific department"""
     dept_settings = await db.department_settings.find_one({"department_id": department_id})
     if dept_settings:
-        return {"department_id": department_id, "coffee_price": dept_settings["coffee_price"]}
+        return {"department_id": department_id, "coffee_price": price_settings_to_api(dept_settings)["coffee_price"]}
     else:
         # Return default price if no department-specific settings exist
         return {"department_id": department_id, "coffee_price": 1.50}
@@ -1604,11 +2683,12 @@ async def update_department_coffee_price(department_id: str, price: float):
     if dept_settings:
         await db.department_settings.update_one(
             {"department_id": department_id},
-            {"$set": {"coffee_price": price}}
+            money_update({"coffee_price": price}, PRICE_SETTINGS_MONEY_FIELDS)
         )
     else:
         new_settings = DepartmentSettings(department_id=department_id, coffee_price=price)
-        await db.department_settings.insert_one(new_settings.dict())
+        await db.department_settings.insert_one(price_settings_to_storage(new_settings.dict()))
+    invalidate_price_book(department_id)
     
     return {"message": "Abteilungsspezifischer Kaffee-Preis erfolgreich aktualisiert", "department_id": department_id, "price": price}
 
@@ -1667,11 +2747,12 @@ async def update_boiled_eggs_price(price: float):
     if lunch_settings:
         await db.lunch_settings.update_one(
             {"id": lunch_settings["id"]},
-            {"$set": {"boiled_eggs_price": price}}
+            money_update({"boiled_eggs_price": price}, PRICE_SETTINGS_MONEY_FIELDS)
         )
     else:
         new_settings = LunchSettings(boiled_eggs_price=price)
-        await db.lunch_settings.insert_one(new_settings.dict())
+        await db.lunch_settings.insert_one(price_settings_to_storage(new_settings.dict()))
+    invalidate_price_book()
     
     return {"message": "Kochei-Preis erfolgreich aktualisiert", "price": price}
 
@@ -1685,11 +2766,12 @@ async def update_fried_eggs_price(price: float):
     if lunch_settings:
         await db.lunch_settings.update_one(
             {"id": lunch_settings["id"]},
-            {"$set": {"fried_eggs_price": price}}
+            money_update({"fried_eggs_price": price}, PRICE_SETTINGS_MONEY_FIELDS)
         )
     else:
         new_settings = LunchSettings(fried_eggs_price=price)
-        await db.lunch_settings.insert_one(new_settings.dict())
+        await db.lunch_settings.insert_one(price_settings_to_storage(new_settings.dict()))
+    invalidate_price_book()
     
     return {"message": "Spiegelei-Preis erfolgreich aktualisiert", "price": price}
 
@@ -1705,12 +2787,13 @@ async def update_coffee_price(price: float):
     if lunch_settings:
         await db.lunch_settings.update_one(
             {"id": lunch_settings["id"]},
-            {"$set": {"coffee_price": price}}
+            money_update({"coffee_price": price}, PRICE_SETTINGS_MONEY_FIELDS)
         )
     else:
         # Create new settings if none exist
         new_settings = LunchSettings(price=0.0, enabled=True, boiled_eggs_price=0.50, coffee_price=price)
-        await db.lunch_settings.insert_one(new_settings.dict())
+        await db.lunch_settings.insert_one(price_settings_to_storage(new_settings.dict()))
+    invalidate_price_book()
 
     return {"message": "Kaffee-Preis erfolgreich aktualisiert", "price": price}
 
@@ -1735,12 +2818,12 @@ async def get_daily_lunch_settings(department_id: str):
         if daily_price:
             daily_prices.append({
                 "date": date_str,
-                "lunch_price": daily_price["lunch_price"]
+                "lunch_price": stored_euros(daily_price, "lunch_price")
             })
         else:
             # Fall back to global lunch settings
             lunch_settings = await db.lunch_settings.find_one()
-            default_price = lunch_settings["price"] if lunch_settings else 0.0
+            default_price = stored_euros(lunch_settings, "price") if lunch_settings else 0.0
             daily_prices.append({
                 "date": date_str,
                 "lunch_price": default_price
@@ -1770,7 +2853,7 @@ async def set_daily_lunch_price(department_id: str, date: str, lunch_price: floa
         # Update existing
         await db.daily_lunch_prices.update_one(
             {"department_id": department_id, "date": date},
-            {"$set": {"lunch_price": lunch_price, "lunch_name": lunch_name}}
+            money_update({"lunch_price": lunch_price}, PRICE_SETTINGS_MONEY_FIELDS, {"lunch_name": lunch_name})
         )
     else:
         # Create new
@@ -1780,79 +2863,20 @@ async def set_daily_lunch_price(department_id: str, date: str, lunch_price: floa
             lunch_price=lunch_price,
             lunch_name=lunch_name
         )
-        await db.daily_lunch_prices.insert_one(daily_price.dict())
+        await db.daily_lunch_prices.insert_one(price_settings_to_storage(daily_price.dict()))
+    invalidate_price_book(department_id)
     
-    # Now retroactively update all lunch orders from that specific day (Berlin timezone)
-    start_of_day_utc, end_of_day_utc = get_berlin_day_bounds(date)
-    
-    updated_orders = 0
-    
-    # Find all NON-CANCELLED breakfast orders with lunch from that day
-    # Use $or to handle missing is_cancelled field, null, false, and exclude true
-    orders_cursor = db.orders.find({
-        "department_id": department_id,
-        "order_type": "breakfast", 
-        "has_lunch": True,
-        "$or": [
-            {"is_cancelled": {"$exists": False}},  # Field doesn't exist
-            {"is_cancelled": None},                # Field is null
-            {"is_cancelled": False}                # Field is false
-        ],
-        "timestamp": {
-            "$gte": start_of_day_utc.isoformat(),
-            "$lte": end_of_day_utc.isoformat()
-        }
-    })
-    
-    async for order in orders_cursor:
-        # Get current lunch price from order
-        current_lunch_price = order.get("lunch_price", 0.0)
-        price_difference = lunch_price - current_lunch_price
-        
-        if abs(price_difference) > 0.01:  # Only update if significant difference
-            # Update order
-            new_total = order["total_price"] + price_difference
-            await db.orders.update_one(
-                {"id": order["id"]},
-                {
-                    "$set": {
-                        "lunch_price": lunch_price,
-                        "total_price": new_total
-                    }
-                }
-            )
-            
-            # Update employee balance (lunch goes to breakfast_balance)
-            # If price increases (+price_difference), balance should decrease (-price_difference)
-            
-            # KORRIGIERT: Check if this is a home department order or guest order
-            employee = await db.employees.find_one({"id": order["employee_id"]})
-            if employee:
-                employee_home_dept = employee.get("department_id")
-                order_dept = order.get("department_id", department_id)
-                
-                print(f"DEBUG DAILY: Order {order['id'][:8]}: employee_home={employee_home_dept}, order_dept={order_dept}, price_diff={price_difference}")
-                
-                if employee_home_dept == order_dept:
-                    # HOME DEPARTMENT ORDER: Update main balance
-                    print(f"DEBUG DAILY: Updating main balance by {-price_difference}")
-                    await db.employees.update_one(
-                        {"id": order["employee_id"]},
-                        {"$inc": {"breakfast_balance": -price_difference}}
-                    )
-                else:
-                    # GUEST DEPARTMENT ORDER: Update subaccount balance
-                    print(f"DEBUG DAILY: Updating subaccount balance by {-price_difference}")
-                    await update_employee_balance(order["employee_id"], order_dept, 'breakfast', -price_difference)
-            
-            updated_orders += 1
+    # Now retroactively update all lunch orders from that specific day (Berlin business day)
+    plan = await plan_repricing(department_id, date, date, {"lunch_price": lunch_price})
+    await apply_repricing_plan(plan)
     
     return {
         "message": "Tages-Mittagessen-Preis erfolgreich gesetzt",
         "date": date,
         "lunch_price": lunch_price,
         "lunch_name": lunch_name,
-        "updated_orders": updated_orders
+        "updated_orders": len(plan["orders"]),
+        "employee_impact": plan["employees"]
     }
 
 @api_router.get("/daily-lunch-price/{department_id}/{date}")
@@ -1868,35 +2892,264 @@ async def get_daily_lunch_price(department_id: str, date: str):
     if daily_price:
         return {
             "date": date, 
-            "lunch_price": daily_price["lunch_price"],
+            "lunch_price": stored_euros(daily_price, "lunch_price"),
             "lunch_name": daily_price.get("lunch_name", "")
         }
     else:
         # NEW: Always return 0.0 for new days - admin must set price manually each day
         return {"date": date, "lunch_price": 0.0, "lunch_name": ""}
 
+# ===== RETROACTIVE REPRICING =====
+# Any price change (rolls, toppings, eggs, coffee, lunch) can be applied to the orders of a
+# day range. Orders don't store their unit prices (except lunch_price), so the new total is
+# the old total plus the difference of the items priced at the new vs. the current prices -
+# only the changed components move. The plan is computed in memory in one pass and returned
+# as a diff; applying it writes orders and balances with one bulk_write per collection.
+REPRICING_MAX_DAYS = 366
+
+class RepricingRequest(BaseModel):
+    start_date: Optional[str] = None  # YYYY-MM-DD (Berlin business day), default today
+    end_date: Optional[str] = None  # YYYY-MM-DD, default start_date
+    roll_prices: Dict[str, float] = {}  # roll_type -> price per half
+    topping_prices: Dict[str, float] = {}  # topping_type -> price
+    boiled_eggs_price: Optional[float] = None
+    fried_eggs_price: Optional[float] = None
+    coffee_price: Optional[float] = None
+    lunch_price: Optional[float] = None  # Daily lunch price for every day of the range
+    dry_run: bool = True
+
+def repricing_changes(request: RepricingRequest):
+    """Price changes of a request as {component: price(s)}, only what was given"""
+    changes = {}
+    if request.roll_prices:
+        changes["rolls"] = dict(request.roll_prices)
+    if request.topping_prices:
+        changes["toppings"] = dict(request.topping_prices)
+    for field in ("boiled_eggs_price", "fried_eggs_price", "coffee_price", "lunch_price"):
+        if getattr(request, field) is not None:
+            changes[field] = getattr(request, field)
+    return changes
+
+async def plan_repricing(department_id: str, start_date: str, end_date: str, changes):
+    """Diff of repricing all non-cancelled breakfast orders of a department and day range
+
+    Returns {"orders": [...], "employees": [...], "total_difference": euros, ...} plus the
+    internal "_repriced" list consumed by apply_repricing_plan.
+    """
+    price_book = await get_price_book(department_id)
+    
+    orders = [order_to_api(order) for order in await db.orders.find({
+        "department_id": department_id,
+        "order_type": "breakfast",
+        "business_date": {"$gte": start_date, "$lte": end_date},
+        "is_sponsor_order": {"$ne": True},
+        "$or": [{"is_cancelled": {"$exists": False}}, {"is_cancelled": None}, {"is_cancelled": False}]
+    }, {"_id": 0}).to_list(None)]
+    
+    # Lunch was charged at the price stored on the order and keeps it unless the lunch price changes
+    new_prices = unit_prices(price_book, changes)
+    repriced = []
+    for order, old_breakdown in zip(orders, price_orders(orders, unit_prices(price_book))):
+        new_breakdown = price_items(
+            order.get("breakfast_items"), new_prices, changes.get("lunch_price", from_cents(old_breakdown["lunch"]))
+        )
+        difference_cents = new_breakdown["total"] - old_breakdown["total"]
+        new_lunch_price = changes.get("lunch_price", order.get("lunch_price") or 0.0)
+        lunch_changed = order.get("has_lunch") and to_cents(new_lunch_price) != to_cents(order.get("lunch_price"))
+        if difference_cents or lunch_changed:
+            updates = {"total_price": from_cents(to_cents(order["total_price"]) + difference_cents)}
+            if lunch_changed:
+                updates["lunch_price"] = new_lunch_price
+            repriced.append((order, updates, difference_cents))
+    
+    employees = await load_employees_by_ids(order["employee_id"] for order, _, _ in repriced)
+    impact = {}
+    for order, _, difference_cents in repriced:
+        employee_impact = impact.setdefault(order["employee_id"], {"order_ids": [], "balance_change_cents": 0})
+        employee_impact["order_ids"].append(order["id"])
+        employee_impact["balance_change_cents"] -= difference_cents  # a price increase lowers the balance
+    
+    return {
+        "department_id": department_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "orders": [
+            {
+                "order_id": order["id"],
+                "employee_id": order["employee_id"],
+                "business_date": order.get("business_date"),
+                "old_total": order["total_price"],
+                "new_total": updates["total_price"],
+                "difference": from_cents(difference_cents),
+                "is_sponsored": order.get("is_sponsored", False)
+            }
+            for order, updates, difference_cents in repriced
+        ],
+        "employees": [
+            {
+                "employee_id": employee_id,
+                "employee_name": employees[employee_id].get("name", "Unbekannt") if employee_id in employees else "Unbekannt",
+                "updated_orders": len(entry["order_ids"]),
+                "balance_change": from_cents(entry["balance_change_cents"])
+            }
+            for employee_id, entry in impact.items()
+        ],
+        "total_difference": from_cents(sum(difference_cents for _, _, difference_cents in repriced)),
+        "_repriced": repriced,
+        "_employees": employees
+    }
+
+async def apply_repricing_plan(plan):
+    """Write a plan: one bulk_write on orders, rollup deltas per day, one bulk balance update"""
+    repriced = plan["_repriced"]
+    if not repriced:
+        return
+    
+    await db.orders.bulk_write([
+        UpdateOne({"id": order["id"]}, money_update(updates, ORDER_MONEY_FIELDS)) for order, updates, _ in repriced
+    ], ordered=False)
+    
+    rollup_deltas = {}
+    for order, updates, _ in repriced:
+        delta = rollup_deltas.setdefault(order.get("business_date"), {})
+        old_contribution = rollup_contribution(order)
+        new_contribution = rollup_contribution({**order, **updates})
+        for field in set(old_contribution) | set(new_contribution):
+            delta[field] = delta.get(field, 0) + new_contribution.get(field, 0) - old_contribution.get(field, 0)
+    for business_date, delta in rollup_deltas.items():
+        await apply_rollup_delta(plan["department_id"], business_date, {field: amount for field, amount in delta.items() if amount})
+    for order, updates, _ in repriced:
+        publish_order_event({**order, **updates}, "order_updated")
+    
+    # Lunch goes to the breakfast balance as well. Home department orders hit the main
+    # balance, guest orders the subaccount.
+    employees = plan["_employees"]
+    increments_by_employee = {}
+    order_ids = {}
+    for order, _, difference_cents in repriced:
+        employee = employees.get(order["employee_id"])
+        if not employee or not difference_cents:
+            continue
+        increments_by_employee[employee["id"]] = merge_increments(
+            increments_by_employee.get(employee["id"], {}),
+            balance_increments(employee, plan["department_id"], 'breakfast', -from_cents(difference_cents))
+        )
+        order_ids.setdefault(employee["id"], []).append(order["id"])
+    await apply_bulk_balance_increments(
+        increments_by_employee,
+        kind="repricing",
+        reference_ids={employee_id: ",".join(ids) for employee_id, ids in order_ids.items()},
+        employees=employees
+    )
+
+async def save_repricing_prices(department_id: str, changes, business_dates):
+    """Persist the new prices of a repricing in menus, department settings and daily lunch prices"""
+    for roll_type, price in changes.get("rolls", {}).items():
+        await db.menu_breakfast.update_one({"department_id": department_id, "roll_type": roll_type}, money_update({"price": price}, MENU_MONEY_FIELDS))
+    for topping_type, price in changes.get("toppings", {}).items():
+        await db.menu_toppings.update_one({"department_id": department_id, "topping_type": topping_type}, money_update({"price": price}, MENU_MONEY_FIELDS))
+    
+    settings_fields = {field: changes[field] for field in ("boiled_eggs_price", "fried_eggs_price", "coffee_price") if field in changes}
+    if settings_fields:
+        dept_settings = await db.department_settings.find_one({"department_id": department_id})
+        if dept_settings:
+            await db.department_settings.update_one({"department_id": department_id}, money_update(settings_fields, PRICE_SETTINGS_MONEY_FIELDS))
+        else:
+            await db.department_settings.insert_one(price_settings_to_storage(DepartmentSettings(department_id=department_id, **settings_fields).dict()))
+    
+    if "lunch_price" in changes:
+        for business_date in business_dates:
+            await db.daily_lunch_prices.update_one(
+                {"department_id": department_id, "date": business_date},
+                {
+                    **money_update({"lunch_price": changes["lunch_price"]}, PRICE_SETTINGS_MONEY_FIELDS),
+                    "$setOnInsert": {"id": str(uuid.uuid4()), "lunch_name": ""}
+                },
+                upsert=True
+            )
+    invalidate_price_book(department_id)
+
+@api_router.post("/department-admin/repricing/{department_id}")
+async def reprice_orders(department_id: str, request: RepricingRequest):
+    """Department Admin: Change prices retroactively for a day range
+
+    dry_run (default) only returns the diff (orders, employees, balance changes). Otherwise
+    the new prices are saved and the same diff is applied to orders and balances.
+    """
+    try:
+        start_date = request.start_date or get_berlin_date().isoformat()
+        end_date = request.end_date or start_date
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Ungültiges Datumsformat. Verwenden Sie YYYY-MM-DD.")
+        if end < start:
+            raise HTTPException(status_code=400, detail="Das Enddatum muss nach dem Startdatum liegen")
+        if (end - start).days >= REPRICING_MAX_DAYS:
+            raise HTTPException(status_code=400, detail=f"Maximal {REPRICING_MAX_DAYS} Tage pro Preisanpassung")
+        
+        changes = repricing_changes(request)
+        if not changes:
+            raise HTTPException(status_code=400, detail="Keine Preisänderung angegeben")
+        prices = [*changes.get("rolls", {}).values(), *changes.get("toppings", {}).values(),
+                  *(price for field, price in changes.items() if field not in ("rolls", "toppings"))]
+        if any(price < 0 for price in prices):
+            raise HTTPException(status_code=400, detail="Preis muss mindestens 0.00 € betragen")
+        
+        price_book = await get_price_book(department_id)
+        unknown_items = [roll_type for roll_type in changes.get("rolls", {}) if roll_type not in price_book.breakfast_prices]
+        unknown_items += [topping for topping in changes.get("toppings", {}) if topping not in price_book.topping_prices]
+        if unknown_items:
+            raise HTTPException(status_code=404, detail=f"Artikel nicht gefunden: {', '.join(unknown_items)}")
+        
+        plan = await plan_repricing(department_id, start_date, end_date, changes)
+        if not request.dry_run:
+            business_dates = [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+            await save_repricing_prices(department_id, changes, business_dates)
+            await apply_repricing_plan(plan)
+        
+        return {
+            "message": "Vorschau der Preisanpassung" if request.dry_run else "Preisanpassung erfolgreich durchgeführt",
+            "dry_run": request.dry_run,
+            **{key: value for key, value in plan.items() if not key.startswith("_")}
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler bei der Preisanpassung: {str(e)}")
+
 # Menu routes
 @api_router.get("/menu/breakfast/{department_id}", response_model=List[MenuItemBreakfast])
 async def get_breakfast_menu(department_id: str):
     """Get breakfast menu items for a specific department"""
     items = await db.menu_breakfast.find({"department_id": department_id}).to_list(100)
-    return [MenuItemBreakfast(**item) for item in items]
+    return [MenuItemBreakfast(**menu_item_to_api(item)) for item in items]
 
 @api_router.get("/menu/toppings/{department_id}", response_model=List[MenuItemToppings])
 async def get_toppings_menu(department_id: str):
     """Get topping menu items for a specific department"""
     items = await db.menu_toppings.find({"department_id": department_id}).to_list(100)
-    return [MenuItemToppings(**item) for item in items]
+    return [MenuItemToppings(**menu_item_to_api(item)) for item in items]
 
 @api_router.get("/menu/drinks/{department_id}", response_model=List[MenuItemDrink])
 async def get_drinks_menu(department_id: str):
     """Get drink menu items for a specific department"""
     items = await db.menu_drinks.find({"department_id": department_id}).to_list(100)
-    return [MenuItemDrink(**item) for item in items]
+    return [MenuItemDrink(**menu_item_to_api(item)) for item in items]
 
 @api_router.get("/departments/{department_id}/employees-with-subaccount-balances")
 async def get_employees_with_subaccount_balances(department_id: str):
-    """OPTIMIERT: Get all employees with non-zero subaccount balances in the specified department in one API call"""
+    """OPTIMIERT: Get all employees with non-zero subaccount balances in the specified department in one API call
+
+    Coalesced per department, every balance change (ledger entry) invalidates the result.
+    """
+    return await coalesced(
+        ("employees-with-subaccount-balances", department_id),
+        lambda: load_employees_with_subaccount_balances(department_id)
+    )
+
+async def load_employees_with_subaccount_balances(department_id: str):
     try:
         # Find all employees who have non-zero subaccount balances in the specified department
         pipeline = [
@@ -1910,8 +3163,8 @@ async def get_employees_with_subaccount_balances(department_id: str):
                     "current_dept_balance": f"$subaccount_balances.{department_id}",
                     "has_balance": {
                         "$or": [
-                            {"$ne": [f"$subaccount_balances.{department_id}.breakfast", 0]},
-                            {"$ne": [f"$subaccount_balances.{department_id}.drinks", 0]}
+                            {"$ne": [mongo_stored_cents_expression(account, f"subaccount_balances.{department_id}."), 0]}
+                            for account in SUBACCOUNT_ACCOUNTS
                         ]
                     }
                 }
@@ -1933,7 +3186,8 @@ async def get_employees_with_subaccount_balances(department_id: str):
         # Format response
         result = []
         for employee in employees:
-            current_dept_balance = employee.get("current_dept_balance", {"breakfast": 0, "drinks": 0})
+            current_dept_balance = employee.get("current_dept_balance") or {}
+            current_dept_balance = {account: from_cents(stored_cents(current_dept_balance, account)) for account in SUBACCOUNT_ACCOUNTS}
             result.append({
                 "id": employee["id"],
                 "name": employee["name"],
@@ -1962,33 +3216,36 @@ async def get_8h_service_employees(department_id: str):
         # Find all 8H-Service employees
         employees = await db.employees.find({"is_8h_service": True}).sort("sort_order", 1).to_list(100)
         
-        # Format response with subaccount balance for the requested department
-        result = []
-        for emp in employees:
-            emp = initialize_subaccount_balances(emp)
-            subaccount = emp.get('subaccount_balances', {}).get(department_id, {"breakfast": 0.0, "drinks": 0.0})
-            
-            result.append({
-                "id": emp["id"],
-                "name": emp["name"],
-                "department_id": emp.get("department_id"),
-                "is_8h_service": True,
-                "subaccount_breakfast_balance": subaccount.get("breakfast", 0.0),
-                "subaccount_drinks_balance": subaccount.get("drinks", 0.0),
-                "total_subaccount_balance": subaccount.get("breakfast", 0.0) + subaccount.get("drinks", 0.0)
-            })
-        
-        return result
+        return eight_hour_employee_entries(employees, department_id)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Laden der 8H-Mitarbeiter: {str(e)}")
 
+def eight_hour_employee_entries(employees, department_id):
+    """8H-Service employees with their subaccount balance for the requested department"""
+    result = []
+    for emp in employees:
+        emp = employee_to_api(emp)
+        subaccount = emp['subaccount_balances'].get(department_id, {"breakfast": 0.0, "drinks": 0.0})
+        
+        result.append({
+            "id": emp["id"],
+            "name": emp["name"],
+            "department_id": emp.get("department_id"),
+            "is_8h_service": True,
+            "subaccount_breakfast_balance": subaccount.get("breakfast", 0.0),
+            "subaccount_drinks_balance": subaccount.get("drinks", 0.0),
+            "total_subaccount_balance": round_to_cents(subaccount.get("breakfast", 0.0) + subaccount.get("drinks", 0.0))
+        })
+    
+    return result
+
 
 @api_router.get("/menu/sweets/{department_id}", response_model=List[MenuItemSweet])
 async def get_sweets_menu(department_id: str):
     """Get sweet menu items for a specific department"""
     items = await db.menu_sweets.find({"department_id": department_id}).to_list(100)
-    return [MenuItemSweet(**item) for item in items]
+    return [MenuItemSweet(**menu_item_to_api(item)) for item in items]
 
 # Backward compatibility endpoints (will use first department if no department specified)
 @api_router.get("/menu/breakfast", response_model=List[MenuItemBreakfast])
@@ -1999,7 +3256,7 @@ async def get_breakfast_menu_compat():
     if not dept:
         return []
     items = await db.menu_breakfast.find({"department_id": dept["id"]}).to_list(100)
-    return [MenuItemBreakfast(**item) for item in items]
+    return [MenuItemBreakfast(**menu_item_to_api(item)) for item in items]
 
 @api_router.get("/menu/toppings", response_model=List[MenuItemToppings])
 async def get_toppings_menu_compat():
@@ -2008,7 +3265,7 @@ async def get_toppings_menu_compat():
     if not dept:
         return []
     items = await db.menu_toppings.find({"department_id": dept["id"]}).to_list(100)
-    return [MenuItemToppings(**item) for item in items]
+    return [MenuItemToppings(**menu_item_to_api(item)) for item in items]
 
 @api_router.get("/menu/drinks", response_model=List[MenuItemDrink])
 async def get_drinks_menu_compat():
@@ -2017,7 +3274,7 @@ async def get_drinks_menu_compat():
     if not dept:
         return []
     items = await db.menu_drinks.find({"department_id": dept["id"]}).to_list(100)
-    return [MenuItemDrink(**item) for item in items]
+    return [MenuItemDrink(**menu_item_to_api(item)) for item in items]
 
 @api_router.get("/menu/sweets", response_model=List[MenuItemSweet])
 async def get_sweets_menu_compat():
@@ -2026,118 +3283,198 @@ async def get_sweets_menu_compat():
     if not dept:
         return []
     items = await db.menu_sweets.find({"department_id": dept["id"]}).to_list(100)
-    return [MenuItemSweet(**item) for item in items]
+    return [MenuItemSweet(**menu_item_to_api(item)) for item in items]
+
+# ===== IDEMPOTENCY KEYS =====
+# Clients (tablets on flaky Wi-Fi) may send an Idempotency-Key header with writes that must
+# not run twice. The first request claims (scope, key) in idempotency_keys, stores its
+# response when done, and every replay gets that stored response without a second insert or
+# balance change. Keys expire via a TTL index after IDEMPOTENCY_KEY_TTL_SECONDS.
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_PENDING_TIMEOUT_SECONDS = 60  # a claim older than this is from a crashed request
+
+IDEMPOTENCY_FAILED_DETAIL = "Diese Anfrage ist nach einer bereits gespeicherten Buchung fehlgeschlagen und darf nicht wiederholt werden"
+
+class IdempotencyClaim:
+    """Handed to run_idempotent handlers, which call mark_persisted() after their first write
+    that must not run twice (order insert, balance update)"""
+
+    def __init__(self):
+        self.persisted = False
+        self.response = None
+
+    def mark_persisted(self, response=None):
+        """From here on a failure doesn't release the key; replays get response (if given)"""
+        self.persisted = True
+        self.response = response
+
+def request_fingerprint(payload):
+    """Stable hash of a request payload, detects a key reused for a different request"""
+    return hashlib.sha256(json.dumps(jsonable_encoder(payload), sort_keys=True, default=str).encode()).hexdigest()
+
+async def run_idempotent(idempotency_key, scope, payload, handler):
+    """Run handler(claim) at most once per (scope, key) and return its (stored) response
+
+    Without a key the handler just runs. A handler that fails before claim.mark_persisted()
+    releases the key so the client can retry. Failing after it, the key keeps the response
+    passed to mark_persisted (replays get it) or the status "failed" (replays get a 409).
+    A replay while the first request is still running gets a 409 as well.
+    """
+    if not idempotency_key:
+        return await handler(IdempotencyClaim())
+    
+    fingerprint = request_fingerprint(payload)
+    now = datetime.now(timezone.utc)
+    claim = {
+        "scope": scope,
+        "key": idempotency_key,
+        "fingerprint": fingerprint,
+        "status": "pending",
+        "created_at": now  # native date, required by the TTL index
+    }
+    try:
+        await db.idempotency_keys.insert_one(claim)
+    except DuplicateKeyError:
+        existing = await db.idempotency_keys.find_one({"scope": scope, "key": idempotency_key})
+        if existing is None:
+            return await run_idempotent(idempotency_key, scope, payload, handler)  # expired meanwhile
+        if existing["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=409, detail="Idempotency-Key wurde bereits für eine andere Anfrage verwendet")
+        if existing["status"] == "completed":
+            return existing["response"]
+        if existing["status"] == "failed":
+            raise HTTPException(status_code=409, detail=IDEMPOTENCY_FAILED_DETAIL)
+        stale_before = now - timedelta(seconds=IDEMPOTENCY_PENDING_TIMEOUT_SECONDS)
+        taken_over = await db.idempotency_keys.update_one(
+            {"_id": existing["_id"], "status": "pending", "created_at": {"$lt": stale_before}},
+            {"$set": {"created_at": now}}
+        )
+        if taken_over.modified_count == 0:
+            raise HTTPException(status_code=409, detail="Diese Anfrage wird bereits verarbeitet")
+        claim["created_at"] = now
+    
+    handler_claim = IdempotencyClaim()
+    try:
+        response = await handler(handler_claim)
+    except Exception as e:
+        if not handler_claim.persisted:
+            await db.idempotency_keys.delete_one({"scope": scope, "key": idempotency_key, "status": "pending"})
+        elif handler_claim.response is not None:
+            await complete_idempotency_keys(scope, {idempotency_key: handler_claim.response})
+        else:
+            await db.idempotency_keys.update_one(
+                {"scope": scope, "key": idempotency_key},
+                {"$set": {"status": "failed", "error": str(e), "completed_at": datetime.now(timezone.utc)}}
+            )
+        raise
+    
+    response = jsonable_encoder(response)
+    await db.idempotency_keys.update_one(
+        {"scope": scope, "key": idempotency_key},
+        {"$set": {"status": "completed", "response": response, "completed_at": datetime.now(timezone.utc)}}
+    )
+    return response
+
+async def claim_idempotency_keys(scope, fingerprints):
+    """Batch variant of run_idempotent's claim: {key: fingerprint} -> {key: (state, response)}
+
+    state is "claimed" (go ahead, complete or release it later), "completed" (replay the
+    stored response), "pending" (another request is processing it), "failed" (failed after
+    persisting, see run_idempotent) or "conflict" (the key was used for a different request).
+    One insert_many plus one lookup for existing keys.
+    """
+    if not fingerprints:
+        return {}
+    now = datetime.now(timezone.utc)
+    keys = list(fingerprints)
+    claims = [
+        {"scope": scope, "key": key, "fingerprint": fingerprints[key], "status": "pending", "created_at": now}
+        for key in keys
+    ]
+    taken = set()
+    try:
+        await db.idempotency_keys.insert_many(claims, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            if error.get("code") != 11000:
+                raise
+            taken.add(keys[error["index"]])
+    
+    states = {key: ("claimed", None) for key in keys if key not in taken}
+    if taken:
+        async for existing in db.idempotency_keys.find({"scope": scope, "key": {"$in": list(taken)}}):
+            if existing["fingerprint"] != fingerprints[existing["key"]]:
+                states[existing["key"]] = ("conflict", None)
+            elif existing["status"] == "completed":
+                states[existing["key"]] = ("completed", existing["response"])
+            elif existing["status"] == "failed":
+                states[existing["key"]] = ("failed", None)
+            else:
+                states[existing["key"]] = ("pending", None)
+        for key in taken - set(states):
+            states[key] = ("pending", None)  # expired between insert and lookup - let the client retry
+    return states
+
+async def complete_idempotency_keys(scope, responses):
+    """Store the responses of claimed keys ({key: response}) with one bulk_write"""
+    if not responses:
+        return
+    completed_at = datetime.now(timezone.utc)
+    await db.idempotency_keys.bulk_write([
+        UpdateOne(
+            {"scope": scope, "key": key},
+            {"$set": {"status": "completed", "response": jsonable_encoder(response), "completed_at": completed_at}}
+        )
+        for key, response in responses.items()
+    ], ordered=False)
+
+async def release_idempotency_keys(scope, keys):
+    """Drop pending claims of failed requests so the client can retry them"""
+    if keys:
+        await db.idempotency_keys.delete_many({"scope": scope, "key": {"$in": list(keys)}, "status": "pending"})
 
 # Order routes
+
+# Latency budget for placing an order (server side, reads + writes). Slower orders are logged;
+# benchmark_create_order.py measures it end to end and fails when the p95 exceeds it.
+ORDER_LATENCY_BUDGET_MS = float(os.environ.get('ORDER_LATENCY_BUDGET_MS', '150'))
+
 @api_router.post("/orders", response_model=Order)
-async def create_order(order_data: OrderCreate):
-    """Create a new order and update employee balance"""
-    
+async def create_order(order_data: OrderCreate, idempotency_key: Optional[str] = Header(None)):
+    """Create a new order and update employee balance
+
+    With an Idempotency-Key header a retried submission returns the original order.
+    """
+    return await run_idempotent(idempotency_key, "orders", order_data, lambda claim: place_order(order_data, claim))
+
+def check_breakfast_ordering_open(breakfast_status, sponsoring_status):
+    """Raise the 403 for a closed breakfast or ordering blocked after sponsoring"""
     # For breakfast orders, check if breakfast is closed
-    if order_data.order_type == OrderType.BREAKFAST:
-        # Use Berlin timezone for date calculation
-        today = get_berlin_date().isoformat()
-        breakfast_status = await db.breakfast_settings.find_one({
-            "department_id": order_data.department_id,
-            "date": today
-        })
-        
-        # Auto-reopen breakfast if it's a new day (Berlin time)
-        if breakfast_status and breakfast_status["is_closed"]:
-            # Check if the breakfast was closed on a previous day
-            closed_date = breakfast_status.get("date", today)
-            if closed_date != today:
-                # New day - automatically reopen breakfast
-                await db.breakfast_settings.update_one(
-                    {"department_id": order_data.department_id, "date": closed_date},
-                    {"$set": {"is_closed": False, "closed_by": "", "closed_at": None}}
-                )
-                breakfast_status = None  # Treat as open
-        
-        if breakfast_status and breakfast_status["is_closed"]:
-            raise HTTPException(
-                status_code=403, 
-                detail="Frühstücksbestellungen sind für heute geschlossen. Nur Admins können noch Änderungen vornehmen."
-            )
-    
+    if breakfast_status and breakfast_status["is_closed"]:
+        raise HTTPException(
+            status_code=403, 
+            detail="Frühstücksbestellungen sind für heute geschlossen. Nur Admins können noch Änderungen vornehmen."
+        )
+
     # Check if ordering is blocked due to sponsoring (only for breakfast/lunch)
-    if order_data.order_type == OrderType.BREAKFAST:
-        sponsoring_status = await db.sponsoring_settings.find_one({
-            "department_id": order_data.department_id,
-            "date": today
-        })
-        
-        if sponsoring_status and sponsoring_status["is_blocked"]:
-            blocked_reason = sponsoring_status.get("blocked_reason", "Frühstück/Mittag-Bestellungen sind nach Sponsoring gesperrt.")
-            raise HTTPException(
-                status_code=403, 
-                detail=f"{blocked_reason} Nur Getränke und Snacks können noch bestellt werden."
-            )
-        
-        # Check for existing breakfast order today (single breakfast order constraint)
-        # Use Berlin timezone for day boundaries
-        start_of_day_utc, end_of_day_utc = get_berlin_day_bounds(today)
-        
-        existing_breakfast = await db.orders.find_one({
-            "employee_id": order_data.employee_id,
-            "order_type": "breakfast",
-            "is_cancelled": {"$ne": True},  # Only check non-cancelled orders
-            "timestamp": {
-                "$gte": start_of_day_utc.isoformat(),
-                "$lte": end_of_day_utc.isoformat()
-            }
-        })
-        
-        if existing_breakfast:
-            # Get department name for better error message
-            existing_dept = await db.departments.find_one({"id": existing_breakfast["department_id"]})
-            existing_dept_name = existing_dept["department_name"] if existing_dept else "einer anderen Wachabteilung"
-            
-            current_dept = await db.departments.find_one({"id": order_data.department_id})
-            current_dept_name = current_dept["department_name"] if current_dept else "dieser Wachabteilung"
-            
-            # Check if trying to order in same or different department
-            if existing_breakfast["department_id"] == order_data.department_id:
-                error_msg = f"Sie haben bereits eine Frühstücksbestellung für heute in {current_dept_name}. Bitte bearbeiten Sie Ihre bestehende Bestellung."
-            else:
-                error_msg = f"Sie haben bereits eine Frühstücksbestellung für heute in {existing_dept_name}. Pro Tag ist nur eine Frühstücksbestellung möglich, auch über verschiedene Wachabteilungen hinweg. Bitte bearbeiten oder löschen Sie Ihre Bestellung in {existing_dept_name}, bevor Sie in {current_dept_name} bestellen."
-            
-            raise HTTPException(
-                status_code=400,
-                detail=error_msg
-            )
-    
-    # Calculate total price (rest of the existing logic...)
+    if sponsoring_status and sponsoring_status["is_blocked"]:
+        blocked_reason = sponsoring_status.get("blocked_reason", "Frühstück/Mittag-Bestellungen sind nach Sponsoring gesperrt.")
+        raise HTTPException(
+            status_code=403, 
+            detail=f"{blocked_reason} Nur Getränke und Snacks können noch bestellt werden."
+        )
+
+def price_order(order_data: OrderCreate, price_book: PriceBook, lunch_price: float):
+    """Validate the items of an order and price them with a price book
+
+    Returns (total_price, has_lunch, lunch_price stored on the order). Drinks and sweets
+    are negative (employee debt). Raises HTTPException(400) for invalid breakfast items.
+    """
     total_price = 0.0
+    order_has_lunch = False
+    order_lunch_price = None
     
     if order_data.order_type == OrderType.BREAKFAST and order_data.breakfast_items:
-        # Get department-specific breakfast menu prices and lunch settings
-        breakfast_menu = await db.menu_breakfast.find({"department_id": order_data.department_id}).to_list(100)
-        toppings_menu = await db.menu_toppings.find({"department_id": order_data.department_id}).to_list(100)
-        lunch_settings = await db.lunch_settings.find_one()
-        
-        breakfast_prices = {item["roll_type"]: item["price"] for item in breakfast_menu}
-        topping_prices = {item["topping_type"]: item["price"] for item in toppings_menu}
-        
-        # Get daily lunch price for today (Berlin timezone)
-        today = get_berlin_date().strftime('%Y-%m-%d')
-        daily_price = await db.daily_lunch_prices.find_one({
-            "department_id": order_data.department_id,
-            "date": today
-        })
-        
-        if daily_price:
-            lunch_price = daily_price["lunch_price"]
-        else:
-            # NEW: Default to 0.0 for new days - admin must set price manually each day
-            lunch_price = 0.0
-        
-        # Get department-specific prices
-        department_prices = await get_department_prices(order_data.department_id)
-        boiled_eggs_price = department_prices["boiled_eggs_price"]
-        fried_eggs_price = department_prices["fried_eggs_price"]
-        coffee_price = department_prices["coffee_price"]
-        
         for breakfast_item in order_data.breakfast_items:
             # Allow orders without rolls (just eggs, coffee and/or lunch)
             has_rolls = breakfast_item.total_halves > 0
@@ -2163,68 +3500,117 @@ async def create_order(order_data: OrderCreate):
                         status_code=400, 
                         detail=f"Anzahl der Beläge ({len(breakfast_item.toppings)}) muss der Anzahl der Brötchenhälften ({breakfast_item.total_halves}) entsprechen"
                     )
-            
-            # Calculate roll prices only if rolls are selected
-            if has_rolls:
-                white_price = breakfast_prices.get("weiss", 0.0)
-                seeded_price = breakfast_prices.get("koerner", 0.0)
-                total_price += (white_price * breakfast_item.white_halves) + (seeded_price * breakfast_item.seeded_halves)
-                
-                # Toppings price (free but keep structure)
-                for topping in breakfast_item.toppings:
-                    topping_price = topping_prices.get(topping, 0.0)
-                    total_price += topping_price
-            
-            # Lunch price calculation (can be without rolls now)
-            if breakfast_item.has_lunch:
-                # Lunch price should be added once per order, not multiplied by roll halves
-                total_price += lunch_price
-            
-            # Boiled eggs price
-            if breakfast_item.boiled_eggs > 0:
-                total_price += boiled_eggs_price * breakfast_item.boiled_eggs
-            
-            # Fried eggs price
-            if breakfast_item.fried_eggs > 0:
-                total_price += fried_eggs_price * breakfast_item.fried_eggs
-            
-            # Coffee price (daily flat rate)
-            if breakfast_item.has_coffee:
-                total_price += coffee_price
+        
+        breakdown = price_items([item.dict() for item in order_data.breakfast_items], unit_prices(price_book), lunch_price)
+        total_price = from_cents(breakdown["total"])
+        if any(item.has_lunch for item in order_data.breakfast_items):
+            order_has_lunch = True
+            order_lunch_price = lunch_price
     
     elif order_data.order_type == OrderType.DRINKS and order_data.drink_items:
-        drinks_menu = await db.menu_drinks.find({"department_id": order_data.department_id}).to_list(100)
-        drink_prices = {item["id"]: item["price"] for item in drinks_menu}
-        
-        for drink_id, quantity in order_data.drink_items.items():
-            drink_price = drink_prices.get(drink_id, 0.0)
-            total_price += drink_price * quantity
-        
         # Store drinks orders as negative amounts (representing employee debt)
-        total_price = -total_price
+        total_price = from_cents(-price_quantities(order_data.drink_items, price_book.drink_prices))
             
     elif order_data.order_type == OrderType.SWEETS and order_data.sweet_items:
-        sweets_menu = await db.menu_sweets.find({"department_id": order_data.department_id}).to_list(100)
-        sweet_prices = {item["id"]: item["price"] for item in sweets_menu}
-        
-        for sweet_id, quantity in order_data.sweet_items.items():
-            sweet_price = sweet_prices.get(sweet_id, 0.0)
-            total_price += sweet_price * quantity
-        
         # Store sweets orders as negative amounts (representing employee debt)
-        total_price = -total_price
+        total_price = from_cents(-price_quantities(order_data.sweet_items, price_book.sweet_prices))
     
-    # Create order
-    order_has_lunch = False
-    order_lunch_price = None
+    return total_price, order_has_lunch, order_lunch_price
+
+def order_balance_increments(order: dict, employee: dict):
+    """$inc document booking an order on the employee balance (see balance_increments)
+
+    Stammbestellung -> main balance (+ subaccount mirror), Gastbestellung/8H-Dienst -> NUR subaccount.
+    Breakfast totals are charged (-total_price), drinks/sweets are already stored negative.
+    """
+    total_price = stored_euros(order, "total_price")
+    if order["order_type"] == OrderType.BREAKFAST:
+        return balance_increments(employee, order["department_id"], 'breakfast', -total_price)
+    return balance_increments(employee, order["department_id"], 'drinks', total_price)
+
+# Set once backfill_breakfast_day_keys has stamped the orders from before breakfast_day_key.
+# Until then those orders aren't covered by the breakfast_day_unique index and a second
+# breakfast is checked with a query (find_unkeyed_breakfasts).
+_breakfast_day_keys_backfilled = False
+
+async def find_unkeyed_breakfasts(employee_days):
+    """Non-cancelled breakfasts without breakfast_day_key for (employee_id, business_date) pairs
+
+    Returns {(employee_id, business_date): order}. Empty once the key backfill has finished.
+    """
+    employee_days = list(employee_days)
+    if _breakfast_day_keys_backfilled or not employee_days:
+        return {}
+    orders = await db.orders.find(
+        {
+            "$or": [{"employee_id": employee_id, "business_date": business_date} for employee_id, business_date in employee_days],
+            "order_type": "breakfast",
+            "is_sponsor_order": {"$ne": True},
+            "is_cancelled": {"$ne": True},
+            "breakfast_day_key": {"$exists": False}
+        },
+        {"_id": 0, "employee_id": 1, "business_date": 1, "department_id": 1}
+    ).to_list(None)
+    return {(order["employee_id"], order["business_date"]): order for order in orders}
+
+async def duplicate_breakfast_error(order_data: OrderCreate, business_date: str, existing_breakfast=None):
+    """HTTPException for a second breakfast order of an employee on the same business day"""
+    existing_breakfast = existing_breakfast or await db.orders.find_one(
+        {"employee_id": order_data.employee_id, "breakfast_day_key": business_date},
+        {"_id": 0, "department_id": 1}
+    ) or {"department_id": order_data.department_id}
+    
+    # Get department names for better error message (one query for both)
+    departments = await load_departments_by_ids([existing_breakfast["department_id"], order_data.department_id])
+    existing_dept = departments.get(existing_breakfast["department_id"])
+    existing_dept_name = existing_dept["department_name"] if existing_dept else "einer anderen Wachabteilung"
+    
+    current_dept = departments.get(order_data.department_id)
+    current_dept_name = current_dept["department_name"] if current_dept else "dieser Wachabteilung"
+    
+    # Check if trying to order in same or different department
+    if existing_breakfast["department_id"] == order_data.department_id:
+        error_msg = f"Sie haben bereits eine Frühstücksbestellung für heute in {current_dept_name}. Bitte bearbeiten Sie Ihre bestehende Bestellung."
+    else:
+        error_msg = f"Sie haben bereits eine Frühstücksbestellung für heute in {existing_dept_name}. Pro Tag ist nur eine Frühstücksbestellung möglich, auch über verschiedene Wachabteilungen hinweg. Bitte bearbeiten oder löschen Sie Ihre Bestellung in {existing_dept_name}, bevor Sie in {current_dept_name} bestellen."
+    
+    return HTTPException(status_code=400, detail=error_msg)
+
+async def place_order(order_data: OrderCreate, claim=None):
+    """Validate, price and insert an order, then book it on the employee balance"""
+    started = time.perf_counter()
+    today = get_berlin_date().isoformat()  # Berlin business day
+    is_breakfast = order_data.order_type == OrderType.BREAKFAST
+    
+    # All reads are independent of each other - run them concurrently instead of one
+    # round trip after another. The employee is loaded once and reused for the balance write.
+    async def load_prices():
+        price_book = await get_price_book(order_data.department_id)
+        lunch_price = await price_book.daily_lunch_price(today) if is_breakfast else 0.0
+        return price_book, lunch_price
+    
+    reads = [
+        load_prices(),
+        db.employees.find_one(
+            {"id": order_data.employee_id},
+            {"_id": 0, "id": 1, "department_id": 1, "is_8h_service": 1, "subaccount_balances": 1}
+        )
+    ]
+    if is_breakfast:
+        reads += [
+            db.breakfast_settings.find_one({"department_id": order_data.department_id, "date": today}),
+            db.sponsoring_settings.find_one({"department_id": order_data.department_id, "date": today}),
+            find_unkeyed_breakfasts([(order_data.employee_id, today)])
+        ]
+    (price_book, lunch_price), employee, *breakfast_checks = await asyncio.gather(*reads)
     
-    # Check if this is a breakfast order with lunch
-    if order_data.order_type == OrderType.BREAKFAST and order_data.breakfast_items:
-        for breakfast_item in order_data.breakfast_items:
-            if breakfast_item.has_lunch:
-                order_has_lunch = True
-                order_lunch_price = lunch_price  # Use the daily lunch price we calculated above
-                break
+    if is_breakfast:
+        breakfast_settings, sponsoring_settings, unkeyed_breakfasts = breakfast_checks
+        check_breakfast_ordering_open(breakfast_settings, sponsoring_settings)
+        if unkeyed_breakfasts:
+            raise await duplicate_breakfast_error(order_data, today, unkeyed_breakfasts[(order_data.employee_id, today)])
+    
+    total_price, order_has_lunch, order_lunch_price = price_order(order_data, price_book, lunch_price)
     
     order = Order(
         **order_data.dict(), 
@@ -2232,49 +3618,314 @@ async def create_order(order_data: OrderCreate):
         has_lunch=order_has_lunch,
         lunch_price=order_lunch_price
     )
-    order_dict = prepare_for_mongo(order.dict())
-    await db.orders.insert_one(order_dict)
+    order.business_date = get_business_date(order.timestamp)
+    order_dict = order_to_storage(prepare_for_mongo(order.dict()))
+    if order_data.order_type == OrderType.BREAKFAST:
+        # Single breakfast order per day constraint, enforced by the breakfast_day_unique index
+        order_dict["breakfast_day_key"] = order.business_date
+    try:
+        await db.orders.insert_one(order_dict)
+    except DuplicateKeyError:
+        raise await duplicate_breakfast_error(order_data, order.business_date)
+    if claim:
+        claim.mark_persisted(order)  # a retry after this point must get this order, not a second one
     
     # Update employee balance (ERWEITERT für Subkonten mit korrekter Gastbestellungslogik)
-    employee = await db.employees.find_one({"id": order_data.employee_id})
+    # Stammbestellung -> main balance (+ subaccount mirror), Gastbestellung/8H-Dienst -> NUR subaccount,
+    # as one atomic $inc (see update_employee_balance). Runs concurrently with the rollup update.
+    writes = [record_order_in_rollup(order_dict)]
     if employee:
-        # KORRIGIERT: Unterscheide zwischen Stammbestellung und Gastbestellung
-        is_home_department = (order_data.department_id == employee.get("department_id"))
-        is_8h_service = employee.get('is_8h_service', False)
-        
-        if order_data.order_type == OrderType.BREAKFAST:
-            # CRITICAL: 8H-Service employees ALWAYS use subaccounts (no main balance)
-            if is_8h_service:
-                # 8H-DIENST: ALWAYS use subaccount balance, never main balance
-                await update_employee_balance(order_data.employee_id, order_data.department_id, 'breakfast', -total_price)
-            elif is_home_department:
-                # STAMMBESTELLUNG: Update NUR main balance (subaccount wird in update_employee_balance automatisch synchronisiert)
-                new_breakfast_balance = round_to_cents(employee["breakfast_balance"] - total_price)
-                await db.employees.update_one(
-                    {"id": order_data.employee_id},
-                    {"$set": {"breakfast_balance": new_breakfast_balance}}
-                )
+        writes.append(apply_balance_increments(
+            order_data.employee_id, order_balance_increments(order_dict, employee), employee,
+            kind="order", reference_id=order.id
+        ))
+    await asyncio.gather(*writes)
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms > ORDER_LATENCY_BUDGET_MS:
+        logger.warning(f"create_order took {elapsed_ms:.0f} ms (budget {ORDER_LATENCY_BUDGET_MS:.0f} ms)")
+    
+    return order
+
+# Offline order queue: tablets capture orders while the station network is down and flush
+# them in one request. Every entry carries its capture time and an idempotency key (same
+# scope as POST /orders), so a flush can be retried as often as needed.
+OFFLINE_BATCH_MAX_ORDERS = 200
+OFFLINE_ORDER_MAX_AGE = timedelta(hours=48)
+OFFLINE_ORDER_CLOCK_SKEW = timedelta(minutes=5)
+
+class OfflineOrder(OrderCreate):
+    client_timestamp: datetime  # When the order was captured on the tablet
+    idempotency_key: str
+
+class OfflineOrderBatch(BaseModel):
+    orders: List[OfflineOrder]
+
+def offline_order_result(index, entry, result_status, order=None, status_code=200, error=None):
+    return {
+        "index": index,
+        "idempotency_key": entry.idempotency_key,
+        "status": result_status,  # "created", "replayed" or "failed"
+        "status_code": status_code,
+        "order": order,
+        "error": error
+    }
+
+def setting_at(setting, flag, flag_timestamp_field, at):
+    """A breakfast/sponsoring settings document as it applied at time `at`
+
+    A closing or sponsoring block set after `at` (per its timestamp) didn't apply yet -
+    None then. Without a timestamp the current flag is all there is.
+    """
+    if setting and setting.get(flag):
+        flagged_at = to_utc_datetime(setting.get(flag_timestamp_field))
+        if flagged_at and flagged_at > at:
+            return None
+    return setting
+
+@api_router.post("/orders/offline-batch")
+async def ingest_offline_orders(batch: OfflineOrderBatch):
+    """Ingest a queue of orders captured offline on a tablet
+
+    Each order is validated and priced as of its client_timestamp (daily lunch price,
+    breakfast closing and sponsoring block of that business day, unless they happened
+    after it). Menu prices come from the current price book - there is no price history,
+    so an order captured before a price change is charged the new price (documented in
+    DEPLOYMENT.md). All new orders are inserted with
+    one insert_many and the balance deltas are applied per employee with one bulk write.
+    Idempotency keys are settled right after the insert. Returns one result per entry, in
+    request order.
+    """
+    if len(batch.orders) > OFFLINE_BATCH_MAX_ORDERS:
+        raise HTTPException(status_code=400, detail=f"Maximal {OFFLINE_BATCH_MAX_ORDERS} Bestellungen pro Übertragung")
+    
+    scope = "orders"
+    unsettled_orders = {}  # claimed key -> order (None until priced), neither stored nor rejected yet
+    try:
+        results = [None] * len(batch.orders)
+        entries = {}  # index -> entry still to process
+        fingerprints = {}
+        for index, entry in enumerate(batch.orders):
+            if entry.idempotency_key in fingerprints:
+                results[index] = offline_order_result(index, entry, "failed", status_code=400, error="Doppelter Idempotency-Key in dieser Übertragung")
+                continue
+            fingerprints[entry.idempotency_key] = request_fingerprint(OrderCreate(**entry.dict()))
+            entries[index] = entry
+        
+        # Replays return the stored order, like POST /orders with the same key
+        states = await claim_idempotency_keys(scope, fingerprints)
+        unsettled_orders = {key: None for key, (state, _) in states.items() if state == "claimed"}
+        for index, entry in list(entries.items()):
+            state, response = states[entry.idempotency_key]
+            if state == "claimed":
+                continue
+            del entries[index]
+            if state == "completed":
+                results[index] = offline_order_result(index, entry, "replayed", order=response)
+            elif state == "conflict":
+                results[index] = offline_order_result(index, entry, "failed", status_code=409, error="Idempotency-Key wurde bereits für eine andere Anfrage verwendet")
+            elif state == "failed":
+                results[index] = offline_order_result(index, entry, "failed", status_code=409, error=IDEMPOTENCY_FAILED_DETAIL)
             else:
-                # GASTBESTELLUNG: Update NUR subaccount balance
-                await update_employee_balance(order_data.employee_id, order_data.department_id, 'breakfast', -total_price)
+                results[index] = offline_order_result(index, entry, "failed", status_code=409, error="Diese Anfrage wird bereits verarbeitet")
+        
+        # Everything the entries depend on, loaded once for the whole batch
+        now = datetime.now(timezone.utc)
+        business_dates = {index: get_business_date(entry.client_timestamp) for index, entry in entries.items()}
+        breakfast_days = sorted({
+            (entry.department_id, business_dates[index])
+            for index, entry in entries.items() if entry.order_type == OrderType.BREAKFAST
+        })
+        reads = [
+            load_employees_by_ids(entry.employee_id for entry in entries.values()),
+            asyncio.gather(*(get_price_book(dept_id) for dept_id in sorted({entry.department_id for entry in entries.values()})))
+        ]
+        if breakfast_days:
+            day_filter = {"$or": [{"department_id": dept_id, "date": date} for dept_id, date in breakfast_days]}
+            reads += [
+                db.breakfast_settings.find(day_filter).to_list(None),
+                db.sponsoring_settings.find(day_filter).to_list(None)
+            ]
+        employees, price_books, *day_settings = await asyncio.gather(*reads)
+        breakfast_settings, sponsoring_settings = day_settings or ([], [])
+        price_books = {price_book.department_id: price_book for price_book in price_books}
+        breakfast_settings = {(doc["department_id"], doc["date"]): doc for doc in breakfast_settings}
+        sponsoring_settings = {(doc["department_id"], doc["date"]): doc for doc in sponsoring_settings}
+        unkeyed_breakfasts = await find_unkeyed_breakfasts({
+            (entry.employee_id, business_dates[index])
+            for index, entry in entries.items() if entry.order_type == OrderType.BREAKFAST
+        })
+        
+        to_insert = []  # (index, entry, order, order_dict)
+        for index, entry in entries.items():
+            try:
+                client_timestamp = to_utc_datetime(entry.client_timestamp)
+                if client_timestamp > now + OFFLINE_ORDER_CLOCK_SKEW:
+                    raise HTTPException(status_code=400, detail="Bestellzeitpunkt liegt in der Zukunft")
+                if client_timestamp < now - OFFLINE_ORDER_MAX_AGE:
+                    raise HTTPException(status_code=400, detail="Bestellung ist zu alt für die Offline-Übertragung")
+                if entry.employee_id not in employees:
+                    raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
                 
-        else:  # DRINKS or SWEETS
-            # CRITICAL: 8H-Service employees ALWAYS use subaccounts (no main balance)
-            if is_8h_service:
-                # 8H-DIENST: ALWAYS use subaccount balance, never main balance
-                await update_employee_balance(order_data.employee_id, order_data.department_id, 'drinks', total_price)
-            elif is_home_department:
-                # STAMMBESTELLUNG: Update NUR main balance (subaccount wird in update_employee_balance automatisch synchronisiert)
-                new_drinks_sweets_balance = round_to_cents(employee["drinks_sweets_balance"] + total_price)
-                await db.employees.update_one(
-                    {"id": order_data.employee_id},
-                    {"$set": {"drinks_sweets_balance": new_drinks_sweets_balance}}
+                business_date = business_dates[index]
+                price_book = price_books[entry.department_id]
+                lunch_price = 0.0
+                if entry.order_type == OrderType.BREAKFAST:
+                    check_breakfast_ordering_open(
+                        setting_at(breakfast_settings.get((entry.department_id, business_date)), "is_closed", "closed_at", client_timestamp),
+                        setting_at(sponsoring_settings.get((entry.department_id, business_date)), "is_blocked", "blocked_at", client_timestamp)
+                    )
+                    lunch_price = await price_book.daily_lunch_price(business_date)
+                
+                order_data = OrderCreate(**entry.dict())
+                unkeyed_breakfast = unkeyed_breakfasts.get((entry.employee_id, business_date))
+                if entry.order_type == OrderType.BREAKFAST and unkeyed_breakfast:
+                    raise await duplicate_breakfast_error(order_data, business_date, unkeyed_breakfast)
+                total_price, order_has_lunch, order_lunch_price = price_order(order_data, price_book, lunch_price)
+                order = Order(
+                    **order_data.dict(),
+                    total_price=total_price,
+                    has_lunch=order_has_lunch,
+                    lunch_price=order_lunch_price,
+                    timestamp=client_timestamp,
+                    business_date=business_date
                 )
+                order_dict = order_to_storage(prepare_for_mongo(order.dict()))
+                if entry.order_type == OrderType.BREAKFAST:
+                    order_dict["breakfast_day_key"] = business_date
+                to_insert.append((index, entry, order, order_dict))
+                unsettled_orders[entry.idempotency_key] = order
+            except HTTPException as e:
+                results[index] = offline_order_result(index, entry, "failed", status_code=e.status_code, error=e.detail)
+        
+        # One insert_many; duplicate breakfasts (also within the batch) fail individually
+        failed_inserts = {}
+        if to_insert:
+            try:
+                await db.orders.insert_many([order_dict for _, _, _, order_dict in to_insert], ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    failed_inserts[error["index"]] = error
+        
+        inserted = []
+        for position, (index, entry, order, order_dict) in enumerate(to_insert):
+            error = failed_inserts.get(position)
+            if error is None:
+                inserted.append((index, entry, order, order_dict))
+                results[index] = offline_order_result(index, entry, "created", order=jsonable_encoder(order))
+            elif error.get("code") == 11000:
+                duplicate = await duplicate_breakfast_error(OrderCreate(**entry.dict()), order.business_date)
+                results[index] = offline_order_result(index, entry, "failed", status_code=duplicate.status_code, error=duplicate.detail)
             else:
-                # GASTBESTELLUNG: Update NUR subaccount balance
-                await update_employee_balance(order_data.employee_id, order_data.department_id, 'drinks', total_price)
-    
-    return order
+                results[index] = offline_order_result(index, entry, "failed", status_code=500, error=error.get("errmsg", "Fehler beim Speichern"))
+        
+        # Settle the keys before the remaining writes: a stored order must never be booked
+        # again by a retry, a rejected entry may be retried right away
+        await complete_idempotency_keys(scope, {entry.idempotency_key: results[index]["order"] for index, entry, _, _ in inserted})
+        await release_idempotency_keys(scope, [
+            entry.idempotency_key for index, entry in entries.items() if results[index]["status"] == "failed"
+        ])
+        unsettled_orders = {}
+        
+        # Rollups: one combined delta per department and day
+        rollup_deltas = {}
+        for _, _, _, order_dict in inserted:
+            delta = rollup_deltas.setdefault((order_dict["department_id"], order_dict["business_date"]), {})
+            for field, amount in rollup_contribution(order_dict).items():
+                delta[field] = delta.get(field, 0) + amount
+        for (dept_id, business_date), delta in rollup_deltas.items():
+            await apply_rollup_delta(dept_id, business_date, delta)
+        for _, _, _, order_dict in inserted:
+            apply_order_to_live_summary(order_dict)
+            publish_order_event(order_dict, "order_created")
+        
+        # Balances: all orders of an employee summed into one $inc, one bulk write for all
+        increments_by_employee = {}
+        order_ids = {}
+        for _, entry, order, order_dict in inserted:
+            employee = employees[entry.employee_id]
+            increments_by_employee[entry.employee_id] = merge_increments(
+                increments_by_employee.get(entry.employee_id, {}), order_balance_increments(order_dict, employee)
+            )
+            order_ids.setdefault(entry.employee_id, []).append(order.id)
+        await apply_bulk_balance_increments(
+            increments_by_employee,
+            kind="order",
+            reference_ids={employee_id: ",".join(ids) for employee_id, ids in order_ids.items()},
+            employees=employees
+        )
+        
+        return {
+            "created": sum(1 for result in results if result["status"] == "created"),
+            "replayed": sum(1 for result in results if result["status"] == "replayed"),
+            "failed": sum(1 for result in results if result["status"] == "failed"),
+            "results": results
+        }
+    except Exception as e:
+        # Unsettled claims must not block the tablet's retry - unless the insert got their order
+        # stored before failing, then a retry has to replay it
+        stored_ids = set()
+        insert_attempted = [order.id for order in unsettled_orders.values() if order]
+        if insert_attempted:
+            stored_ids = set(await db.orders.distinct("id", {"id": {"$in": insert_attempted}}))
+        await complete_idempotency_keys(scope, {
+            key: jsonable_encoder(order) for key, order in unsettled_orders.items() if order and order.id in stored_ids
+        })
+        await release_idempotency_keys(scope, [
+            key for key, order in unsettled_orders.items() if not order or order.id not in stored_ids
+        ])
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=500, detail=f"Fehler bei der Übertragung der Offline-Bestellungen: {str(e)}")
+
+async def aggregate_daily_revenue(department_id: str, business_dates):
+    """Per-day breakfast/lunch revenue split, read from the daily rollups
+
+    Only real orders count (sponsor orders just redistribute costs). Lunch revenue is the
+    number of lunches times that day's daily lunch price, breakfast revenue is the rest.
+    Returns one entry per business day that has real orders, sorted by date.
+    """
+    pipeline = [
+        {"$match": {
+            "department_id": department_id,
+            "business_date": {"$in": list(business_dates)},
+            "order_count": {"$gt": 0}
+        }},
+        {"$lookup": {
+            "from": "daily_lunch_prices",
+            "let": {"date": "$business_date"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$department_id", department_id]},
+                    {"$eq": ["$date", "$$date"]}
+                ]}}},
+                {"$limit": 1}
+            ],
+            "as": "daily_lunch_price"
+        }},
+        {"$project": {
+            "_id": 0,
+            "date": "$business_date",
+            "total_orders": "$order_count",
+            "lunch_count": {"$ifNull": ["$lunch_count", 0]},
+            "total_revenue_cents": mongo_stored_cents_expression("total_revenue"),
+            "daily_lunch_price": {"$arrayElemAt": ["$daily_lunch_price", 0]}
+        }},
+        # Revenue math in integer cents, converted to euros only at the end
+        {"$addFields": {"daily_lunch_price_cents": mongo_stored_cents_expression("lunch_price", "daily_lunch_price.")}},
+        {"$addFields": {
+            "daily_lunch_price": {"$divide": ["$daily_lunch_price_cents", 100]},
+            "lunch_revenue_cents": {"$multiply": ["$lunch_count", "$daily_lunch_price_cents"]}
+        }},
+        {"$addFields": {
+            "total_revenue": {"$divide": ["$total_revenue_cents", 100]},
+            "lunch_revenue": {"$divide": ["$lunch_revenue_cents", 100]},
+            "breakfast_revenue": {"$divide": [{"$subtract": ["$total_revenue_cents", "$lunch_revenue_cents"]}, 100]}
+        }},
+        {"$project": {"total_revenue_cents": 0, "lunch_revenue_cents": 0, "daily_lunch_price_cents": 0}},
+        {"$sort": {"date": 1}}
+    ]
+    return await db.daily_rollups.aggregate(pipeline).to_list(None)
 
 @api_router.get("/orders/daily-revenue/{department_id}/{date}")
 async def get_daily_revenue(department_id: str, date: str):
@@ -2285,62 +3936,15 @@ async def get_daily_revenue(department_id: str, date: str):
     except ValueError:
         raise HTTPException(status_code=400, detail="Ungültiges Datumsformat. Verwenden Sie YYYY-MM-DD.")
     
-    # Get orders for this specific date using Berlin timezone boundaries
-    start_of_day_utc, end_of_day_utc = get_berlin_day_bounds(parsed_date)
-    
-    orders = await db.orders.find({
-        "department_id": department_id,
-        "order_type": "breakfast",
-        "timestamp": {
-            "$gte": start_of_day_utc.isoformat(),
-            "$lte": end_of_day_utc.isoformat()
-        },
-        "$or": [
-            {"is_cancelled": {"$exists": False}},  # Legacy orders without is_cancelled field
-            {"is_cancelled": False}                # Explicitly not cancelled
-        ]
-    }).to_list(1000)
-    
-    breakfast_revenue = 0.0
-    lunch_revenue = 0.0
-    
-    # Separate real orders and sponsor orders
-    real_orders = [order for order in orders if not order.get("is_sponsor_order", False)]
-    sponsor_orders = [order for order in orders if order.get("is_sponsor_order", False)]
-    
-    total_orders = len(real_orders)  # Only count real orders in statistics
-    
-    if orders:
-        # Get department prices for lunch price calculation
-        daily_lunch_price_doc = await db.daily_lunch_prices.find_one({
-            "department_id": department_id,
-            "date": parsed_date.isoformat()
-        })
-        daily_lunch_price = daily_lunch_price_doc["lunch_price"] if daily_lunch_price_doc else 0.0
-        
-        # WICHTIG: Nur real_orders zählen für Revenue!
-        # Sponsor-orders sind nur Umverteilung der Kosten, nicht zusätzliches Essen
-        total_revenue = 0.0
-        lunch_count = 0
-        
-        # Zähle alle real_orders
-        for order in real_orders:
-            total_revenue += abs(order.get("total_price", 0))
-            # Zähle Mittagessen
-            for item in order.get("breakfast_items", []):
-                if item.get("has_lunch", False):
-                    lunch_count += 1
-        
-        # Separiere Mittagessen vom Gesamtumsatz
-        lunch_revenue = lunch_count * daily_lunch_price
-        breakfast_revenue = total_revenue - lunch_revenue
+    days = await aggregate_daily_revenue(department_id, [parsed_date.isoformat()])
+    day = days[0] if days else {"breakfast_revenue": 0.0, "lunch_revenue": 0.0, "total_orders": 0}
     
     return {
         "date": date,
-        "breakfast_revenue": round(breakfast_revenue, 2),
-        "lunch_revenue": round(lunch_revenue, 2),
-        "total_revenue": round(breakfast_revenue + lunch_revenue, 2),
-        "total_orders": total_orders
+        "breakfast_revenue": round(day["breakfast_revenue"], 2),
+        "lunch_revenue": round(day["lunch_revenue"], 2),
+        "total_revenue": round(day["breakfast_revenue"] + day["lunch_revenue"], 2),
+        "total_orders": day["total_orders"]
     }
 
 
@@ -2351,70 +3955,28 @@ async def get_separated_revenue(department_id: str, days_back: int = 30):
     # Get date range (Berlin timezone)
     end_date = get_berlin_date()
     start_date = end_date - timedelta(days=days_back)
+    business_dates = [(start_date + timedelta(days=offset)).isoformat() for offset in range(days_back + 1)]
     
-    current_date = start_date
-    total_breakfast_revenue = 0.0
-    total_lunch_revenue = 0.0
+    days = await aggregate_daily_revenue(department_id, business_dates)
     
-    while current_date <= end_date:
-        # Get orders for this specific date using Berlin timezone boundaries
-        start_of_day_utc, end_of_day_utc = get_berlin_day_bounds(current_date)
-        
-        orders = await db.orders.find({
-            "department_id": department_id,
-            "order_type": "breakfast",
-            "timestamp": {
-                "$gte": start_of_day_utc.isoformat(),
-                "$lte": end_of_day_utc.isoformat()
-            },
-            "$or": [
-                {"is_cancelled": {"$exists": False}},  # Legacy orders without is_cancelled field
-                {"is_cancelled": False}                # Explicitly not cancelled
-            ]
-        }).to_list(1000)
-        
-        if orders:  # Only include dates with orders
-            daily_breakfast_revenue = 0.0
-            daily_lunch_revenue = 0.0
-            
-            # Separate real orders and sponsor orders
-            real_orders = [order for order in orders if not order.get("is_sponsor_order", False)]
-            sponsor_orders = [order for order in orders if order.get("is_sponsor_order", False)]
-            
-            # Get daily lunch price for this date
-            daily_lunch_price_doc = await db.daily_lunch_prices.find_one({
-                "department_id": department_id,
-                "date": current_date.isoformat()
-            })
-            daily_lunch_price = daily_lunch_price_doc["lunch_price"] if daily_lunch_price_doc else 0.0
-            
-            # WICHTIG: Nur real_orders zählen für Revenue!
-            # Sponsor-orders sind nur Umverteilung der Kosten, nicht zusätzliches Essen
-            total_daily_revenue = 0.0
-            lunch_count = 0
-            
-            # Zähle alle real_orders
-            for order in real_orders:
-                total_daily_revenue += abs(order.get("total_price", 0))
-                # Zähle Mittagessen
-                for item in order.get("breakfast_items", []):
-                    if item.get("has_lunch", False):
-                        lunch_count += 1
-            
-            # Separiere Mittagessen vom Gesamtumsatz
-            daily_lunch_revenue = lunch_count * daily_lunch_price
-            daily_breakfast_revenue = total_daily_revenue - daily_lunch_revenue
-            
-            total_breakfast_revenue += daily_breakfast_revenue
-            total_lunch_revenue += daily_lunch_revenue
-        
-        current_date += timedelta(days=1)
+    total_breakfast_revenue = sum(day["breakfast_revenue"] for day in days)
+    total_lunch_revenue = sum(day["lunch_revenue"] for day in days)
     
     return {
         "breakfast_revenue": round(total_breakfast_revenue, 2),
         "lunch_revenue": round(total_lunch_revenue, 2),
         "total_revenue": round(total_breakfast_revenue + total_lunch_revenue, 2),
-        "days_back": days_back
+        "days_back": days_back,
+        "daily": [
+            {
+                "date": day["date"],
+                "breakfast_revenue": round(day["breakfast_revenue"], 2),
+                "lunch_revenue": round(day["lunch_revenue"], 2),
+                "total_revenue": round(day["breakfast_revenue"] + day["lunch_revenue"], 2),
+                "total_orders": day["total_orders"]
+            }
+            for day in days
+        ]
     }
 
 
@@ -2425,57 +3987,98 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
     # Get date range (Berlin timezone)
     end_date = get_berlin_date()
     start_date = end_date - timedelta(days=days_back)
+    business_dates = [(start_date + timedelta(days=offset)).isoformat() for offset in range(days_back + 1)]
+    
+    # Load the whole range with one query: breakfast orders plus every order carrying sponsoring info.
+    # Cancelled orders are included here because the sponsor lookups below consider them too.
+    range_orders = await db.orders.find({
+        "department_id": department_id,
+        "business_date": {"$in": business_dates},
+        "$or": [
+            {"order_type": "breakfast"},
+            {"sponsored_by_employee_id": {"$exists": True}}
+        ]
+    }).to_list(None)
+    range_orders = [order_to_api(order) for order in range_orders]
+    
+    orders_by_date = {}
+    sponsored_by_date = {}
+    sponsor_orders_by_date = {}
+    for order in range_orders:
+        order_date = order["business_date"]
+        if order["order_type"] == "breakfast" and order.get("is_cancelled", False) is False:
+            orders_by_date.setdefault(order_date, []).append(order)
+        if "sponsored_by_employee_id" in order:
+            sponsored_by_date.setdefault(order_date, []).append(order)
+        if order.get("is_sponsor_order") is True:
+            sponsor_orders_by_date.setdefault(order_date, {}).setdefault(order["employee_id"], []).append(order)
+    
+    # Prefetch lunch prices and menu prices once for the whole range
+    lunch_price_docs = {}
+    async for doc in db.daily_lunch_prices.find({"department_id": department_id, "date": {"$in": business_dates}}):
+        lunch_price_docs.setdefault(doc["date"], doc)
+    
+    # Sponsored orders of the range are priced in one pass, the employee pays what is not sponsored
+    price_book = await get_price_book(department_id)
+    sponsored_orders = [
+        order for orders in orders_by_date.values() for order in orders
+        if order.get("is_sponsored") and not order.get("is_sponsor_order")
+    ]
+    sponsored_breakdowns = {
+        order["id"]: breakdown
+        for order, breakdown in zip(sponsored_orders, price_orders(sponsored_orders, unit_prices(price_book)))
+    }
+    
+    rollups_by_date = {}
+    async for rollup in db.daily_rollups.find({"department_id": department_id, "business_date": {"$in": business_dates}}):
+        rollups_by_date[rollup["business_date"]] = rollup
+    
+    # Resolve all employees of the range with a single query
+    employees_by_id = await load_employees_by_ids(
+        [order["employee_id"] for order in range_orders] +
+        [order.get("sponsored_by_employee_id") for order in range_orders]
+    )
     
     history = []
     current_date = start_date
     
     while current_date <= end_date:
-        # Get orders for this specific date using Berlin timezone boundaries
-        start_of_day_utc, end_of_day_utc = get_berlin_day_bounds(current_date)
-        
-        orders = await db.orders.find({
-            "department_id": department_id,
-            "order_type": "breakfast",
-            "timestamp": {
-                "$gte": start_of_day_utc.isoformat(),
-                "$lte": end_of_day_utc.isoformat()
-            },
-            "$or": [
-                {"is_cancelled": {"$exists": False}},  # Legacy orders without is_cancelled field
-                {"is_cancelled": False}                # Explicitly not cancelled
-            ]
-        }).to_list(1000)
+        # Orders for this specific date (Berlin business day)
+        business_date = current_date.isoformat()
+        orders = orders_by_date.get(business_date, [])
         
         if orders:  # Only include dates with orders (as originally intended)
             # Get daily lunch price and name for days WITH orders
-            daily_lunch_price_doc = await db.daily_lunch_prices.find_one({
-                "department_id": department_id,
-                "date": current_date.isoformat()
-            })
-            daily_lunch_price = daily_lunch_price_doc["lunch_price"] if daily_lunch_price_doc else 0.0
+            daily_lunch_price_doc = lunch_price_docs.get(business_date)
+            daily_lunch_price = stored_euros(daily_lunch_price_doc, "lunch_price") if daily_lunch_price_doc else 0.0
             lunch_name = daily_lunch_price_doc.get("lunch_name", "") if daily_lunch_price_doc else ""
             
             # Separate real orders and sponsor orders
             real_orders = [order for order in orders if not order.get("is_sponsor_order", False)]
             sponsor_orders = [order for order in orders if order.get("is_sponsor_order", False)]
             
-            # Calculate daily summary using only real orders
-            breakfast_summary = {}
+            # Day totals (roll and topping counts, order count) come from the daily rollup
+            rollup = rollups_by_date.get(business_date)
+            breakfast_summary = rollup_breakfast_summary(rollup) if rollup and rollup.get("order_count") else {}
             employee_orders = {}
-            total_orders = len(real_orders)  # Only count real orders, not sponsor orders
+            total_orders = rollup.get("order_count", 0) if rollup else 0  # Only real orders, not sponsor orders
             # SIMPLIFIED: Calculate total_amount from individual employee totals at the END
             # This prevents double-counting and ensures consistency
-            total_amount = Decimal('0')  # Use Decimal for financial precision
+            total_amount = 0.0
+            
+            # Maps employee_key to the full employee ID it was built from
+            employee_key_ids = {}
             
             # First, process real orders
             for order in real_orders:  # Only process real orders for employee statistics
                 if order.get("breakfast_items"):
                     # Get employee info
-                    employee = await db.employees.find_one({"id": order["employee_id"]})
+                    employee = employees_by_id.get(order["employee_id"])
                     employee_name = employee["name"] if employee else "Unknown"
                     
                     # Create unique key combining name and employee_id to avoid duplicate name aggregation
                     employee_key = f"{employee_name} (ID: {order['employee_id'][-8:]})"  # Show last 8 chars of ID
+                    employee_key_ids.setdefault(employee_key, order["employee_id"])
                     
                     if employee_key not in employee_orders:
                         employee_orders[employee_key] = {
@@ -2509,83 +4112,9 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
                         sponsored_meal_types = order.get("sponsored_meal_type", "")
                         if sponsored_meal_types:
                             # Handle comma-separated meal types (e.g., "breakfast,lunch")
-                            sponsored_types_list = sponsored_meal_types.split(",")
-                            order_total_cost = order.get("total_price", 0)
-                            remaining_cost = order_total_cost
-                            
-                            # Subtract breakfast cost if sponsored
-                            if "breakfast" in sponsored_types_list:
-                                sponsored_breakfast_cost = 0
-                                for item in order.get("breakfast_items", []):
-                                    # Calculate actual breakfast items cost (rolls + eggs)
-                                    white_halves = item.get("white_halves", 0)
-                                    seeded_halves = item.get("seeded_halves", 0)
-                                    boiled_eggs = item.get("boiled_eggs", 0)
-                                    
-                                    # Get menu prices (use defaults if not found)
-                                    white_roll_price = 0.50  # Default
-                                    seeded_roll_price = 0.60  # Default
-                                    
-                                    # Try to get actual department prices
-                                    try:
-                                        white_menu = await db.menu_breakfast.find_one({"roll_type": "weiss", "department_id": department_id})
-                                        if white_menu:
-                                            white_roll_price = white_menu.get("price", 0.50)
-                                        
-                                        seeded_menu = await db.menu_breakfast.find_one({"roll_type": "koerner", "department_id": department_id})
-                                        if seeded_menu:
-                                            seeded_roll_price = seeded_menu.get("price", 0.60)
-                                    except:
-                                        pass  # Use defaults
-                                    
-                                    # Calculate sponsored breakfast cost
-                                    sponsored_breakfast_cost += (white_halves * white_roll_price) + (seeded_halves * seeded_roll_price)
-                                    
-                                    # Add boiled eggs cost
-                                    if boiled_eggs > 0:
-                                        department_prices = await get_department_prices(department_id)
-                                        boiled_eggs_price = department_prices["boiled_eggs_price"]
-                                        sponsored_breakfast_cost += boiled_eggs * boiled_eggs_price
-                                    
-                                    # Add fried eggs cost
-                                    fried_eggs = item.get("fried_eggs", 0)
-                                    if fried_eggs > 0:
-                                        department_prices = await get_department_prices(department_id)
-                                        fried_eggs_price = department_prices["fried_eggs_price"]
-                                        sponsored_breakfast_cost += fried_eggs * fried_eggs_price
-                                
-                                remaining_cost -= sponsored_breakfast_cost
-                            
-                            # Subtract lunch cost if sponsored
-                            if "lunch" in sponsored_types_list:
-                                for item in order.get("breakfast_items", []):
-                                    if item.get("has_lunch", False):
-                                        # Get daily lunch price
-                                        daily_lunch_price_doc = await db.daily_lunch_prices.find_one({
-                                            "department_id": department_id,
-                                            "date": current_date.isoformat()
-                                        })
-                                        lunch_price_to_subtract = 0.0
-                                        if daily_lunch_price_doc:
-                                            lunch_price_to_subtract = daily_lunch_price_doc["lunch_price"]
-                                        else:
-                                            # KORRIGIERT: Use original order lunch price as fallback
-                                            # This ensures sponsored lunch is properly deducted even if daily price missing
-                                            order_lunch_price = item.get("lunch_price", 0.0)
-                                            if order_lunch_price > 0:
-                                                lunch_price_to_subtract = order_lunch_price
-                                            else:
-                                                # Last fallback: Use global lunch settings
-                                                lunch_settings = await db.lunch_settings.find_one()
-                                                if lunch_settings:
-                                                    lunch_price_to_subtract = lunch_settings.get("price", 0.0)
-                                        
-                                        print(f"DEBUG LUNCH SPONSORING: Subtracting lunch price: {lunch_price_to_subtract}")
-                                        remaining_cost -= lunch_price_to_subtract
-                                        break
-                            
+                            sponsored_cost = sponsored_cents(sponsored_breakdowns[order["id"]], sponsored_meal_types)
                             # Employee pays only the remaining cost (e.g., coffee)
-                            order_amount = max(0, remaining_cost)
+                            order_amount = from_cents(max(0, to_cents(order.get("total_price", 0)) - sponsored_cost))
                         else:
                             # No sponsored meal types - shouldn't happen but handle gracefully
                             order_amount = order.get("total_price", 0)
@@ -2608,38 +4137,14 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
                     # This shows what the employee ACTUALLY PAID (after sponsoring)
                     employee_orders[employee_key]["total_amount"] += order_amount
                     
-                    # DEBUG: Log the calculation for troubleshooting
-                    print(f"DEBUG BREAKFAST HISTORY: Employee {employee_key[:20]}... adding {order_amount} (sponsored: {order.get('is_sponsored', False)}, meal_type: {order.get('sponsored_meal_type', 'None')})")
-                    
                     for item in order["breakfast_items"]:
-                        # Handle new format (total_halves, white_halves, seeded_halves)
-                        if "total_halves" in item:
-                            white_halves = item.get("white_halves", 0)
-                            seeded_halves = item.get("seeded_halves", 0)
-                        else:
-                            # Handle old format (roll_type, roll_halves)
-                            roll_type = item.get("roll_type", "weiss")
-                            roll_halves = item.get("roll_halves", item.get("roll_count", 1))
-                            if roll_type == "weiss":
-                                white_halves = roll_halves
-                                seeded_halves = 0
-                            else:
-                                white_halves = 0
-                                seeded_halves = roll_halves
+                        # New format (white/seeded halves) or old format (roll_type, roll_halves)
+                        white_halves, seeded_halves = roll_halves(item)
                         
                         # Update employee totals
                         employee_orders[employee_key]["white_halves"] += white_halves
                         employee_orders[employee_key]["seeded_halves"] += seeded_halves
                         
-                        # FIXED: Update overall summary ALWAYS, not just when there are toppings
-                        if "weiss" not in breakfast_summary:
-                            breakfast_summary["weiss"] = {"halves": 0, "toppings": {}}
-                        if "koerner" not in breakfast_summary:
-                            breakfast_summary["koerner"] = {"halves": 0, "toppings": {}}
-                        
-                        breakfast_summary["weiss"]["halves"] += white_halves
-                        breakfast_summary["koerner"]["halves"] += seeded_halves
-                        
                         # Add boiled eggs if present
                         boiled_eggs = item.get("boiled_eggs", 0)
                         employee_orders[employee_key]["boiled_eggs"] += boiled_eggs
@@ -2654,12 +4159,8 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
                             
                             # NEU: Add lunch name from daily lunch price
                             if not employee_orders[employee_key].get("lunch_name"):
-                                daily_lunch = await db.daily_lunch_prices.find_one({
-                                    "department_id": department_id,
-                                    "date": current_date.isoformat()
-                                })
-                                if daily_lunch and daily_lunch.get("lunch_name"):
-                                    employee_orders[employee_key]["lunch_name"] = daily_lunch["lunch_name"]
+                                if daily_lunch_price_doc and daily_lunch_price_doc.get("lunch_name"):
+                                    employee_orders[employee_key]["lunch_name"] = daily_lunch_price_doc["lunch_name"]
                                 else:
                                     employee_orders[employee_key]["lunch_name"] = "Mittagessen"
                         
@@ -2697,11 +4198,6 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
                                     old_count = employee_orders[employee_key]["toppings"][topping]
                                     employee_orders[employee_key]["toppings"][topping] = {"white": old_count, "seeded": 0}
                                 employee_orders[employee_key]["toppings"][topping]["white"] += 1
-                                
-                                # Also update breakfast_summary for overall topping counts
-                                if topping not in breakfast_summary["weiss"]["toppings"]:
-                                    breakfast_summary["weiss"]["toppings"][topping] = 0
-                                breakfast_summary["weiss"]["toppings"][topping] += 1
                             else:
                                 # This topping is on a seeded roll
                                 if topping not in employee_orders[employee_key]["toppings"]:
@@ -2711,11 +4207,6 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
                                     old_count = employee_orders[employee_key]["toppings"][topping]
                                     employee_orders[employee_key]["toppings"][topping] = {"white": 0, "seeded": old_count}
                                 employee_orders[employee_key]["toppings"][topping]["seeded"] += 1
-                                
-                                # Also update breakfast_summary for overall topping counts
-                                if topping not in breakfast_summary["koerner"]["toppings"]:
-                                    breakfast_summary["koerner"]["toppings"][topping] = 0
-                                breakfast_summary["koerner"]["toppings"][topping] += 1
             
             # Calculate shopping list
             shopping_list = {}
@@ -2737,14 +4228,7 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
                     employee_data["sponsored_meal_type"] = None
             
             # CRITICAL: Also find sponsors who didn't make their own orders but sponsored others
-            all_sponsors = await db.orders.find({
-                "department_id": department_id,
-                "sponsored_by_employee_id": {"$exists": True},
-                "timestamp": {
-                    "$gte": start_of_day_utc.isoformat(),
-                    "$lte": end_of_day_utc.isoformat()
-                }
-            }).to_list(1000)
+            all_sponsors = sponsored_by_date.get(business_date, [])
             
             # Get unique sponsor IDs and names, create correct employee_key format
             sponsor_keys_to_add = {}
@@ -2756,6 +4240,7 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
                 if sponsor_id and sponsor_name:
                     # Create the same key format as used for regular orders
                     sponsor_key = f"{sponsor_name} (ID: {sponsor_id[-8:]})"
+                    employee_key_ids.setdefault(sponsor_key, sponsor_id)
                     if sponsor_key not in existing_employee_keys:
                         # This sponsor has no own orders, add them
                         sponsor_keys_to_add[sponsor_key] = {
@@ -2765,8 +4250,8 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
             
             # Add sponsors to employee_orders if they're not already there
             for sponsor_key, sponsor_info in sponsor_keys_to_add.items():
-                # Get employee data from database to get is_8h_service flag
-                sponsor_employee = await db.employees.find_one({"id": sponsor_info["sponsor_id"]})
+                # Get employee data to get is_8h_service flag
+                sponsor_employee = employees_by_id.get(sponsor_info["sponsor_id"])
                 
                 employee_orders[sponsor_key] = {
                     "white_halves": 0,
@@ -2795,21 +4280,12 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
                     employee_name = employee_key.split(" (ID: ")[0]
                     partial_employee_id = employee_key.split(" (ID: ")[1].rstrip(")")
                     
-                    # CRITICAL FIX: Find the full employee ID from database using partial ID
+                    # CRITICAL FIX: Resolve the full employee ID the key was built from
                     # The employee key contains only last 8 characters, but we need the full UUID
-                    # First try to find in current department, then try all employees (for 8H-service)
-                    employee_doc = await db.employees.find_one({
-                        "department_id": department_id,
-                        "name": employee_name,
-                        "id": {"$regex": f".*{partial_employee_id}$"}  # Match ending with partial ID
-                    })
-                    
-                    # If not found in department, try to find anywhere (for 8H-service employees)
-                    if not employee_doc:
-                        employee_doc = await db.employees.find_one({
-                            "name": employee_name,
-                            "id": {"$regex": f".*{partial_employee_id}$"}  # Match ending with partial ID
-                        })
+                    # The employee must still exist under that name (works across departments for 8H-service)
+                    employee_doc = employees_by_id.get(employee_key_ids.get(employee_key))
+                    if employee_doc and employee_doc["name"] != employee_name:
+                        employee_doc = None
                     
                     if employee_doc:
                         employee_id = employee_doc["id"]  # Use full employee ID
@@ -2826,15 +4302,7 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
                 
                 # SIMPLIFIED CORRECT APPROACH: Find sponsor orders for this employee
                 # Look for orders where this employee is marked as a sponsor (is_sponsor_order=True)
-                sponsor_orders = await db.orders.find({
-                    "department_id": department_id,
-                    "employee_id": employee_id,  # Orders belonging to this employee (now using full ID)
-                    "is_sponsor_order": True,    # This employee sponsored someone
-                    "timestamp": {
-                        "$gte": start_of_day_utc.isoformat(),
-                        "$lte": end_of_day_utc.isoformat()
-                    }
-                }).to_list(1000)
+                sponsor_orders = sponsor_orders_by_date.get(business_date, {}).get(employee_id, [])
                 
                 if sponsor_orders:
                     # Process sponsor orders to extract sponsoring info
@@ -2871,21 +4339,21 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
             
             # CORRECTED: Calculate daily total as ACTUAL REVENUE only (exclude sponsor cost redistribution)
             # Daily total should represent actual food cost, not cost redistribution between employees
-            daily_total = Decimal('0')
+            daily_total_cents = 0  # Integer cents for exact sums
             
             # WICHTIG: Calculate TOTAL REVENUE from ALL orders (real_orders + sponsor_orders)
             # Real orders = normal orders, sponsor_orders = someone paying for others
             # Both represent actual food costs and should be counted in revenue
             for order in real_orders:  # Count real orders
                 # Use the original order total_price (actual food cost)
-                daily_total += Decimal(str(abs(order.get("total_price", 0))))
+                daily_total_cents += abs(to_cents(order.get("total_price", 0)))
             
             for order in sponsor_orders:  # Also count sponsor orders!
                 # Sponsor orders have NEGATIVE total_price, so use abs() to get actual cost
-                daily_total += Decimal(str(abs(order.get("total_price", 0))))
+                daily_total_cents += abs(to_cents(order.get("total_price", 0)))
             
-            # Convert back to float and round to 2 decimal places
-            total_amount = float(daily_total.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+            # Convert back to euros
+            total_amount = from_cents(daily_total_cents)
             
             history.append({
                 "date": current_date.isoformat(),
@@ -2907,238 +4375,26 @@ async def get_breakfast_history(department_id: str, days_back: int = 30):
 
 @api_router.get("/orders/daily-summary/{department_id}")
 async def get_daily_summary(department_id: str):
-    """Get daily summary of all orders for a department"""
-    # Use Berlin timezone for current day calculation
-    today = get_berlin_date()
-    start_of_day_utc, end_of_day_utc = get_berlin_day_bounds(today)
-    
-    # Get today's orders (Berlin time) - exclude cancelled orders
-    orders = await db.orders.find({
-        "department_id": department_id,
-        "timestamp": {
-            "$gte": start_of_day_utc.isoformat(),
-            "$lte": end_of_day_utc.isoformat()
-        },
-        "$or": [
-            {"is_cancelled": {"$exists": False}},  # Legacy orders without is_cancelled field
-            {"is_cancelled": False}                # Explicitly not cancelled
-        ]
-    }).to_list(1000)
-    
-    # Filter out sponsor orders from statistics (they're not real food orders)
-    real_orders = [order for order in orders if not order.get("is_sponsor_order", False)]
-    
-    # Aggregate breakfast orders with employee details
-    breakfast_summary = {}
-    employee_orders = {}  # Track individual employee orders
-    drinks_summary = {}
-    sweets_summary = {}
-    
-    for order in real_orders:  # Only process real orders for employee statistics
-        if order["order_type"] == "breakfast" and order.get("breakfast_items"):
-            # Get employee info
-            employee = await db.employees.find_one({"id": order["employee_id"]})
-            employee_name = employee["name"] if employee else "Unknown"
-            
-            if employee_name not in employee_orders:
-                employee_orders[employee_name] = {
-                    "white_halves": 0, 
-                    "seeded_halves": 0, 
-                    "boiled_eggs": 0,  # Add boiled eggs tracking
-                    "fried_eggs": 0,  # Add fried eggs tracking
-                    "has_lunch": False,  # Add lunch tracking
-                    "has_coffee": False,  # Add coffee tracking
-                    "notes": "",  # Initialize empty - will be populated during processing
-                    "toppings": {},
-                    "employee_department_id": employee.get("department_id") if employee else None,  # Add employee's home department
-                    "order_department_id": order.get("department_id"),  # Add order's department
-                    "is_8h_service": employee.get("is_8h_service", False) if employee else False  # Add 8H flag
-                }
-            
-            # Check if this order is sponsored and how to handle it
-            is_sponsored = order.get("is_sponsored", False)
-            is_sponsor_order = order.get("is_sponsor_order", False)
-            sponsored_meal_type = order.get("sponsored_meal_type", "")
-            
-            for item in order["breakfast_items"]:
-                # Handle new format (total_halves, white_halves, seeded_halves)
-                if "total_halves" in item:
-                    white_halves = item.get("white_halves", 0)
-                    seeded_halves = item.get("seeded_halves", 0)
-                else:
-                    # Handle old format (roll_type, roll_halves)
-                    roll_type = item.get("roll_type", "weiss")
-                    roll_halves = item.get("roll_halves", item.get("roll_count", 1))
-                    if roll_type == "weiss":
-                        white_halves = roll_halves
-                        seeded_halves = 0
-                    else:
-                        white_halves = 0
-                        seeded_halves = roll_halves
-                
-                # FIXED: Always show original orders for shopping/einkauf purposes
-                # The breakfast overview is for purchasing decisions - must always show what was originally ordered
-                # Sponsoring affects payments/balances, NOT the shopping list
-                show_breakfast = True
-                show_lunch = item.get("has_lunch", False)
-                show_coffee = item.get("has_coffee", False)
-                
-                # NOTE: Sponsoring status does NOT affect what is shown in breakfast overview
-                # The overview shows ORIGINAL orders for shopping purposes
-                # Balances and payments are handled separately
-                
-                # Update employee totals - ALWAYS show original orders for shopping purposes
-                if show_breakfast:
-                    employee_orders[employee_name]["white_halves"] += white_halves
-                    employee_orders[employee_name]["seeded_halves"] += seeded_halves
-                    
-                    # Add boiled eggs if present and breakfast is visible
-                    boiled_eggs = item.get("boiled_eggs", 0)
-                    employee_orders[employee_name]["boiled_eggs"] += boiled_eggs
-                    
-                    # Add fried eggs if present and breakfast is visible
-                    fried_eggs = item.get("fried_eggs", 0)
-                    employee_orders[employee_name]["fried_eggs"] += fried_eggs
-                
-                # Add lunch if present and visible
-                if show_lunch:
-                    employee_orders[employee_name]["has_lunch"] = True
-                
-                # Coffee is always visible
-                if show_coffee:
-                    employee_orders[employee_name]["has_coffee"] = True
-                
-                # Add notes from order level (combine multiple notes if needed)
-                order_notes = order.get("notes", "")
-                if order_notes and order_notes.strip():
-                    existing_notes = employee_orders[employee_name]["notes"]
-                    if existing_notes:
-                        # Split existing notes and new notes by semicolon, combine and deduplicate
-                        existing_parts = [note.strip() for note in existing_notes.split(";") if note.strip()]
-                        new_parts = [note.strip() for note in order_notes.split(";") if note.strip()]
-                        all_parts = existing_parts + new_parts
-                        # Remove duplicates while preserving order
-                        unique_parts = list(dict.fromkeys(all_parts))
-                        employee_orders[employee_name]["notes"] = "; ".join(unique_parts)
-                    else:
-                        # Clean up potential duplicates in the initial notes too
-                        parts = [note.strip() for note in order_notes.split(";") if note.strip()]
-                        unique_parts = list(dict.fromkeys(parts))
-                        employee_orders[employee_name]["notes"] = "; ".join(unique_parts)
-                
-                # Update overall summary only for visible items
-                if show_breakfast:
-                    if "weiss" not in breakfast_summary:
-                        breakfast_summary["weiss"] = {"halves": 0, "toppings": {}}
-                    if "koerner" not in breakfast_summary:
-                        breakfast_summary["koerner"] = {"halves": 0, "toppings": {}}
-                    
-                    breakfast_summary["weiss"]["halves"] += white_halves
-                    breakfast_summary["koerner"]["halves"] += seeded_halves
-                
-                # Count toppings per employee with proper roll type assignment
-                if show_breakfast:
-                    for topping_index, topping in enumerate(item["toppings"]):
-                        # Employee toppings - use new format {white: X, seeded: Y} for frontend compatibility
-                        if topping not in employee_orders[employee_name]["toppings"]:
-                            employee_orders[employee_name]["toppings"][topping] = {"white": 0, "seeded": 0}
-                        elif isinstance(employee_orders[employee_name]["toppings"][topping], int):
-                            # Convert old format to new format
-                            old_count = employee_orders[employee_name]["toppings"][topping]
-                            employee_orders[employee_name]["toppings"][topping] = {"white": old_count, "seeded": 0}
-                        
-                        # Determine which roll type this topping belongs to based on position
-                        if topping_index < white_halves:
-                            # This topping is on a white roll
-                            employee_orders[employee_name]["toppings"][topping]["white"] += 1
-                            
-                            # Also update breakfast_summary for overall topping counts
-                            if topping not in breakfast_summary["weiss"]["toppings"]:
-                                breakfast_summary["weiss"]["toppings"][topping] = 0
-                            breakfast_summary["weiss"]["toppings"][topping] += 1
-                        else:
-                            # This topping is on a seeded roll
-                            employee_orders[employee_name]["toppings"][topping]["seeded"] += 1
-                            
-                            # Also update breakfast_summary for overall topping counts
-                            if topping not in breakfast_summary["koerner"]["toppings"]:
-                                breakfast_summary["koerner"]["toppings"][topping] = 0
-                            breakfast_summary["koerner"]["toppings"][topping] += 1
-        
-        elif order["order_type"] == "drinks" and order.get("drink_items"):
-            for drink_id, quantity in order["drink_items"].items():
-                if drink_id not in drinks_summary:
-                    drinks_summary[drink_id] = 0
-                drinks_summary[drink_id] += quantity
-                
-        elif order["order_type"] == "sweets" and order.get("sweet_items"):
-            for sweet_id, quantity in order["sweet_items"].items():
-                if sweet_id not in sweets_summary:
-                    sweets_summary[sweet_id] = 0
-                sweets_summary[sweet_id] += quantity
-    
-    # Calculate shopping list (convert halves to whole rolls, rounded up)
-    shopping_list = {}
-    total_toppings = {}
-    
-    for roll_type, data in breakfast_summary.items():
-        # Convert halves to whole rolls (rounded up)
-        whole_rolls = (data["halves"] + 1) // 2  # Round up
-        shopping_list[roll_type] = {"halves": data["halves"], "whole_rolls": whole_rolls}
-        
-        # Aggregate all toppings
-        for topping, count in data["toppings"].items():
-            if topping not in total_toppings:
-                total_toppings[topping] = 0
-            total_toppings[topping] += count
-    
-    # Calculate total boiled eggs
-    total_boiled_eggs = sum(data["boiled_eggs"] for data in employee_orders.values())
-    
-    # Calculate total fried eggs
-    total_fried_eggs = sum(data["fried_eggs"] for data in employee_orders.values())
-    
-    # Collect notes summary for frontend display
-    notes_summary = {}
-    for employee_name, data in employee_orders.items():
-        employee_notes = data.get("notes", "")
-        if employee_notes and employee_notes.strip():
-            notes_summary[employee_name] = employee_notes
-    
-    # TEMPORARY: Set total_amount to 0 for all employees to avoid NaN issues
-    # TODO: Implement proper calculation
-    for employee_name, data in employee_orders.items():
-        data["total_amount"] = 0.0
-    
-    return {
-        "date": today.isoformat(),
-        "breakfast_summary": breakfast_summary,
-        "employee_orders": employee_orders,
-        "drinks_summary": drinks_summary,
-        "sweets_summary": sweets_summary,
-        "shopping_list": shopping_list,
-        "total_toppings": total_toppings,
-        "total_boiled_eggs": total_boiled_eggs,  # Add total boiled eggs
-        "total_fried_eggs": total_fried_eggs,  # Add total fried eggs
-        "notes_summary": notes_summary  # Add notes summary for frontend
-    }
+    """Get daily summary of all orders for a department
+
+    Served from the live summary (see LIVE DAILY SUMMARY), which order mutations keep up
+    to date - a poll doesn't read today's orders. Concurrent polls share one rendering.
+    """
+    return await coalesced(("daily-summary", department_id), lambda: render_daily_summary(department_id), ttl=0)
+
+async def render_daily_summary(department_id: str):
+    summary = await get_live_summary(department_id)
+    return await summary.render()
 
 @api_router.get("/employee/{employee_id}/today-orders")
 async def get_employee_today_orders(employee_id: str):
     """Get employee's orders for today"""
-    today = datetime.now(timezone.utc).date()
-    start_of_day = datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc)
-    end_of_day = datetime.combine(today, datetime.max.time()).replace(tzinfo=timezone.utc)
-    
     orders = await db.orders.find({
         "employee_id": employee_id,
-        "timestamp": {
-            "$gte": start_of_day.isoformat(),
-            "$lte": end_of_day.isoformat()
-        }
+        "business_date": get_business_date()
     }).to_list(100)
     
-    return [parse_from_mongo({k: v for k, v in order.items() if k != '_id'}) for order in orders]
+    return [parse_from_mongo(order_to_api(order)) for order in orders]
 
 @api_router.get("/employee/{employee_id}/orders/{order_id}/cancellable")
 async def check_order_cancellable(employee_id: str, order_id: str):
@@ -3159,7 +4415,7 @@ async def check_order_cancellable(employee_id: str, order_id: str):
         return {"cancellable": False, "reason": e.detail}
     
     # Check time restriction (same day in Berlin timezone)
-    order_timestamp = datetime.fromisoformat(order["timestamp"].replace('Z', '+00:00'))
+    order_timestamp = to_utc_datetime(order["timestamp"])
     order_date_berlin = order_timestamp.astimezone(BERLIN_TZ).date()
     today_berlin = get_berlin_date()
     
@@ -3192,6 +4448,7 @@ async def delete_employee_order(employee_id: str, order_id: str):
     order = await db.orders.find_one({"id": order_id, "employee_id": employee_id})
     if not order:
         raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
+    order = order_to_api(order)
     
     # Check if already cancelled
     if order.get("is_cancelled"):
@@ -3201,7 +4458,7 @@ async def delete_employee_order(employee_id: str, order_id: str):
     await check_order_payment_protection(employee_id, order)
     
     # NEW: Check if employee can still cancel (only same day in Berlin timezone)
-    order_timestamp = datetime.fromisoformat(order["timestamp"].replace('Z', '+00:00'))
+    order_timestamp = to_utc_datetime(order["timestamp"])
     order_date_berlin = order_timestamp.astimezone(BERLIN_TZ).date()
     today_berlin = get_berlin_date()
     
@@ -3230,46 +4487,32 @@ async def delete_employee_order(employee_id: str, order_id: str):
     employee_name = employee["name"] if employee else "Unbekannt"
     
     # CORRECTED: Adjust employee balance (add back the order amount) + ERWEITERT für Subkonten
+    # Stammbestellung -> main balance, Gastbestellung -> NUR subaccount (one atomic $inc)
     if employee:
-        # KORRIGIERT: Unterscheide zwischen Stammbestellung und Gastbestellung bei Stornierung
-        is_home_department = (order["department_id"] == employee.get("department_id"))
-        
         if order["order_type"] == "breakfast":
-            if is_home_department:
-                # STAMMBESTELLUNG-STORNIERUNG: Restore NUR main balance
-                new_breakfast_balance = round_to_cents(employee["breakfast_balance"] + order["total_price"])
-                await db.employees.update_one(
-                    {"id": employee_id},
-                    {"$set": {"breakfast_balance": new_breakfast_balance}}
-                )
-            else:
-                # GASTBESTELLUNG-STORNIERUNG: Restore NUR subaccount balance
-                await update_employee_balance(employee_id, order["department_id"], 'breakfast', order["total_price"])
-            
+            await update_employee_balance(
+                employee_id, order["department_id"], 'breakfast', order["total_price"], employee,
+                kind="cancellation", reference_id=order["id"]
+            )
         else:  # DRINKS or SWEETS
-            if is_home_department:
-                # STAMMBESTELLUNG-STORNIERUNG: Restore NUR main balance  
-                new_drinks_sweets_balance = round_to_cents(employee["drinks_sweets_balance"] - order["total_price"])
-                await db.employees.update_one(
-                    {"id": employee_id},
-                    {"$set": {"drinks_sweets_balance": new_drinks_sweets_balance}}
-                )
-            else:
-                # GASTBESTELLUNG-STORNIERUNG: Restore NUR subaccount balance
-                await update_employee_balance(employee_id, order["department_id"], 'drinks', -order["total_price"])
+            await update_employee_balance(
+                employee_id, order["department_id"], 'drinks', -order["total_price"], employee,
+                kind="cancellation", reference_id=order["id"]
+            )
     
     # Mark order as cancelled instead of deleting
     cancellation_data = {
         "is_cancelled": True,
-        "cancelled_at": datetime.now(timezone.utc).isoformat(),
+        "cancelled_at": to_mongo_datetime(datetime.now(timezone.utc)),
         "cancelled_by": "employee", 
         "cancelled_by_name": employee_name
     }
     
     await db.orders.update_one(
         {"id": order_id},
-        {"$set": cancellation_data}
+        {"$set": cancellation_data, "$unset": {"breakfast_day_key": ""}}  # frees the day for a new breakfast
     )
+    await record_order_in_rollup(order, sign=-1)
     
     return {"message": "Bestellung erfolgreich storniert"}
 
@@ -3277,7 +4520,7 @@ async def delete_employee_order(employee_id: str, order_id: str):
 async def get_employee_orders(employee_id: str):
     """Get all orders for a specific employee"""
     orders = await db.orders.find({"employee_id": employee_id}).sort("timestamp", -1).to_list(1000)
-    return [parse_from_mongo(order) for order in orders]
+    return [parse_from_mongo(order_to_api(order)) for order in orders]
 
 @api_router.get("/employees/{employee_id}/orders")
 async def get_employee_orders(employee_id: str):
@@ -3287,8 +4530,7 @@ async def get_employee_orders(employee_id: str):
         # Clean orders by removing MongoDB _id and parsing timestamps
         clean_orders = []
         for order in orders:
-            clean_order = {k: v for k, v in order.items() if k != '_id'}
-            clean_order = parse_from_mongo(clean_order)
+            clean_order = parse_from_mongo(order_to_api(order))
             clean_orders.append(clean_order)
         return {"orders": clean_orders}
     except Exception as e:
@@ -3303,6 +4545,7 @@ async def get_employee_profile(employee_id: str):
     
     # Get order history with menu details
     orders = await db.orders.find({"employee_id": employee_id}).sort("timestamp", -1).to_list(1000)
+    orders = [order_to_api(order) for order in orders]
     
     # KORRIGIERT: Menu items should be loaded per order department, not employee's home department
     employee_department_id = employee.get("department_id")
@@ -3312,35 +4555,30 @@ async def get_employee_profile(employee_id: str):
     department_menus = {}
     
     # Pre-load menus for all departments to handle cross-department orders
+    price_books = {}
     for dept in all_departments:
         dept_id = dept["id"]
-        breakfast_menu = await db.menu_breakfast.find({"department_id": dept_id}).to_list(100)
-        toppings_menu = await db.menu_toppings.find({"department_id": dept_id}).to_list(100)
-        drinks_menu = await db.menu_drinks.find({"department_id": dept_id}).to_list(100)
-        sweets_menu = await db.menu_sweets.find({"department_id": dept_id}).to_list(100)
+        price_book = await get_price_book(dept_id)
+        price_books[dept_id] = price_book
         
         department_menus[dept_id] = {
-            "breakfast_prices": {item["roll_type"]: item["price"] for item in breakfast_menu},
-            "topping_prices": {item["topping_type"]: item["price"] for item in toppings_menu},
-            "topping_names": {item["topping_type"]: item.get("name") or item.get("topping_type", "").capitalize() for item in toppings_menu},
-            "drink_names": {item["id"]: {"name": item["name"], "price": item["price"]} for item in drinks_menu},
-            "sweet_names": {item["id"]: {"name": item["name"], "price": item["price"]} for item in sweets_menu}
+            "topping_names": {item["topping_type"]: item.get("name") or item.get("topping_type", "").capitalize() for item in price_book.toppings_menu},
+            "drink_names": {item["id"]: {"name": item["name"], "price": item["price"]} for item in price_book.drinks_menu},
+            "sweet_names": {item["id"]: {"name": item["name"], "price": item["price"]} for item in price_book.sweets_menu}
         }
     
     # Fallback menus (use employee's home department as default)
     default_dept_menu = department_menus.get(employee_department_id, {})
-    breakfast_prices = default_dept_menu.get("breakfast_prices", {})
-    topping_prices = default_dept_menu.get("topping_prices", {})
     topping_names = default_dept_menu.get("topping_names", {})
     drink_names = default_dept_menu.get("drink_names", {})
     sweet_names = default_dept_menu.get("sweet_names", {})
     
     # Enrich orders with readable names
     enriched_orders = []
+    prices_by_department = {}
     for order in orders:
         # Clean the order data and remove MongoDB _id
-        clean_order = {k: v for k, v in order.items() if k != '_id'}
-        enriched_order = parse_from_mongo(clean_order.copy())
+        enriched_order = parse_from_mongo(dict(order))
         
         if order["order_type"] == "breakfast" and order.get("breakfast_items"):
             enriched_order["readable_items"] = []
@@ -3351,6 +4589,7 @@ async def get_employee_profile(employee_id: str):
                     roll_name = {"weiss": "Helles Brötchen", "koerner": "Körnerbrötchen"}.get(item["roll_type"], item["roll_type"])
                     roll_count = item.get('roll_halves', item.get('roll_count', 1))
                     description = f"{roll_count}x {roll_name} Hälften" if 'roll_halves' in item else f"{roll_count}x {roll_name}"
+                    white_halves, seeded_halves = roll_halves(item)
                 else:
                     # New format with total_halves, white_halves, seeded_halves
                     white_halves = item.get("white_halves", 0)
@@ -3405,34 +4644,31 @@ async def get_employee_profile(employee_id: str):
                 white_toppings_str = ", ".join(white_toppings) if white_toppings else "Ohne Belag"
                 seeded_toppings_str = ", ".join(seeded_toppings) if seeded_toppings else "Ohne Belag"
                 
-                # Get department-specific prices for this order
-                order_breakfast_prices = order_dept_menu.get("breakfast_prices", breakfast_prices)
-                department_prices = await get_department_prices(order_department_id)
-                boiled_eggs_price = department_prices["boiled_eggs_price"]
-                fried_eggs_price = department_prices["fried_eggs_price"]
-                coffee_price = department_prices["coffee_price"]
+                # Price the item with the ORDER department's prices, not the employee's home department
+                if order_department_id not in prices_by_department:
+                    order_price_book = price_books.get(order_department_id) or await get_price_book(order_department_id)
+                    prices_by_department[order_department_id] = unit_prices(order_price_book)
+                order_prices = prices_by_department[order_department_id]
+                breakdown = price_items([item], order_prices, order.get("lunch_price") or 0.0)
                 
                 enriched_order["readable_items"] = []
                 
                 # Add rolls as separate items if present
-                white_halves = item.get("white_halves", 0)
-                seeded_halves = item.get("seeded_halves", 0)
+                white_halves, seeded_halves = roll_halves(item)
                 
                 if white_halves > 0:
-                    white_roll_price = order_breakfast_prices.get("weiss", 0.50)  # Use ORDER department's price
                     enriched_order["readable_items"].append({
                         "description": f"{white_halves}x Helles Brötchen (Hälften)",
-                        "unit_price": f"{white_roll_price:.2f} € pro Hälfte",
-                        "total_price": f"{(white_halves * white_roll_price):.2f} €",
+                        "unit_price": f"{from_cents(order_prices.roll('weiss')):.2f} € pro Hälfte",
+                        "total_price": f"{from_cents(white_halves * order_prices.roll('weiss')):.2f} €",
                         "toppings": white_toppings_str
                     })
                 
                 if seeded_halves > 0:
-                    seeded_roll_price = order_breakfast_prices.get("koerner", 0.60)  # Use ORDER department's price
                     enriched_order["readable_items"].append({
                         "description": f"{seeded_halves}x Körnerbrötchen (Hälften)", 
-                        "unit_price": f"{seeded_roll_price:.2f} € pro Hälfte",
-                        "total_price": f"{(seeded_halves * seeded_roll_price):.2f} €",
+                        "unit_price": f"{from_cents(order_prices.roll('koerner')):.2f} € pro Hälfte",
+                        "total_price": f"{from_cents(seeded_halves * order_prices.roll('koerner')):.2f} €",
                         "toppings": seeded_toppings_str
                     })
                 
@@ -3441,8 +4677,8 @@ async def get_employee_profile(employee_id: str):
                 if boiled_eggs > 0:
                     enriched_order["readable_items"].append({
                         "description": f"{boiled_eggs}x Gekochte Eier",
-                        "unit_price": f"{boiled_eggs_price:.2f} € pro Stück",
-                        "total_price": f"{(boiled_eggs * boiled_eggs_price):.2f} €"
+                        "unit_price": f"{from_cents(order_prices.boiled_eggs):.2f} € pro Stück",
+                        "total_price": f"{from_cents(breakdown['boiled_eggs']):.2f} €"
                     })
                 
                 # Add fried eggs as separate item if present
@@ -3450,26 +4686,26 @@ async def get_employee_profile(employee_id: str):
                 if fried_eggs > 0:
                     enriched_order["readable_items"].append({
                         "description": f"{fried_eggs}x Spiegeleier",
-                        "unit_price": f"{fried_eggs_price:.2f} € pro Stück",
-                        "total_price": f"{(fried_eggs * fried_eggs_price):.2f} €"
+                        "unit_price": f"{from_cents(order_prices.fried_eggs):.2f} € pro Stück",
+                        "total_price": f"{from_cents(breakdown['fried_eggs']):.2f} €"
                     })
                 
                 # Add coffee as separate item if present
                 if item.get("has_coffee"):
                     enriched_order["readable_items"].append({
                         "description": "1x Kaffee",
-                        "unit_price": f"{coffee_price:.2f} € pro Tag",
-                        "total_price": f"{coffee_price:.2f} €"
+                        "unit_price": f"{from_cents(order_prices.coffee):.2f} € pro Tag",
+                        "total_price": f"{from_cents(breakdown['coffee']):.2f} €"
                     })
                 
-                # Add lunch as separate item if present
+                # Add lunch as separate item if present (priced at the lunch price stored on the order)
                 if item.get("has_lunch"):
-                    lunch_price = order.get("lunch_price", 0.0)  # Get actual lunch price from order level
                     
                     # NEU: Get lunch name from daily lunch price
                     lunch_name = "Mittagessen"  # Default
                     order_department_id = order.get("department_id", employee_department_id)
-                    order_date = order.get("timestamp", "")[:10]  # Extract YYYY-MM-DD
+                    order_timestamp = to_utc_datetime(order.get("timestamp"))
+                    order_date = order_timestamp.date().isoformat() if order_timestamp else ""  # Extract YYYY-MM-DD
                     
                     if order_date:
                         daily_lunch = await db.daily_lunch_prices.find_one({
@@ -3482,7 +4718,7 @@ async def get_employee_profile(employee_id: str):
                     enriched_order["readable_items"].append({
                         "description": f"1x {lunch_name}",
                         "unit_price": "",  # Remove price display as requested by user
-                        "total_price": f"{lunch_price:.2f} €"
+                        "total_price": f"{from_cents(breakdown['lunch']):.2f} €"
                     })
         
         elif order["order_type"] in ["drinks", "sweets"]:
@@ -3491,14 +4727,20 @@ async def get_employee_profile(employee_id: str):
             
             # KORRIGIERT: Lade Department-spezifisches Menü für jede Bestellung
             order_department_id = order.get("department_id", employee_department_id)
+            order_dept_menu = department_menus.get(order_department_id)
+            if order_dept_menu is None:
+                # Department not in the list (e.g. deleted) - load its menus from the price book
+                order_price_book = await get_price_book(order_department_id)
+                order_dept_menu = {
+                    "drink_names": {item["id"]: {"name": item["name"], "price": item["price"]} for item in order_price_book.drinks_menu},
+                    "sweet_names": {item["id"]: {"name": item["name"], "price": item["price"]} for item in order_price_book.sweets_menu}
+                }
             if order["order_type"] == "drinks":
-                # Lade Getränkemenü für das spezifische Department
-                order_drinks_menu = await db.menu_drinks.find({"department_id": order_department_id}).to_list(100)
-                names_dict = {item["id"]: {"name": item["name"], "price": item["price"]} for item in order_drinks_menu}
+                # Getränkemenü für das spezifische Department
+                names_dict = order_dept_menu["drink_names"]
             else:  # sweets
-                # Lade Süßigkeitenmenü für das spezifische Department
-                order_sweets_menu = await db.menu_sweets.find({"department_id": order_department_id}).to_list(100)
-                names_dict = {item["id"]: {"name": item["name"], "price": item["price"]} for item in order_sweets_menu}
+                # Süßigkeitenmenü für das spezifische Department
+                names_dict = order_dept_menu["sweet_names"]
             
             for item_id, quantity in items_dict.items():
                 if item_id in names_dict and quantity > 0:
@@ -3518,22 +4760,19 @@ async def get_employee_profile(employee_id: str):
     # Get payment logs for this employee
     payment_logs = await db.payment_logs.find({"employee_id": employee_id}).sort("timestamp", -1).to_list(1000)
     
-    # Clean payment logs
-    clean_payment_logs = []
-    for log in payment_logs:
-        clean_log = {k: v for k, v in log.items() if k != '_id'}
-        clean_payment_logs.append(clean_log)
+    # Clean payment logs (amounts in euros)
+    clean_payment_logs = [payment_log_to_api(log) for log in payment_logs]
     
-    # Clean employee data and remove MongoDB _id
-    clean_employee = {k: v for k, v in employee.items() if k != '_id'}
+    # Clean employee data (balances in euros) and remove MongoDB _id
+    clean_employee = employee_to_api(employee)
     
     return {
         "employee": clean_employee,
         "order_history": enriched_orders,
         "payment_history": clean_payment_logs,  # Add payment history
         "total_orders": len(orders),
-        "breakfast_total": employee["breakfast_balance"],
-        "drinks_sweets_total": employee["drinks_sweets_balance"]
+        "breakfast_total": clean_employee["breakfast_balance"],
+        "drinks_sweets_total": clean_employee["drinks_sweets_balance"]
     }
 
 @api_router.post("/department-admin/close-breakfast/{department_id}")
@@ -3566,18 +4805,23 @@ async def close_breakfast_for_day(department_id: str, admin_name: str):
             {"$set": {
                 "is_closed": True,
                 "closed_by": admin_name,
-                "closed_at": breakfast_setting.closed_at.isoformat()
+                "closed_at": to_mongo_datetime(breakfast_setting.closed_at)
             }}
         )
     else:
         setting_dict = prepare_for_mongo(breakfast_setting.dict())
         await db.breakfast_settings.insert_one(setting_dict)
+    invalidate_coalesced("breakfast-status", department_id)
+    event_bus.publish(department_id, "breakfast_closed")
     
     return {"message": "Frühstück für heute geschlossen", "closed_by": admin_name}
 
 @api_router.get("/breakfast-status/{department_id}")
 async def get_breakfast_status(department_id: str):
-    """Check if breakfast is closed for today"""
+    """Check if breakfast is closed for today (coalesced per department)"""
+    return await coalesced(("breakfast-status", department_id), lambda: load_breakfast_status(department_id))
+
+async def load_breakfast_status(department_id: str):
     # Use Berlin timezone for current day
     today = get_berlin_date().isoformat()
     
@@ -3598,7 +4842,10 @@ async def get_breakfast_status(department_id: str):
 
 @api_router.get("/sponsoring-status/{department_id}")
 async def get_sponsoring_status(department_id: str):
-    """Check if ordering is blocked due to sponsoring for today"""
+    """Check if ordering is blocked due to sponsoring for today (coalesced per department)"""
+    return await coalesced(("sponsoring-status", department_id), lambda: load_sponsoring_status(department_id))
+
+async def load_sponsoring_status(department_id: str):
     # Use Berlin timezone for current day
     today = get_berlin_date().isoformat()
     
@@ -3645,6 +4892,8 @@ async def reopen_breakfast_for_day(department_id: str):
             "closed_at": None
         }}
     )
+    invalidate_coalesced("breakfast-status", department_id)
+    event_bus.publish(department_id, "breakfast_reopened")
     
     return {"message": "Frühstück für heute wieder geöffnet"}
 
@@ -3707,9 +4956,10 @@ async def update_breakfast_menu_item(item_id: str, update_data: MenuItemUpdate,
         # Query must include both id and department_id for security
         query = {"id": item_id, "department_id": department_id}
             
-        result = await db.menu_breakfast.update_one(query, {"$set": update_fields})
+        result = await db.menu_breakfast.update_one(query, money_update(update_fields, MENU_MONEY_FIELDS))
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Artikel nicht gefunden oder keine Berechtigung")
+        invalidate_price_book(department_id)
     
     return {"message": "Artikel erfolgreich aktualisiert"}
 
@@ -3731,9 +4981,10 @@ async def update_toppings_menu_item(item_id: str, update_data: MenuItemUpdate, d
         if department_id:
             query["department_id"] = department_id
             
-        result = await db.menu_toppings.update_one(query, {"$set": update_fields})
+        result = await db.menu_toppings.update_one(query, money_update(update_fields, MENU_MONEY_FIELDS))
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Belag nicht gefunden oder keine Berechtigung")
+        invalidate_price_book(department_id)
     
     return {"message": "Belag erfolgreich aktualisiert"}
 
@@ -3751,9 +5002,10 @@ async def update_drinks_menu_item(item_id: str, update_data: MenuItemUpdate, dep
         if department_id:
             query["department_id"] = department_id
             
-        result = await db.menu_drinks.update_one(query, {"$set": update_fields})
+        result = await db.menu_drinks.update_one(query, money_update(update_fields, MENU_MONEY_FIELDS))
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Getränk nicht gefunden oder keine Berechtigung")
+        invalidate_price_book(department_id)
     
     return {"message": "Getränk erfolgreich aktualisiert"}
 
@@ -3771,9 +5023,10 @@ async def update_sweets_menu_item(item_id: str, update_data: MenuItemUpdate, dep
         if department_id:
             query["department_id"] = department_id
             
-        result = await db.menu_sweets.update_one(query, {"$set": update_fields})
+        result = await db.menu_sweets.update_one(query, money_update(update_fields, MENU_MONEY_FIELDS))
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Süßware nicht gefunden oder keine Berechtigung")
+        invalidate_price_book(department_id)
     
     return {"message": "Süßware erfolgreich aktualisiert"}
 
@@ -3781,14 +5034,16 @@ async def update_sweets_menu_item(item_id: str, update_data: MenuItemUpdate, dep
 async def create_drink_item(item_data: MenuItemCreate):
     """Department Admin: Create new drink item"""
     drink_item = MenuItemDrink(**item_data.dict())
-    await db.menu_drinks.insert_one(drink_item.dict())
+    await db.menu_drinks.insert_one(menu_item_to_storage(drink_item.dict()))
+    invalidate_price_book(drink_item.department_id)
     return drink_item
 
 @api_router.post("/department-admin/menu/sweets")
 async def create_sweet_item(item_data: MenuItemCreate):
     """Department Admin: Create new sweet item"""
     sweet_item = MenuItemSweet(**item_data.dict())
-    await db.menu_sweets.insert_one(sweet_item.dict())
+    await db.menu_sweets.insert_one(menu_item_to_storage(sweet_item.dict()))
+    invalidate_price_book(sweet_item.department_id)
     return sweet_item
 
 @api_router.delete("/department-admin/menu/drinks/{item_id}")
@@ -3797,6 +5052,7 @@ async def delete_drink_item(item_id: str):
     result = await db.menu_drinks.delete_one({"id": item_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Getränk nicht gefunden")
+    invalidate_price_book()
     return {"message": "Getränk erfolgreich gelöscht"}
 
 @api_router.delete("/department-admin/menu/sweets/{item_id}")
@@ -3805,6 +5061,7 @@ async def delete_sweet_item(item_id: str):
     result = await db.menu_sweets.delete_one({"id": item_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Süßware nicht gefunden")
+    invalidate_price_book()
     return {"message": "Süßware erfolgreich gelöscht"}
 
 @api_router.delete("/department-admin/employees/{employee_id}")
@@ -3818,6 +5075,7 @@ async def delete_employee(employee_id: str):
     employee = await db.employees.find_one({"id": employee_id})
     if not employee:
         raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
+    employee = employee_to_api(employee)
     
     # Check if employee can be deleted based on balances
     if employee.get('is_8h_service'):
@@ -3858,8 +5116,18 @@ async def delete_employee(employee_id: str):
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
     
-    # Also delete all orders for this employee
+    # Also delete all orders for this employee (and take them out of the rollups)
+    employee_orders = await db.orders.find(
+        {"employee_id": employee_id, "order_type": "breakfast"},
+        {"_id": 0, "id": 1, "breakfast_items": 1, "department_id": 1, "business_date": 1, "timestamp": 1,
+         "order_type": 1, "total_price": 1, "total_price_cents": 1, "is_cancelled": 1, "is_sponsor_order": 1}
+    ).to_list(None)
     await db.orders.delete_many({"employee_id": employee_id})
+    for order in employee_orders:
+        await record_order_in_rollup(order, sign=-1)
+    # Drinks and sweets orders are gone as well - rebuild the live summaries on the next poll
+    drop_live_summary()
+    event_bus.publish(None, "employee_deleted", employee_ids=[employee_id])
     
     return {"message": "Mitarbeiter erfolgreich gelöscht"}
 
@@ -3867,7 +5135,8 @@ async def delete_employee(employee_id: str):
 async def create_breakfast_item(item_data: MenuItemCreateBreakfast):
     """Department Admin: Create new breakfast item"""
     breakfast_item = MenuItemBreakfast(**item_data.dict())
-    await db.menu_breakfast.insert_one(breakfast_item.dict())
+    await db.menu_breakfast.insert_one(menu_item_to_storage(breakfast_item.dict()))
+    invalidate_price_book(breakfast_item.department_id)
     return breakfast_item
 
 @api_router.delete("/department-admin/menu/breakfast/{item_id}")
@@ -3876,6 +5145,7 @@ async def delete_breakfast_item(item_id: str):
     result = await db.menu_breakfast.delete_one({"id": item_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Brötchen nicht gefunden")
+    invalidate_price_book()
     return {"message": "Brötchen erfolgreich gelöscht"}
 
 @api_router.post("/department-admin/menu/toppings")
@@ -3888,7 +5158,8 @@ async def create_topping_item(item_data: MenuItemCreateToppings):
         price=item_data.price,
         department_id=item_data.department_id
     )
-    await db.menu_toppings.insert_one(topping_item.dict())
+    await db.menu_toppings.insert_one(menu_item_to_storage(topping_item.dict()))
+    invalidate_price_book(topping_item.department_id)
     return topping_item
 
 @api_router.delete("/department-admin/menu/toppings/{item_id}")
@@ -3901,11 +5172,25 @@ async def delete_topping_item(item_id: str, department_id: str = None):
     result = await db.menu_toppings.delete_one(query)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Belag nicht gefunden oder keine Berechtigung")
+    invalidate_price_book(department_id)
     return {"message": "Belag erfolgreich gelöscht"}
 
 @api_router.post("/department-admin/flexible-payment/{employee_id}")
-async def flexible_payment(employee_id: str, payment_data: FlexiblePaymentRequest, admin_department: str):
-    """Department Admin: Process flexible payment with any amount"""
+async def flexible_payment(employee_id: str, payment_data: FlexiblePaymentRequest, admin_department: str,
+                           idempotency_key: Optional[str] = Header(None)):
+    """Department Admin: Process flexible payment with any amount
+
+    Idempotent with an Idempotency-Key header (see run_idempotent).
+    """
+    return await run_idempotent(
+        idempotency_key,
+        f"flexible-payment:{employee_id}",
+        payment_data,
+        lambda claim: book_flexible_payment(employee_id, payment_data, admin_department, claim)
+    )
+
+async def book_flexible_payment(employee_id: str, payment_data: FlexiblePaymentRequest, admin_department: str, claim=None):
+    """Book a payment on the employee's main balance and log it"""
     employee = await db.employees.find_one({"id": employee_id})
     if not employee:
         raise HTTPException(status_code=404, detail="Mitarbeiter nicht gefunden")
@@ -3914,18 +5199,21 @@ async def flexible_payment(employee_id: str, payment_data: FlexiblePaymentReques
     if payment_data.payment_type not in ["breakfast", "drinks_sweets"]:
         raise HTTPException(status_code=400, detail="Invalid payment_type. Use 'breakfast' or 'drinks_sweets'")
     
-    # Get current balance
-    if payment_data.payment_type == "breakfast":
-        current_balance = employee.get("breakfast_balance", 0.0)
-        balance_field = "breakfast_balance"
-    else:
-        current_balance = employee.get("drinks_sweets_balance", 0.0) 
-        balance_field = "drinks_sweets_balance"
+    balance_field = "breakfast_balance" if payment_data.payment_type == "breakfast" else "drinks_sweets_balance"
     
-    # Calculate new balance - CORRECTED LOGIC
     # Negative balance = debt (owes money), Positive balance = credit (has money)
-    # Payment INCREASES balance (reduces debt or adds credit)
-    new_balance = round_to_cents(current_balance + payment_data.amount)
+    # Payment INCREASES balance (reduces debt or adds credit) - one atomic $inc on the main balance
+    # (+ home subaccount mirror); before/after are taken from the updated document
+    if employee.get("is_8h_service", False):
+        increments = {cents_field(balance_field): to_cents(payment_data.amount)}
+    else:
+        increments = balance_increments(employee, employee["department_id"], payment_data.payment_type, payment_data.amount)
+    payment_log_id = str(uuid.uuid4())
+    updated_employee = await apply_balance_increments(employee_id, increments, employee, kind="payment", reference_id=payment_log_id)
+    if claim:
+        claim.mark_persisted()
+    new_balance = from_cents(stored_cents(updated_employee, balance_field))
+    current_balance = round_to_cents(new_balance - payment_data.amount)
     
     # Get readable department name
     department_doc = await db.departments.find_one({"id": admin_department})
@@ -3933,6 +5221,7 @@ async def flexible_payment(employee_id: str, payment_data: FlexiblePaymentReques
     
     # Create payment log with balance tracking
     payment_log = PaymentLog(
+        id=payment_log_id,
         employee_id=employee_id,
         department_id=employee["department_id"],
         amount=payment_data.amount,
@@ -3945,15 +5234,9 @@ async def flexible_payment(employee_id: str, payment_data: FlexiblePaymentReques
     )
     
     # Save payment log
-    payment_dict = prepare_for_mongo(payment_log.dict())
+    payment_dict = prepare_for_mongo(payment_log_to_storage(payment_log.dict()))
     await db.payment_logs.insert_one(payment_dict)
     
-    # Update employee balance
-    await db.employees.update_one(
-        {"id": employee_id},
-        {"$set": {balance_field: new_balance}}
-    )
-    
     # Determine result type
     if new_balance < 0:
         result_description = f"Restschuld: {abs(new_balance):.2f} €"
@@ -3989,11 +5272,14 @@ async def get_extended_order_history(department_id: str, limit: int = 50):
             "department_id": department_id
         }).sort("timestamp", -1).limit(limit).to_list(limit)
         
-        # Enrich orders with employee information
+        # Enrich orders with employee information (one query for all employees)
+        employees_by_id = await load_employees_by_ids(order["employee_id"] for order in orders)
+        drink_map = None  # Menu names are loaded once, on first use
+        sweet_map = None
         enriched_orders = []
         for order in orders:
             # Get employee info
-            employee = await db.employees.find_one({"id": order["employee_id"]})
+            employee = employees_by_id.get(order["employee_id"])
             employee_name = employee["name"] if employee else "Unbekannt"
             is_8h_service = employee.get("is_8h_service", False) if employee else False
             is_guest = employee.get("is_guest", False) if employee else False
@@ -4020,7 +5306,7 @@ async def get_extended_order_history(department_id: str, limit: int = 50):
                 order_details = {
                     "type": "Frühstück",
                     "items": [],
-                    "total_price": abs(order.get("total_price", 0.0))  # Use absolute value for display
+                    "total_price": abs(stored_euros(order, "total_price"))  # Use absolute value for display
                 }
                 
                 # Ensure items is a list
@@ -4069,7 +5355,7 @@ async def get_extended_order_history(department_id: str, limit: int = 50):
                 order_details = {
                     "type": "Getränke" if order_type == "DRINKS" else "Snacks",
                     "items": [],
-                    "total_price": abs(order.get("total_price", 0.0))  # Use absolute value for display
+                    "total_price": abs(stored_euros(order, "total_price"))  # Use absolute value for display
                 }
                 
                 # Parse drink_items or sweet_items
@@ -4084,8 +5370,9 @@ async def get_extended_order_history(department_id: str, limit: int = 50):
                 
                 # For drinks - get names from department menu
                 if drink_items and len(drink_items) > 0:
-                    dept_menu = await db.menu_drinks.find({"department_id": department_id}).to_list(100)
-                    drink_map = {item["id"]: item["name"] for item in dept_menu}
+                    if drink_map is None:
+                        dept_menu = await db.menu_drinks.find({"department_id": department_id}).to_list(100)
+                        drink_map = {item["id"]: item["name"] for item in dept_menu}
                     
                     for item_id, quantity in drink_items.items():
                         if quantity > 0:  # Only include items with quantity > 0
@@ -4094,8 +5381,9 @@ async def get_extended_order_history(department_id: str, limit: int = 50):
                 
                 # For sweets - get names from department menu
                 if sweet_items and len(sweet_items) > 0:
-                    dept_menu = await db.menu_sweets.find({"department_id": department_id}).to_list(100)
-                    sweet_map = {item["id"]: item["name"] for item in dept_menu}
+                    if sweet_map is None:
+                        dept_menu = await db.menu_sweets.find({"department_id": department_id}).to_list(100)
+                        sweet_map = {item["id"]: item["name"] for item in dept_menu}
                     
                     for item_id, quantity in sweet_items.items():
                         if quantity > 0:  # Only include items with quantity > 0
@@ -4155,24 +5443,18 @@ async def mark_payment(employee_id: str, payment_type: str, amount: float, admin
         action="payment",
         admin_user=department_name,  # KORRIGIERT: Benutzerfreundlicher Name statt ID
         notes=f"Schulden als bezahlt markiert: {amount:.2f} € (LEGACY)",
-        balance_before=employee.get(f"{payment_type}_balance", 0.0),
+        balance_before=from_cents(stored_cents(employee, f"{payment_type}_balance")),
         balance_after=0.0
     )
     
     # Save payment log
-    payment_dict = prepare_for_mongo(payment_log.dict())
+    payment_dict = prepare_for_mongo(payment_log_to_storage(payment_log.dict()))
     await db.payment_logs.insert_one(payment_dict)
     
     # Reset the balance to zero
-    if payment_type == "breakfast":
-        await db.employees.update_one(
-            {"id": employee_id},
-            {"$set": {"breakfast_balance": 0.0}}
-        )
-    elif payment_type == "drinks_sweets":
-        await db.employees.update_one(
-            {"id": employee_id},
-            {"$set": {"drinks_sweets_balance": 0.0}}
+    if payment_type in ("breakfast", "drinks_sweets"):
+        await set_employee_balances(
+            employee_id, {cents_field(f"{payment_type}_balance"): 0}, kind="legacy_payment", reference_id=payment_log.id
         )
     
     return {"message": "Zahlung erfolgreich verbucht und Saldo zurückgesetzt"}
@@ -4181,31 +5463,37 @@ async def mark_payment(employee_id: str, payment_type: str, amount: float, admin
 async def get_payment_logs(employee_id: str):
     """Get payment history for an employee"""
     logs = await db.payment_logs.find({"employee_id": employee_id}).sort("timestamp", -1).to_list(100)
-    return [parse_from_mongo({k: v for k, v in log.items() if k != '_id'}) for log in logs]
+    return [parse_from_mongo(payment_log_to_api(log)) for log in logs]
 
 @api_router.get("/department-admin/breakfast-history/{department_id}")
 async def get_admin_breakfast_history(department_id: str, days: int = 7):
     """Get breakfast history for past days"""
     histories = []
+    today = get_berlin_date()
+    target_dates = [today - timedelta(days=i) for i in range(1, days + 1)]  # Start from yesterday
     
-    for i in range(1, days + 1):  # Start from yesterday
-        target_date = datetime.now(timezone.utc).date() - timedelta(days=i)
-        start_of_day = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=timezone.utc)
-        end_of_day = datetime.combine(target_date, datetime.max.time()).replace(tzinfo=timezone.utc)
-        
-        # Get orders for that day - exclude cancelled orders
-        orders = await db.orders.find({
-            "department_id": department_id,
-            "order_type": "breakfast",
-            "timestamp": {
-                "$gte": start_of_day.isoformat(),
-                "$lte": end_of_day.isoformat()
-            },
-            "$or": [
-                {"is_cancelled": {"$exists": False}},  # Legacy orders without is_cancelled field
-                {"is_cancelled": False}                # Explicitly not cancelled
-            ]
-        }).to_list(1000)
+    # Get orders for all days at once - exclude cancelled orders
+    all_orders = await db.orders.find({
+        "department_id": department_id,
+        "order_type": "breakfast",
+        "business_date": {"$in": [target_date.isoformat() for target_date in target_dates]},
+        "$or": [
+            {"is_cancelled": {"$exists": False}},  # Legacy orders without is_cancelled field
+            {"is_cancelled": False}                # Explicitly not cancelled
+        ]
+    }).to_list(None)
+    
+    orders_by_date = {}
+    for order in all_orders:
+        orders_by_date.setdefault(order["business_date"], []).append(order)
+    
+    # Resolve all employees of the period with a single query
+    employees_by_id = await load_employees_by_ids(
+        order["employee_id"] for order in all_orders if not order.get("is_sponsor_order", False)
+    )
+    
+    for target_date in target_dates:
+        orders = orders_by_date.get(target_date.isoformat(), [])
         
         if orders:  # Only include days with orders
             # Process the same way as daily summary
@@ -4216,7 +5504,7 @@ async def get_admin_breakfast_history(department_id: str, days: int = 7):
             real_orders = [order for order in orders if not order.get("is_sponsor_order", False)]
             
             for order in real_orders:  # Only process real orders for employee statistics
-                employee = await db.employees.find_one({"id": order["employee_id"]})
+                employee = employees_by_id.get(order["employee_id"])
                 employee_name = employee["name"] if employee else "Unknown"
                 
                 if employee_name not in employee_orders:
@@ -4277,6 +5565,7 @@ async def delete_order_by_admin(order_id: str, admin_user: str = "Admin"):
         order = await db.orders.find_one({"id": order_id})
         if not order:
             raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
+        order = order_to_api(order)
         
         # Check if already cancelled
         if order.get("is_cancelled"):
@@ -4287,44 +5576,32 @@ async def delete_order_by_admin(order_id: str, admin_user: str = "Admin"):
         employee_name = employee["name"] if employee else "Unbekannt"
         
         # CORRECTED: Adjust employee balance before cancelling the order (refund) + ERWEITERT für Subkonten
+        # One refund per order: Stammbestellung -> main balance (+ mirror), Gastbestellung -> subaccount
         if employee:
-            # KORRIGIERT: Unterscheide zwischen Stammbestellung und Gastbestellung bei Admin-Stornierung
-            is_home_department = (order["department_id"] == employee.get("department_id"))
-            
             if order["order_type"] == "breakfast":
-                if is_home_department:
-                    # STAMMBESTELLUNG-STORNIERUNG: Admin refund main balance
-                    new_breakfast_balance = round_to_cents(employee["breakfast_balance"] + order["total_price"])
-                    await db.employees.update_one(
-                        {"id": order["employee_id"]},
-                        {"$set": {"breakfast_balance": new_breakfast_balance}}
-                    )
-                # IMMER: Admin refund subaccount balance (für Stamm- und Gastbestellungen)
-                await update_employee_balance(order["employee_id"], order["department_id"], 'breakfast', order["total_price"])
-                
+                await update_employee_balance(
+                    order["employee_id"], order["department_id"], 'breakfast', order["total_price"], employee,
+                    kind="cancellation", reference_id=order["id"]
+                )
             else:
-                if is_home_department:
-                    # STAMMBESTELLUNG-STORNIERUNG: Admin refund main balance
-                    new_drinks_sweets_balance = round_to_cents(employee["drinks_sweets_balance"] - order["total_price"])
-                    await db.employees.update_one(
-                        {"id": order["employee_id"]},
-                        {"$set": {"drinks_sweets_balance": new_drinks_sweets_balance}}
-                    )
-                # IMMER: Admin refund subaccount balance (für Stamm- und Gastbestellungen)
-                await update_employee_balance(order["employee_id"], order["department_id"], 'drinks', -order["total_price"])
+                await update_employee_balance(
+                    order["employee_id"], order["department_id"], 'drinks', -order["total_price"], employee,
+                    kind="cancellation", reference_id=order["id"]
+                )
         
         # Mark order as cancelled instead of deleting
         cancellation_data = {
             "is_cancelled": True,
-            "cancelled_at": datetime.now(timezone.utc).isoformat(),
+            "cancelled_at": to_mongo_datetime(datetime.now(timezone.utc)),
             "cancelled_by": "admin",
             "cancelled_by_name": "Admin"  # Single Admin text as requested
         }
         
         await db.orders.update_one(
             {"id": order_id},
-            {"$set": cancellation_data}
+            {"$set": cancellation_data, "$unset": {"breakfast_day_key": ""}}
         )
+        await record_order_in_rollup(order, sign=-1)
         
         return {"message": "Bestellung erfolgreich storniert"}
     except Exception as e:
@@ -4335,82 +5612,28 @@ async def update_order(order_id: str, order_update: dict):
     """Update an existing order"""
     try:
         # Find the existing order
-        existing_order = await db.orders.find_one({"id": order_id})
-        if not existing_order:
-            raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
-        
-        # Update the order with new data
-        update_fields = {}
-        if "breakfast_items" in order_update:
-            update_fields["breakfast_items"] = order_update["breakfast_items"]
-            
-            # Recalculate total price for breakfast items
-            total_price = 0.0
-            
-            # Get current menu prices (department-specific)
-            breakfast_menu = await db.menu_breakfast.find({"department_id": existing_order["department_id"]}).to_list(100)
-            toppings_menu = await db.menu_toppings.find({"department_id": existing_order["department_id"]}).to_list(100)
-            
-            breakfast_prices = {item["roll_type"]: item["price"] for item in breakfast_menu}
-            toppings_prices = {item["topping_type"]: item["price"] for item in toppings_menu}
-            
-            for item in order_update["breakfast_items"]:
-                # Handle new format with white_halves and seeded_halves
-                white_halves = item.get("white_halves", 0)
-                seeded_halves = item.get("seeded_halves", 0)
-                
-                # Prices are per-half roll as set by admin
-                white_price = breakfast_prices.get("weiss", 0.0)
-                seeded_price = breakfast_prices.get("koerner", 0.0)
-                
-                total_price += (white_halves * white_price) + (seeded_halves * seeded_price)
-                
-                # Add toppings price (toppings are free currently)
-                for topping in item.get("toppings", []):
-                    total_price += toppings_prices.get(topping, 0.0)
-                
-                # Add boiled eggs price if applicable
-                boiled_eggs = item.get("boiled_eggs", 0)
-                if boiled_eggs > 0:
-                    department_prices = await get_department_prices(existing_order["department_id"])
-                    boiled_eggs_price = department_prices["boiled_eggs_price"]
-                    total_price += boiled_eggs * boiled_eggs_price
-                
-                # Add fried eggs price if applicable
-                fried_eggs = item.get("fried_eggs", 0)
-                if fried_eggs > 0:
-                    department_prices = await get_department_prices(existing_order["department_id"])
-                    fried_eggs_price = department_prices["fried_eggs_price"]
-                    total_price += fried_eggs * fried_eggs_price
-                
-                # Add coffee price if applicable
-                if item.get("has_coffee", False):
-                    department_prices = await get_department_prices(existing_order["department_id"])
-                    coffee_price = department_prices["coffee_price"]
-                    total_price += coffee_price
-                
-                # Add lunch price if applicable
-                if item.get("has_lunch"):
-                    # Get daily lunch price for today (Berlin timezone)
-                    today = get_berlin_date().strftime('%Y-%m-%d')
-                    daily_price = await db.daily_lunch_prices.find_one({
-                        "department_id": existing_order["department_id"],
-                        "date": today
-                    })
-                    
-                    if daily_price:
-                        lunch_price = daily_price["lunch_price"]
-                    else:
-                        # NEW: Default to 0.0 for new days - admin must set price manually each day
-                        lunch_price = 0.0
-                    
-                    # Lunch price should be added once per order, not multiplied by roll halves
-                    total_price += lunch_price
-                    
-                    # Update the order's lunch information
-                    update_fields["has_lunch"] = True
-                    update_fields["lunch_price"] = lunch_price
+        existing_order = await db.orders.find_one({"id": order_id})
+        if not existing_order:
+            raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
+        existing_order = order_to_api(existing_order)
+        
+        # Update the order with new data
+        update_fields = {}
+        if "breakfast_items" in order_update:
+            update_fields["breakfast_items"] = order_update["breakfast_items"]
             
+            # Recalculate total price for breakfast items (department-specific prices).
+            # Lunch keeps the price of the order's business day.
+            price_book = await get_price_book(existing_order["department_id"])
+            has_lunch = any(item.get("has_lunch") for item in order_update["breakfast_items"])
+            lunch_price = 0.0
+            if has_lunch:
+                business_date = existing_order.get("business_date") or get_berlin_date().isoformat()
+                lunch_price = await price_book.daily_lunch_price(business_date)
+            breakdown = price_items(order_update["breakfast_items"], unit_prices(price_book), lunch_price)
+            total_price = from_cents(breakdown["total"])
+            update_fields["has_lunch"] = has_lunch
+            update_fields["lunch_price"] = lunch_price if has_lunch else None
             update_fields["total_price"] = total_price
         
         if "drink_items" in order_update:
@@ -4427,12 +5650,14 @@ async def update_order(order_id: str, order_update: dict):
         # Update the order in database
         result = await db.orders.update_one(
             {"id": order_id},
-            {"$set": update_fields}
+            money_update(update_fields, ORDER_MONEY_FIELDS)
         )
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
         
+        await record_order_change_in_rollup(existing_order, {**existing_order, **update_fields})
+        
         # Update employee balance
         employee = await db.employees.find_one({"id": existing_order["employee_id"]})
         if employee:
@@ -4444,11 +5669,11 @@ async def update_order(order_id: str, order_update: dict):
             # Update employee balance - CORRECTED LOGIC
             # Price increase = more debt (balance decreases)
             # Price decrease = less debt (balance increases)
-            new_breakfast_balance = round_to_cents(employee.get("breakfast_balance", 0.0) - price_difference)
-            await db.employees.update_one(
-                {"id": existing_order["employee_id"]},
-                {"$set": {"breakfast_balance": new_breakfast_balance}}
-            )
+            if price_difference != 0:
+                await update_employee_balance(
+                    existing_order["employee_id"], existing_order["department_id"], 'breakfast', -price_difference, employee,
+                    kind="order_update", reference_id=order_id
+                )
         
         return {"message": "Bestellung erfolgreich aktualisiert", "order_id": order_id}
         
@@ -4461,25 +5686,17 @@ async def delete_order(order_id: str):
     order = await db.orders.find_one({"id": order_id})
     if not order:
         raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
+    order = order_to_api(order)
     
     # Adjust employee balance
-    employee = await db.employees.find_one({"id": order["employee_id"]})
-    if employee:
-        if order["order_type"] == "breakfast":
-            new_breakfast_balance = employee["breakfast_balance"] - order["total_price"]
-            await db.employees.update_one(
-                {"id": order["employee_id"]},
-                {"$set": {"breakfast_balance": max(0, new_breakfast_balance)}}
-            )
-        else:
-            new_drinks_sweets_balance = employee["drinks_sweets_balance"] - order["total_price"]
-            await db.employees.update_one(
-                {"id": order["employee_id"]},
-                {"$set": {"drinks_sweets_balance": max(0, new_drinks_sweets_balance)}}
-            )
+    balance_field = "breakfast_balance" if order["order_type"] == "breakfast" else "drinks_sweets_balance"
+    await clamp_decrement_employee_balance(
+        order["employee_id"], balance_field, order["total_price"], kind="order_deletion", reference_id=order_id
+    )
     
     # Delete order
     await db.orders.delete_one({"id": order_id})
+    await record_order_in_rollup(order, sign=-1)
     return {"message": "Bestellung erfolgreich gelöscht"}
 
 @api_router.delete("/department-admin/breakfast-day/{department_id}/{date}")
@@ -4497,18 +5714,16 @@ async def delete_breakfast_day(department_id: str, date: str):
         # Validate date format and use Berlin timezone like other functions
         parsed_date = datetime.fromisoformat(date).date()
         
-        # CRITICAL FIX: Use Berlin timezone day bounds like all other functions
-        start_of_day_utc, end_of_day_utc = get_berlin_day_bounds(parsed_date)
+        # CRITICAL FIX: Use Berlin business day like all other functions
+        business_date = parsed_date.isoformat()
         
         # Find all breakfast orders for this department and date
         breakfast_orders = await db.orders.find({
             "department_id": department_id,
             "order_type": "breakfast",
-            "timestamp": {
-                "$gte": start_of_day_utc.isoformat(),
-                "$lte": end_of_day_utc.isoformat()
-            }
+            "business_date": business_date
         }).to_list(1000)
+        breakfast_orders = [order_to_api(order) for order in breakfast_orders]
         
         if not breakfast_orders:
             raise HTTPException(status_code=404, detail="Keine Frühstücks-Bestellungen für dieses Datum gefunden")
@@ -4519,19 +5734,19 @@ async def delete_breakfast_day(department_id: str, date: str):
         # Process each order
         for order in breakfast_orders:
             # Adjust employee balance
-            employee = await db.employees.find_one({"id": order["employee_id"]})
-            if employee:
-                new_breakfast_balance = employee["breakfast_balance"] - order["total_price"]
-                await db.employees.update_one(
-                    {"id": order["employee_id"]},
-                    {"$set": {"breakfast_balance": max(0, new_breakfast_balance)}}
-                )
+            previous = await clamp_decrement_employee_balance(
+                order["employee_id"], "breakfast_balance", order["total_price"], kind="order_deletion", reference_id=order["id"]
+            )
+            if previous:
                 total_amount_refunded += order["total_price"]
             
             # Delete the order
             await db.orders.delete_one({"id": order["id"]})
             deleted_count += 1
         
+        await rebuild_daily_rollup(department_id, business_date)
+        event_bus.publish(department_id, "resync")
+        
         return {
             "message": f"Frühstücks-Tag erfolgreich gelöscht",
             "deleted_orders": deleted_count,
@@ -4554,14 +5769,14 @@ async def get_sponsor_status(department_id: str, date: str):
         except ValueError:
             raise HTTPException(status_code=400, detail="Ungültiges Datumsformat. Verwenden Sie YYYY-MM-DD.")
         
-        # Get Berlin timezone day boundaries
-        start_of_day_utc, end_of_day_utc = get_berlin_day_bounds(parsed_date)
+        # Berlin business day
+        business_date = parsed_date.isoformat()
         
         # Get all breakfast orders for that day
         all_orders = await db.orders.find({
             "department_id": department_id,
             "order_type": "breakfast",
-            "timestamp": {"$gte": start_of_day_utc.isoformat(), "$lte": end_of_day_utc.isoformat()},
+            "business_date": business_date,
             "$or": [{"is_cancelled": {"$exists": False}}, {"is_cancelled": False}]
         }).to_list(1000)
         
@@ -4596,21 +5811,14 @@ async def get_sponsor_status(department_id: str, date: str):
 async def get_sponsor_status(department_id: str, date: str):
     """Check if meals have already been sponsored for a specific date"""
     try:
-        # Parse date and create timezone-aware range
-        target_date = datetime.fromisoformat(date).date()
-        berlin_tz = pytz.timezone('Europe/Berlin')
-        start_of_day_berlin = berlin_tz.localize(datetime.combine(target_date, datetime.min.time()))
-        end_of_day_berlin = berlin_tz.localize(datetime.combine(target_date, datetime.max.time()))
-        
-        # Convert to UTC for database query
-        start_of_day_utc = start_of_day_berlin.astimezone(pytz.UTC)
-        end_of_day_utc = end_of_day_berlin.astimezone(pytz.UTC)
+        # Parse date into the Berlin business day
+        business_date = datetime.fromisoformat(date).date().isoformat()
         
         # Find all orders for this department and date
         all_orders = await db.orders.find({
             "department_id": department_id,
             "order_type": "breakfast",
-            "timestamp": {"$gte": start_of_day_utc.isoformat(), "$lte": end_of_day_utc.isoformat()},
+            "business_date": business_date,
             "$or": [{"is_cancelled": {"$exists": False}}, {"is_cancelled": False}]
         }).to_list(1000)
         
@@ -4683,16 +5891,17 @@ async def sponsor_meal(meal_data: dict):
             raise HTTPException(status_code=400, detail=f"Sponsoring ist nur für heute ({today}) oder gestern ({yesterday}) möglich.")
         
         # === PHASE 2: DATENSAMMLUNG ===
-        # Use Berlin timezone for day boundaries
-        start_of_day_utc, end_of_day_utc = get_berlin_day_bounds(parsed_date)
+        # Use Berlin business day
+        business_date = parsed_date.isoformat()
         
         # Get all breakfast orders for that day
         all_orders = await db.orders.find({
             "department_id": department_id,
             "order_type": "breakfast",
-            "timestamp": {"$gte": start_of_day_utc.isoformat(), "$lte": end_of_day_utc.isoformat()},
+            "business_date": business_date,
             "$or": [{"is_cancelled": {"$exists": False}}, {"is_cancelled": False}]
         }).to_list(1000)
+        all_orders = [order_to_api(order) for order in all_orders]
         
         # Check if already sponsored (handle comma-separated meal types)
         already_sponsored = False
@@ -4732,105 +5941,29 @@ async def sponsor_meal(meal_data: dict):
             raise HTTPException(status_code=404, detail=f"Keine {'Frühstück' if meal_type == 'breakfast' else 'Mittag'}-Bestellungen für {date_str} gefunden")
         
         # === PHASE 3: KOSTENBERECHNUNG ===
-        # Get menu prices once to avoid repeated DB calls
-        white_roll_price = 0.50
-        seeded_roll_price = 0.60
-        egg_price = 0.50
-        coffee_price = 1.00
-        
-        try:
-            white_menu = await db.menu_breakfast.find_one({"roll_type": "weiss", "department_id": department_id})
-            if white_menu: white_roll_price = white_menu.get("price", 0.50)
-            
-            seeded_menu = await db.menu_breakfast.find_one({"roll_type": "koerner", "department_id": department_id})
-            if seeded_menu: seeded_roll_price = seeded_menu.get("price", 0.60)
-            
-            # Get department-specific egg and coffee prices
-            department_prices = await get_department_prices(department_id)
-            egg_price = department_prices["boiled_eggs_price"]
-            fried_egg_price = department_prices["fried_eggs_price"]
-            coffee_price = department_prices["coffee_price"]
-        except:
-            pass  # Use defaults if DB calls fail
+        # Price all relevant orders in one pass: breakfast = rolls + toppings + eggs,
+        # lunch = lunch price of the order, coffee is never sponsored
+        price_book = await get_price_book(department_id)
+        breakdowns = price_orders(relevant_orders, unit_prices(price_book))
         
         # Calculate individual costs for each order
         order_calculations = []
-        total_sponsored_cost = 0.0
+        total_sponsored_cents = 0
         
-        for order in relevant_orders:
-            employee_id = order["employee_id"]
-            order_total = order.get("total_price", 0)
-            
-            # Calculate breakdown
-            breakfast_cost = 0.0  # rolls + eggs
-            coffee_cost = 0.0
-            lunch_cost = 0.0
-            
-            # Check if this order was already partially sponsored
-            sponsored_meal_types = order.get("sponsored_meal_type", "")
-            already_sponsored_breakfast = False
-            already_sponsored_lunch = False
-            
-            if sponsored_meal_types:
-                # Handle comma-separated meal types
-                sponsored_types_list = sponsored_meal_types.split(",")
-                already_sponsored_breakfast = "breakfast" in sponsored_types_list
-                already_sponsored_lunch = "lunch" in sponsored_types_list
-            
-            for item in order.get("breakfast_items", []):
-                # Rolls
-                white_halves = item.get("white_halves", 0)
-                seeded_halves = item.get("seeded_halves", 0)
-                breakfast_cost += white_halves * white_roll_price + seeded_halves * seeded_roll_price
-                
-                # Boiled Eggs
-                boiled_eggs = item.get("boiled_eggs", 0)
-                breakfast_cost += boiled_eggs * egg_price
-                
-                # Fried Eggs
-                fried_eggs = item.get("fried_eggs", 0)
-                breakfast_cost += fried_eggs * fried_egg_price
-                
-                # Coffee
-                if item.get("has_coffee", False):
-                    coffee_cost += coffee_price
-                
-                # Lunch - calculate from daily lunch price instead of remainder
-                if item.get("has_lunch", False):
-                    # Get the actual lunch price for this order (not calculated remainder)
-                    lunch_price_for_order = order.get("lunch_price", 0)
-                    if lunch_price_for_order > 0:
-                        lunch_cost = lunch_price_for_order
-                    else:
-                        # Fallback to calculation if lunch_price not stored
-                        lunch_cost = order_total - breakfast_cost - coffee_cost
-                        lunch_cost = max(0, lunch_cost)  # Ensure non-negative
-            
-            # Round to avoid floating point errors
-            breakfast_cost = round(breakfast_cost, 2)
-            coffee_cost = round(coffee_cost, 2)
-            lunch_cost = round(lunch_cost, 2)
-            
-            # Calculate sponsored amount for this order - only if not already sponsored
-            sponsored_amount = 0.0
-            if meal_type == "breakfast" and not already_sponsored_breakfast:
-                sponsored_amount = breakfast_cost  # Only breakfast items (rolls + eggs)
-            elif meal_type == "lunch" and not already_sponsored_lunch:
-                sponsored_amount = lunch_cost  # Only lunch
-            # If already sponsored, skip this order (sponsored_amount remains 0)
-            
+        for order, breakdown in zip(relevant_orders, breakdowns):
+            # Orders already sponsored for this meal type were filtered out above
+            sponsored_amount_cents = sponsored_cents(breakdown, meal_type)
             order_calculations.append({
                 "order": order,
-                "employee_id": employee_id,
-                "breakfast_cost": breakfast_cost,
-                "coffee_cost": coffee_cost, 
-                "lunch_cost": lunch_cost,
-                "sponsored_amount": sponsored_amount
+                "employee_id": order["employee_id"],
+                "breakfast_cost": from_cents(sponsored_cents(breakdown, "breakfast")),
+                "coffee_cost": from_cents(breakdown["coffee"]),
+                "lunch_cost": from_cents(breakdown["lunch"]),
+                "sponsored_amount": from_cents(sponsored_amount_cents)
             })
-            
-            total_sponsored_cost += sponsored_amount
+            total_sponsored_cents += sponsored_amount_cents
         
-        total_sponsored_cost = round(total_sponsored_cost, 2)
+        total_sponsored_cost = from_cents(total_sponsored_cents)
         
         if total_sponsored_cost <= 0:
             raise HTTPException(status_code=400, detail="Keine kostenpflichtigen Artikel für Sponsoring gefunden")
@@ -4862,7 +5995,7 @@ async def sponsor_meal(meal_data: dict):
         if sponsor_calculation:
             # Sponsor has their own order - create a SEPARATE sponsor order for this sponsoring action
             today = get_berlin_date().strftime('%Y-%m-%d')
-            current_time = datetime.utcnow()
+            current_time = datetime.now(timezone.utc)
             
             # Calculate total cost for display
             total_others_cost = total_sponsored_cost - sponsor_contributed_amount
@@ -4880,7 +6013,8 @@ async def sponsor_meal(meal_data: dict):
                 "department_id": department_id,
                 "order_type": "breakfast",  # Sponsoring always goes to breakfast account
                 "total_price": total_others_cost,
-                "timestamp": current_time.isoformat(),
+                "timestamp": to_mongo_datetime(current_time),
+                "business_date": get_business_date(current_time),
                 "breakfast_items": [],  # Empty - this is a pure sponsoring order
                 "drink_items": {},
                 "sweet_items": {},
@@ -4899,7 +6033,8 @@ async def sponsor_meal(meal_data: dict):
                 }]
             }
             
-            await db.orders.insert_one(sponsor_order_data)
+            await db.orders.insert_one(order_to_storage(sponsor_order_data))
+            publish_order_event(sponsor_order_data, "order_created")
         
         # 2. Update employee balances and store order updates for later
         other_order_updates = []
@@ -4916,7 +6051,9 @@ async def sponsor_meal(meal_data: dict):
             if sponsored_amount > 0:
                 # CORRECTED: Refund sponsored amount to employee balance (INCREASE balance = less debt)
                 # FIXED: Use update_employee_balance() ONLY (no double counting)
-                await update_employee_balance(employee_id, department_id, 'breakfast', sponsored_amount)
+                await update_employee_balance(
+                    employee_id, department_id, 'breakfast', sponsored_amount, kind="sponsoring", reference_id=order["id"]
+                )
                 
                 # Store order update for later
                 sponsored_message = f"Dieses {'Frühstück' if meal_type == 'breakfast' else 'Mittagessen'} wurde von {sponsor_employee_name} ausgegeben, bedanke dich bei ihm!"
@@ -4933,6 +6070,8 @@ async def sponsor_meal(meal_data: dict):
                 
                 other_order_updates.append({
                     "id": order["id"],
+                    "order": order,
+                    "sponsored_amount": sponsored_amount,
                     "updates": {
                         "is_sponsored": True,
                         "sponsored_by_employee_id": sponsor_employee_id,
@@ -4947,7 +6086,7 @@ async def sponsor_meal(meal_data: dict):
         if not sponsor_calculation and sponsor_additional_cost > 0:
             # Create a sponsoring order for the sponsor
             today = get_berlin_date().strftime('%Y-%m-%d')
-            current_time = datetime.utcnow()
+            current_time = datetime.now(timezone.utc)
             
             # Calculate total cost for display
             total_others_cost = total_sponsored_cost  # All cost since sponsor has no own order
@@ -4965,7 +6104,8 @@ async def sponsor_meal(meal_data: dict):
                 "department_id": department_id,
                 "order_type": "breakfast",  # Sponsoring always goes to breakfast account
                 "total_price": total_others_cost,
-                "timestamp": current_time.isoformat(),
+                "timestamp": to_mongo_datetime(current_time),
+                "business_date": get_business_date(current_time),
                 "breakfast_items": [],  # Empty - this is a pure sponsoring order
                 "drink_items": {},
                 "sweet_items": {},
@@ -4985,25 +6125,35 @@ async def sponsor_meal(meal_data: dict):
                 }]
             }
             
-            await db.orders.insert_one(sponsor_order_data)
+            await db.orders.insert_one(order_to_storage(sponsor_order_data))
+            publish_order_event(sponsor_order_data, "order_created")
 
         # 3. Update sponsor balance and create payment log
         sponsor_employee = await db.employees.find_one({"id": sponsor_employee_id})
         if sponsor_employee:
             # FIXED: Use update_employee_balance() ONLY to avoid double charging
             # Sponsor zahlt zusätzlich nur für die anderen, nicht für sich selbst (das ist schon in der Bestellung)
-            await update_employee_balance(sponsor_employee_id, department_id, 'breakfast', -sponsor_additional_cost)
+            await update_employee_balance(
+                sponsor_employee_id, department_id, 'breakfast', -sponsor_additional_cost, sponsor_employee, kind="sponsoring"
+            )
             
             # NOTE: No PaymentLog needed for sponsoring - the sponsor order serves as the record
         
         # 4. Apply all order updates (after all other operations are complete)
         # Update sponsored orders
         for order_update in other_order_updates:
+            # sponsored_amount accumulates the refunds (breakfast + lunch) so the balance
+            # effect of sponsoring can be recomputed from the order (see reconcile_balances)
             await db.orders.update_one(
                 {"id": order_update["id"]},
-                {"$set": order_update["updates"]}
+                {"$set": order_update["updates"], "$inc": {cents_field("sponsored_amount"): to_cents(order_update["sponsored_amount"])}}
             )
         
+        # Sponsored orders changed - refresh that day's rollup
+        await rebuild_daily_rollup(department_id, business_date)
+        for order_update in other_order_updates:
+            publish_order_event({**order_update["order"], **order_update["updates"]}, "order_updated")
+        
         # 5. NEUE FUNKTION: Block ordering after sponsoring to prevent saldo confusion
         today = get_berlin_date().isoformat()
         sponsor_employee_data = await db.employees.find_one({"id": sponsor_employee_id})
@@ -5021,6 +6171,8 @@ async def sponsor_meal(meal_data: dict):
             }},
             upsert=True
         )
+        invalidate_coalesced("sponsoring-status", department_id)
+        event_bus.publish(department_id, "sponsoring_applied", meal_type=meal_type)
         
         # === RÜCKGABE ===
         sponsored_items_description = f"{len(order_calculations)}x {'Frühstück' if meal_type == 'breakfast' else 'Mittagessen'}"
@@ -5045,18 +6197,22 @@ async def cleanup_testing_data():
     try:
         # Delete all orders
         orders_result = await db.orders.delete_many({})
+        await db.daily_rollups.delete_many({})
+        drop_live_summary()
+        event_bus.publish(None, "resync")
         
         # Reset all employee balances
         employees_result = await db.employees.update_many(
             {},
-            {"$set": {
-                "breakfast_balance": 0.0,
-                "drinks_sweets_balance": 0.0
-            }}
+            {
+                "$set": {"breakfast_balance_cents": 0, "drinks_sweets_balance_cents": 0},
+                "$unset": {"breakfast_balance": "", "drinks_sweets_balance": ""}
+            }
         )
         
-        # Delete payment logs
+        # Delete payment logs and start the balance ledger over
         payment_logs_result = await db.payment_logs.delete_many({})
+        await reset_ledger()
         
         # Get remaining counts
         remaining_orders = await db.orders.count_documents({})
@@ -5079,16 +6235,8 @@ async def cleanup_testing_data():
 @api_router.post("/admin/reset-balance/{employee_id}")
 async def reset_employee_balance(employee_id: str, balance_type: str):
     """Admin: Reset employee balance (breakfast or drinks_sweets)"""
-    if balance_type == "breakfast":
-        await db.employees.update_one(
-            {"id": employee_id},
-            {"$set": {"breakfast_balance": 0.0}}
-        )
-    elif balance_type == "drinks_sweets":
-        await db.employees.update_one(
-            {"id": employee_id},
-            {"$set": {"drinks_sweets_balance": 0.0}}
-        )
+    if balance_type in ("breakfast", "drinks_sweets"):
+        await set_employee_balances(employee_id, {cents_field(f"{balance_type}_balance"): 0}, kind="balance_reset")
     else:
         raise HTTPException(status_code=400, detail="Ungültiger Saldo-Typ")
     
@@ -5124,41 +6272,47 @@ async def move_employee_to_department(employee_id: str, request: MoveEmployeeReq
     if current_dept_id == new_department_id:
         return {"message": f"Mitarbeiter ist bereits in {target_dept['name']}"}
     
-    # SALDO-MIGRATION:
+    # SALDO-MIGRATION (integer cents):
+    subaccounts = employee_to_storage(employee)["subaccount_balances"]
+    
     # 1. Aktuelle Hauptsalden merken
-    current_breakfast_balance = employee.get("breakfast_balance", 0.0)
-    current_drinks_balance = employee.get("drinks_sweets_balance", 0.0)
+    current_breakfast_cents = stored_cents(employee, "breakfast_balance")
+    current_drinks_cents = stored_cents(employee, "drinks_sweets_balance")
     
     # 2. Aktuelle Hauptsalden → Subkonto der alten Abteilung
-    if current_dept_id not in employee["subaccount_balances"]:
-        employee["subaccount_balances"][current_dept_id] = {"breakfast": 0.0, "drinks": 0.0}
-    
-    employee["subaccount_balances"][current_dept_id]["breakfast"] += current_breakfast_balance
-    employee["subaccount_balances"][current_dept_id]["drinks"] += current_drinks_balance
+    old_subaccount = subaccounts.setdefault(current_dept_id, {"breakfast_cents": 0, "drinks_cents": 0})
+    old_subaccount["breakfast_cents"] += current_breakfast_cents
+    old_subaccount["drinks_cents"] += current_drinks_cents
     
     # 3. Neue Hauptsalden = existierende Subkonto-Salden der neuen Abteilung (oder 0€)
-    new_breakfast_balance = 0.0
-    new_drinks_balance = 0.0
+    new_breakfast_cents = 0
+    new_drinks_cents = 0
     
-    if new_department_id in employee["subaccount_balances"]:
-        new_breakfast_balance = employee["subaccount_balances"][new_department_id]["breakfast"]
-        new_drinks_balance = employee["subaccount_balances"][new_department_id]["drinks"]
+    if new_department_id in subaccounts:
+        new_breakfast_cents = subaccounts[new_department_id]["breakfast_cents"]
+        new_drinks_cents = subaccounts[new_department_id]["drinks_cents"]
         # Subkonto der neuen Abteilung auf 0 setzen (wird ja zu Hauptkonto)
-        employee["subaccount_balances"][new_department_id] = {"breakfast": 0.0, "drinks": 0.0}
+        subaccounts[new_department_id] = {"breakfast_cents": 0, "drinks_cents": 0}
     
-    # 4. Update employee mit neuer Abteilung und migrierten Salden
-    result = await db.employees.update_one(
-        {"id": employee_id},
-        {"$set": {
-            "department_id": new_department_id,
-            "breakfast_balance": new_breakfast_balance,
-            "drinks_sweets_balance": new_drinks_balance,
-            "subaccount_balances": employee["subaccount_balances"]
-        }}
+    # 4. Update employee mit neuer Abteilung und migrierten Salden (recorded in the ledger as "move")
+    balance_values = {
+        "breakfast_balance_cents": new_breakfast_cents,
+        "drinks_sweets_balance_cents": new_drinks_cents
+    }
+    for dept_id, balances in subaccounts.items():
+        for account_field, cents in balances.items():
+            balance_values[f"subaccount_balances.{dept_id}.{account_field}"] = cents
+    await db.employees.update_one(
+        {"id": employee_id, "subaccount_balances": None},
+        {"$set": {"subaccount_balances": {}}}
+    )
+    await set_employee_balances(
+        employee_id, balance_values, kind="move", reference_id=new_department_id,
+        extra_fields={"department_id": new_department_id}
     )
     
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Fehler bei der Aktualisierung")
+    forget_live_summary_renderings()
+    event_bus.publish(None, "employee_changed", employee_ids=[employee_id])
     
     # Get department names for response
     old_dept = await db.departments.find_one({"id": current_dept_id})
@@ -5169,13 +6323,13 @@ async def move_employee_to_department(employee_id: str, request: MoveEmployeeReq
         "balance_migration": {
             "old_main_balances_moved_to_subaccount": {
                 "department": old_dept_name,
-                "breakfast": current_breakfast_balance,
-                "drinks": current_drinks_balance
+                "breakfast": from_cents(current_breakfast_cents),
+                "drinks": from_cents(current_drinks_cents)
             },
             "new_main_balances_from_subaccount": {
                 "department": target_dept["name"], 
-                "breakfast": new_breakfast_balance,
-                "drinks": new_drinks_balance
+                "breakfast": from_cents(new_breakfast_cents),
+                "drinks": from_cents(new_drinks_cents)
             }
         }
     }
@@ -5190,7 +6344,10 @@ async def delete_history_entry_saldo_neutral(
     try:
         if entry_type == "order":
             # Delete from orders collection
+            order = await db.orders.find_one({"id": entry_id})
             result = await db.orders.delete_one({"id": entry_id})
+            if order and result.deleted_count:
+                await record_order_in_rollup(order, sign=-1)
         elif entry_type == "payment":
             # Delete from payment_logs collection
             result = await db.payment_logs.delete_one({"id": entry_id})
@@ -5200,11 +6357,1074 @@ async def delete_history_entry_saldo_neutral(
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Eintrag nicht gefunden")
         
+        # The balance keeps the deleted entry - tell reconciliation not to "correct" that
+        await record_ledger_event(order["employee_id"] if entry_type == "order" and order else employee_id, "history_deletion", entry_id)
+        
         return {"message": "Eintrag erfolgreich gelöscht (saldo-neutral)"}
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Löschen: {str(e)}")
 
+
+# ===== DATABASE INDEXES =====
+
+# Index plan for all hot collections. Each entry is (name, keys, options).
+# The names are fixed so that the startup check can detect missing/extra indexes.
+INDEX_PLAN = {
+    "orders": [
+        ("order_id_unique", [("id", ASCENDING)], {"unique": True}),
+        # get_daily_summary, get_daily_revenue, get_breakfast_history, sponsor_meal, set_daily_lunch_price, ...
+        ("dept_business_date", [("department_id", ASCENDING), ("business_date", ASCENDING), ("order_type", ASCENDING)], {}),
+        # create_order (existing breakfast), get_employee_today_orders
+        ("employee_business_date", [("employee_id", ASCENDING), ("business_date", ASCENDING)], {}),
+        # get_employee_profile, get_employee_orders
+        ("employee_timestamp", [("employee_id", ASCENDING), ("timestamp", DESCENDING)], {}),
+        # create_order: one non-cancelled breakfast per employee and business day (see place_order)
+        ("breakfast_day_unique", [("employee_id", ASCENDING), ("breakfast_day_key", ASCENDING)],
+         {"unique": True, "partialFilterExpression": {"breakfast_day_key": {"$exists": True}}}),
+    ],
+    "daily_rollups": [
+        ("dept_business_date_unique", [("department_id", ASCENDING), ("business_date", ASCENDING)], {"unique": True}),
+    ],
+    "ledger_entries": [
+        # ledger_balance_at, get_employee_ledger
+        ("employee_seq_unique", [("employee_id", ASCENDING), ("seq", ASCENDING)], {"unique": True}),
+        # reconcile_balances (employees with MANUAL_LEDGER_KINDS entries)
+        ("kind_employee", [("kind", ASCENDING), ("employee_id", ASCENDING)], {}),
+    ],
+    "ledger_snapshots": [
+        # ledger_balance_at, bootstrap_ledger
+        ("employee_seq_unique", [("employee_id", ASCENDING), ("seq", ASCENDING)], {"unique": True}),
+    ],
+    "employees": [
+        ("employee_id_unique", [("id", ASCENDING)], {"unique": True}),
+        ("dept_sort_order", [("department_id", ASCENDING), ("sort_order", ASCENDING)], {}),
+        ("is_8h_service_sort_order", [("is_8h_service", ASCENDING), ("sort_order", ASCENDING)], {}),
+    ],
+    "departments": [
+        ("department_id_unique", [("id", ASCENDING)], {"unique": True}),
+    ],
+    "idempotency_keys": [
+        # run_idempotent - one claim per key, expired after IDEMPOTENCY_KEY_TTL_SECONDS
+        ("scope_key_unique", [("scope", ASCENDING), ("key", ASCENDING)], {"unique": True}),
+        ("created_at_ttl", [("created_at", ASCENDING)], {"expireAfterSeconds": IDEMPOTENCY_KEY_TTL_SECONDS}),
+    ],
+    "payment_logs": [
+        # check_order_payment_protection, get_payment_logs, get_employee_profile
+        ("employee_timestamp", [("employee_id", ASCENDING), ("timestamp", DESCENDING)], {}),
+    ],
+    "daily_lunch_prices": [
+        ("dept_date", [("department_id", ASCENDING), ("date", ASCENDING)], {}),
+    ],
+    "breakfast_settings": [
+        ("dept_date", [("department_id", ASCENDING), ("date", ASCENDING)], {}),
+    ],
+    "sponsoring_settings": [
+        ("dept_date", [("department_id", ASCENDING), ("date", ASCENDING)], {}),
+    ],
+    "temporary_assignments": [
+        ("target_dept_expires_at", [("target_department_id", ASCENDING), ("expires_at", ASCENDING)], {}),
+        ("employee_target_dept", [("employee_id", ASCENDING), ("target_department_id", ASCENDING)], {}),
+    ],
+    "department_settings": [
+        ("department_id", [("department_id", ASCENDING)], {}),
+    ],
+    "menu_breakfast": [
+        ("department_id", [("department_id", ASCENDING)], {}),
+    ],
+    "menu_toppings": [
+        ("department_id", [("department_id", ASCENDING)], {}),
+    ],
+    "menu_drinks": [
+        ("department_id", [("department_id", ASCENDING)], {}),
+    ],
+    "menu_sweets": [
+        ("department_id", [("department_id", ASCENDING)], {}),
+    ],
+}
+
+def index_key_list(key):
+    """Keys of an index_information() entry as [(field, direction)]
+
+    Older servers and drivers report directions as floats (1.0) - compared as ints.
+    Special index types ("text", "2dsphere") keep their string.
+    """
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in key]
+
+async def get_index_status():
+    """Compare the index plan with the indexes that actually exist in MongoDB"""
+    status_report = {}
+    for collection_name, planned_indexes in INDEX_PLAN.items():
+        existing = await db[collection_name].index_information()
+        planned_names = {name for name, _, _ in planned_indexes}
+
+        missing = []
+        for name, keys, options in planned_indexes:
+            existing_index = existing.get(name)
+            # An index with the same name but different keys counts as missing
+            if not existing_index or index_key_list(existing_index["key"]) != keys:
+                missing.append(name)
+
+        extra = sorted(name for name in existing if name != "_id_" and name not in planned_names)
+
+        status_report[collection_name] = {
+            "planned": [
+                {"name": name, "keys": [list(k) for k in keys], **options}
+                for name, keys, options in planned_indexes
+            ],
+            "existing": sorted(existing.keys()),
+            "missing": missing,
+            "extra": extra
+        }
+    return status_report
+
+async def ensure_indexes():
+    """Create all planned indexes and log missing or extra ones
+
+    Called on startup. create_index is idempotent, so existing indexes are left untouched.
+    A failing index (e.g. duplicates for a unique index) is logged and does not block startup.
+    """
+    before = await get_index_status()
+
+    for collection_name, planned_indexes in INDEX_PLAN.items():
+        missing = set(before[collection_name]["missing"])
+        if missing:
+            logger.warning(f"Index bootstrap: {collection_name} is missing indexes {sorted(missing)}")
+        if before[collection_name]["extra"]:
+            logger.warning(f"Index bootstrap: {collection_name} has indexes not in plan {before[collection_name]['extra']}")
+
+        for name, keys, options in planned_indexes:
+            if name not in missing:
+                continue
+            try:
+                await db[collection_name].create_index(keys, name=name, **options)
+                logger.info(f"Index bootstrap: created {collection_name}.{name}")
+            except Exception as e:
+                logger.error(f"Index bootstrap: could not create {collection_name}.{name}: {str(e)}")
+
+    return await get_index_status()
+
+@api_router.get("/admin/index-plan")
+async def get_index_plan():
+    """Admin: Show the planned indexes and which of them are missing or extra"""
+    try:
+        return await get_index_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Index-Übersicht: {str(e)}")
+
+@api_router.post("/admin/ensure-indexes")
+async def ensure_indexes_endpoint():
+    """Admin: Create all missing indexes from the index plan"""
+    try:
+        return await ensure_indexes()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Anlegen der Indizes: {str(e)}")
+
+# ===== DATETIME MIGRATION =====
+
+# Collections and fields converted from ISO strings to native BSON dates
+DATETIME_MIGRATION_TARGETS = {
+    "orders": ["timestamp", "cancelled_at"],
+    "payment_logs": ["timestamp"],
+    "ledger_entries": ["timestamp"],
+    "ledger_snapshots": ["timestamp"],
+    "temporary_assignments": ["expires_at"],
+    "breakfast_settings": ["closed_at"],
+}
+
+async def migrate_datetime_field(collection_name: str, field: str, batch_size: int = 500):
+    """Convert one field from ISO strings to native dates in batches
+
+    Safe to run while the app is serving requests: documents are walked in _id order and
+    every update is conditional on the old string value, so concurrent writes are never
+    overwritten. Can be re-run at any time, already converted documents are skipped.
+    """
+    collection = db[collection_name]
+    converted = 0
+    skipped = 0
+    last_id = None
+
+    while True:
+        query = {field: {"$type": "string"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = await collection.find(query, {"_id": 1, field: 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        operations = []
+        for doc in batch:
+            old_value = doc[field]
+            try:
+                new_value = to_utc_datetime(old_value)
+            except ValueError:
+                new_value = None
+            if new_value is None:
+                skipped += 1  # unparsable or empty string, left as it is
+                continue
+            operations.append(UpdateOne({"_id": doc["_id"], field: old_value}, {"$set": {field: new_value}}))
+
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            converted += result.modified_count
+
+    return {"converted": converted, "skipped": skipped}
+
+@api_router.post("/admin/migrate-datetimes")
+async def migrate_datetimes(batch_size: int = 500):
+    """Admin: Online migration of stored ISO timestamps to native BSON dates
+
+    Run with DATETIME_STORAGE=dual, switch to DATETIME_STORAGE=native once all
+    remaining counts are 0.
+    """
+    if DATETIME_STORAGE == "iso":
+        raise HTTPException(
+            status_code=400,
+            detail="Migration nur mit DATETIME_STORAGE=dual oder native möglich, sonst findet der ISO-Modus die Daten nicht mehr."
+        )
+
+    try:
+        results = {}
+        for collection_name, fields in DATETIME_MIGRATION_TARGETS.items():
+            for field in fields:
+                result = await migrate_datetime_field(collection_name, field, batch_size)
+                result["remaining"] = await db[collection_name].count_documents({field: {"$type": "string", "$ne": ""}})
+                results[f"{collection_name}.{field}"] = result
+
+        return {
+            "message": "Datums-Migration abgeschlossen",
+            "storage_mode": DATETIME_STORAGE,
+            "results": results
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler bei der Datums-Migration: {str(e)}")
+
+# ===== BUSINESS DATE BACKFILL =====
+
+async def backfill_business_dates(batch_size: int = 500):
+    """Stamp business_date on orders created before the field existed
+
+    Idempotent and safe while serving requests: only orders without business_date are
+    touched and business_date is derived from the order's own timestamp.
+    """
+    updated = 0
+    skipped = 0
+    last_id = None
+
+    while True:
+        query = {"business_date": {"$exists": False}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = await db.orders.find(query, {"_id": 1, "timestamp": 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        operations = []
+        for doc in batch:
+            if not doc.get("timestamp"):
+                skipped += 1
+                continue
+            try:
+                business_date = get_business_date(doc["timestamp"])
+            except ValueError:
+                skipped += 1
+                continue
+            operations.append(UpdateOne(
+                {"_id": doc["_id"], "business_date": {"$exists": False}},
+                {"$set": {"business_date": business_date}}
+            ))
+
+        if operations:
+            result = await db.orders.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+
+    return {"updated": updated, "skipped": skipped}
+
+@api_router.post("/admin/backfill-business-dates")
+async def backfill_business_dates_endpoint(batch_size: int = 500):
+    """Admin: Stamp business_date on all orders that don't have one yet"""
+    try:
+        result = await backfill_business_dates(batch_size)
+        result["remaining"] = await db.orders.count_documents({"business_date": {"$exists": False}})
+        return {
+            "message": "Geschäftstage nachgetragen",
+            **result
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Nachtragen der Geschäftstage: {str(e)}")
+
+async def backfill_breakfast_day_keys(batch_size: int = 500):
+    """Stamp breakfast_day_key on non-cancelled breakfast orders created before the key existed
+
+    The breakfast_day_unique index rejects a second key for the same employee and day, so
+    of pre-existing duplicates only the oldest order gets the key; the others are counted
+    and left as they are.
+    """
+    updated = 0
+    duplicates = 0
+    last_id = None
+    
+    while True:
+        query = {
+            "order_type": "breakfast",
+            "breakfast_day_key": {"$exists": False},
+            "business_date": {"$exists": True},
+            "is_sponsor_order": {"$ne": True},
+            "is_cancelled": {"$ne": True}
+        }
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        
+        batch = await db.orders.find(query, {"_id": 1, "business_date": 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+        
+        operations = [
+            UpdateOne(
+                {"_id": doc["_id"], "breakfast_day_key": {"$exists": False}, "is_cancelled": {"$ne": True}},
+                {"$set": {"breakfast_day_key": doc["business_date"]}}
+            )
+            for doc in batch
+        ]
+        try:
+            result = await db.orders.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+        except BulkWriteError as e:
+            updated += e.details.get("nModified", 0)
+            duplicates += sum(1 for error in e.details.get("writeErrors", []) if error.get("code") == 11000)
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+    
+    return {"updated": updated, "duplicates": duplicates}
+
+# ===== DAILY ROLLUPS REBUILD =====
+
+async def rebuild_daily_rollups(department_id: str = None):
+    """Recompute daily_rollups from the full order history
+
+    Streams all breakfast orders once, sums their contributions per (department, business day)
+    and replaces the stored rollups of the rebuilt scope day by day, then deletes days without
+    orders. The versions are read before the orders: days a concurrent apply_rollup_delta
+    changed in the meantime are rebuilt again on their own (see rollup_replacement).
+    """
+    query = {"order_type": "breakfast"}
+    if department_id:
+        query["department_id"] = department_id
+    
+    versions = {
+        (rollup["department_id"], rollup["business_date"]): rollup.get("version")
+        async for rollup in db.daily_rollups.find(
+            {"department_id": department_id} if department_id else {},
+            {"_id": 0, "department_id": 1, "business_date": 1, "version": 1}
+        )
+    }
+    counters_by_day = {}
+    async for order in db.orders.find(query):
+        business_date = order.get("business_date") or get_business_date(order["timestamp"])
+        day_counters = counters_by_day.setdefault((order["department_id"], business_date), {})
+        for field, amount in rollup_contribution(order).items():
+            day_counters[field] = day_counters.get(field, 0) + amount
+    
+    days = list(counters_by_day)
+    operations = [
+        ReplaceOne(
+            *rollup_replacement(rollup_department_id, business_date, counters_by_day[(rollup_department_id, business_date)],
+                                versions.get((rollup_department_id, business_date))),
+            upsert=True
+        )
+        for rollup_department_id, business_date in days
+    ]
+    changed_days = []
+    if operations:
+        try:
+            await db.daily_rollups.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            changed_days = [days[error["index"]] for error in errors]
+    for rollup_department_id, business_date in changed_days:
+        await rebuild_daily_rollup(rollup_department_id, business_date)
+    
+    # Only rollups that are unchanged since the versions were read - a newer one has a new order
+    stale_days = [day for day in versions if day not in counters_by_day]
+    deleted_days = 0
+    if stale_days:
+        result = await db.daily_rollups.delete_many({"$or": [
+            {"department_id": rollup_department_id, "business_date": business_date, "version": versions[(rollup_department_id, business_date)]}
+            for rollup_department_id, business_date in stale_days
+        ]})
+        deleted_days = result.deleted_count
+    drop_live_summary(department_id)
+    
+    return {"rebuilt_days": len(operations), "deleted_days": deleted_days}
+
+@api_router.post("/admin/rebuild-daily-rollups")
+async def rebuild_daily_rollups_endpoint(department_id: str = None):
+    """Admin: Recompute the daily rollups from all orders (optionally for one department)"""
+    try:
+        result = await rebuild_daily_rollups(department_id)
+        return {
+            "message": "Tagesauswertungen neu berechnet",
+            **result
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Neuberechnen der Tagesauswertungen: {str(e)}")
+
+# ===== MONEY MIGRATION (EURO FLOATS -> INTEGER CENTS) =====
+
+async def migrate_money_to_cents(batch_size: int = 500):
+    """Move legacy euro amounts into their integer cent fields
+
+    Idempotent: every legacy field that still exists is added to its *_cents field and
+    removed in the same update (matched on its current value, so a concurrent write just
+    leaves it for the next run). NaN/inf values count as 0. Rollups that still carry a
+    float revenue are rebuilt.
+    """
+    employees_migrated = 0
+    async for employee in db.employees.find(
+        {}, {"_id": 0, "id": 1, "subaccount_balances": 1, **{field: 1 for field in MAIN_BALANCE_FIELDS}}
+    ):
+        match = {"id": employee["id"]}
+        increments = {}
+        unset = {}
+        for field in MAIN_BALANCE_FIELDS:
+            if field in employee:
+                match[field] = employee[field]
+                increments[cents_field(field)] = to_cents(employee[field])
+                unset[field] = ""
+        for department_id, balances in (employee.get("subaccount_balances") or {}).items():
+            for account in SUBACCOUNT_ACCOUNTS:
+                if isinstance(balances, dict) and account in balances:
+                    path = f"subaccount_balances.{department_id}.{account}"
+                    match[path] = balances[account]
+                    increments[cents_field(path)] = to_cents(balances[account])
+                    unset[path] = ""
+        if unset:
+            result = await db.employees.update_one(match, {"$inc": increments, "$unset": unset})
+            employees_migrated += result.modified_count
+
+    payment_logs_migrated = await migrate_collection_money(db.payment_logs, PAYMENT_MONEY_FIELDS, batch_size)
+    orders_migrated = await migrate_collection_money(db.orders, ORDER_MONEY_FIELDS, batch_size)
+    menu_items_migrated = 0
+    for collection in (db.menu_breakfast, db.menu_toppings, db.menu_drinks, db.menu_sweets):
+        menu_items_migrated += await migrate_collection_money(collection, MENU_MONEY_FIELDS, batch_size)
+    price_settings_migrated = 0
+    for collection in (db.department_settings, db.lunch_settings, db.daily_lunch_prices):
+        price_settings_migrated += await migrate_collection_money(collection, PRICE_SETTINGS_MONEY_FIELDS, batch_size)
+    if menu_items_migrated or price_settings_migrated:
+        invalidate_price_book()
+
+    rollups_rebuilt = 0
+    if await db.daily_rollups.find_one({"total_revenue": {"$exists": True}}):
+        rollups_rebuilt = (await rebuild_daily_rollups())["rebuilt_days"]
+
+    return {
+        "employees_migrated": employees_migrated,
+        "payment_logs_migrated": payment_logs_migrated,
+        "orders_migrated": orders_migrated,
+        "menu_items_migrated": menu_items_migrated,
+        "price_settings_migrated": price_settings_migrated,
+        "rollups_rebuilt": rollups_rebuilt,
+        "home_subaccounts_resynced": await resync_home_subaccounts()
+    }
+
+async def migrate_collection_money(collection, fields, batch_size=500):
+    """Fold the legacy euro fields of a collection into their *_cents fields
+
+    The cent value is added (sponsored_amount_cents may already hold later refunds),
+    a legacy None only becomes a None cent field if there is none yet. Returns the
+    number of migrated documents.
+    """
+    migrated = 0
+    legacy_query = {"$or": [{field: {"$exists": True}} for field in fields]}
+    while True:
+        batch = await collection.find(legacy_query).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        operations = []
+        for document in batch:
+            match = {"_id": document["_id"]}
+            update = {"$unset": {}}
+            for field in fields:
+                if field not in document:
+                    continue
+                value = document[field]
+                current = document.get(cents_field(field))
+                match[field] = value
+                update["$unset"][field] = ""
+                if value is None:
+                    if cents_field(field) not in document:
+                        update.setdefault("$set", {})[cents_field(field)] = None
+                elif current is None:
+                    match[cents_field(field)] = None
+                    update.setdefault("$set", {})[cents_field(field)] = to_cents(value)
+                else:
+                    update.setdefault("$inc", {})[cents_field(field)] = to_cents(value)
+            operations.append(UpdateOne(match, update))
+        result = await collection.bulk_write(operations, ordered=False)
+        migrated += result.modified_count
+        if result.modified_count == 0:
+            break  # only concurrently changed documents left, next run picks them up
+    return migrated
+
+HOME_SUBACCOUNT_MIRRORS = (("breakfast", "breakfast_balance"), ("drinks", "drinks_sweets_balance"))
+
+async def resync_home_subaccounts():
+    """One-time: set the home subaccount of every employee to the main balance
+
+    The home subaccount mirrors the main balance and is now changed by the same $inc.
+    It used to be assigned from the main balance (and flexible payments only touched
+    main), so mirrors that drifted before would otherwise stay wrong. Runs once (marker
+    in db.migrations), each correction is a single pipeline update recorded in the
+    ledger as "resync". Returns the number of corrected employees.
+    """
+    if await db.migrations.find_one({"id": "home_subaccount_resync"}):
+        return 0
+    
+    corrected = 0
+    async for employee in db.employees.find({"is_8h_service": {"$ne": True}}, {"_id": 0}):
+        department_id = employee.get("department_id")
+        if not department_id or any(field in employee for field in MAIN_BALANCE_FIELDS):
+            continue  # No home department, or main balance not migrated to cents yet
+        mirrors = {
+            f"subaccount_balances.{department_id}.{cents_field(account)}": cents_field(main_field)
+            for account, main_field in HOME_SUBACCOUNT_MIRRORS
+        }
+        balances = ledger_balances(employee)
+        if employee.get("subaccount_balances") is not None and all(
+            balances.get(path, 0) == balances[main_path] for path, main_path in mirrors.items()
+        ):
+            continue
+        if employee.get("subaccount_balances") is None:
+            await db.employees.update_one(
+                {"id": employee["id"], "subaccount_balances": None},
+                {"$set": {"subaccount_balances": default_subaccount_balances()}}
+            )
+        
+        # Mirror assigned from the main balance by MongoDB, so concurrent orders can't be lost
+        previous = await db.employees.find_one_and_update(
+            {"id": employee["id"]},
+            [
+                {"$set": {
+                    **{path: {"$ifNull": [f"${main_path}", 0]} for path, main_path in mirrors.items()},
+                    "ledger_seq": {"$add": [{"$ifNull": ["$ledger_seq", 0]}, 1]}
+                }},
+                {"$unset": [path[:-len("_cents")] for path in mirrors]}  # Legacy euro mirror fields
+            ],
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not previous:
+            continue
+        previous_balances = ledger_balances(previous)
+        after = {path: previous_balances[main_path] for path, main_path in mirrors.items()}
+        await record_ledger_entry(
+            employee["id"], previous.get("ledger_seq", 0) + 1,
+            {path: cents - previous_balances.get(path, 0) for path, cents in after.items()},
+            "resync", None, {**previous_balances, **after}
+        )
+        corrected += 1
+    
+    await db.migrations.insert_one({
+        "id": "home_subaccount_resync",
+        "timestamp": to_mongo_datetime(datetime.now(timezone.utc)),
+        "corrected_employees": corrected
+    })
+    return corrected
+
+@api_router.post("/admin/migrate-money-to-cents")
+async def migrate_money_to_cents_endpoint():
+    """Admin: Convert remaining euro balances, payment amounts, order totals and prices to integer cents"""
+    try:
+        result = await migrate_money_to_cents()
+        return {
+            "message": "Beträge auf Cent-Darstellung umgestellt",
+            **result
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler bei der Umstellung auf Cent-Beträge: {str(e)}")
+
+# ===== LIVE EVENTS (SSE) =====
+EVENTS_HEARTBEAT_SECONDS = 25  # Keeps proxies from closing idle streams
+
+def sse_message(event):
+    return f"id: {event['id']}\ndata: {json.dumps(event)}\n\n"
+
+@api_router.get("/events/{department_id}")
+async def department_events(department_id: str, request: Request):
+    """Server-Sent Events stream of a department's change events (see EVENT BUS)
+
+    Starts with a resync event, so a reconnecting client reloads what it may have missed.
+    """
+    queue = event_bus.subscribe(department_id)
+    
+    async def stream():
+        try:
+            yield sse_message({"id": event_bus.seq, "type": "resync", "department_id": department_id})
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield sse_message(event)
+        finally:
+            event_bus.unsubscribe(department_id, queue)
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # Proxies must not buffer the stream
+    })
+
+# ===== DELTA SYNC =====
+# Dashboards sync with GET /api/changes/{department_id}?since=<cursor> instead of reloading
+# everything: the response carries only what changed after the cursor (current documents
+# of changed orders and employees, menus, status flags) plus the cursor for the next call.
+# The change log is the event bus history; without a cursor, after a restart or when the
+# cursor is older than the history, the response says reset=true and the client reloads.
+ORDER_EVENTS = ("order_created", "order_updated", "order_cancelled")
+EMPLOYEE_EVENTS = ("employee_changed", "balance_changed", "payment_recorded")
+
+def employee_visible_in_department(employee, department_id):
+    """Employees of the department, 8H-Service employees and guests with a balance there"""
+    if employee.get("department_id") == department_id or employee.get("is_8h_service"):
+        return True
+    subaccount = (employee.get("subaccount_balances") or {}).get(department_id) or {}
+    return any(stored_cents(subaccount, account) for account in SUBACCOUNT_ACCOUNTS)
+
+@api_router.get("/changes/{department_id}")
+async def get_department_changes(department_id: str, since: Optional[str] = None):
+    """Everything of a department's dashboard that changed after a cursor"""
+    try:
+        # Taken before reading, so changes made while this request runs come again next time
+        cursor = event_bus.cursor()
+        events = event_bus.events_since(since, department_id)
+        if events is None or any(event["type"] == "resync" for event in events):
+            return {"cursor": cursor, "reset": True}
+        
+        types = {event["type"] for event in events}
+        order_ids = {event["order_id"] for event in events if event["type"] in ORDER_EVENTS}
+        employee_ids = {
+            employee_id for event in events if event["type"] in EMPLOYEE_EVENTS for employee_id in event["employee_ids"]
+        }
+        deleted_employee_ids = {
+            employee_id for event in events if event["type"] == "employee_deleted" for employee_id in event["employee_ids"]
+        }
+        
+        orders = await db.orders.find({"id": {"$in": list(order_ids)}}).to_list(None) if order_ids else []
+        employees = await load_employees_by_ids(employee_ids - deleted_employee_ids)
+        changes = {
+            "cursor": cursor,
+            "reset": False,
+            "orders": [parse_from_mongo(order_to_api(order)) for order in orders],
+            "deleted_order_ids": sorted(order_ids - {order["id"] for order in orders}),
+            "employees": [
+                Employee(**employee_to_api(employee)) for employee in employees.values()
+                if employee_visible_in_department(employee, department_id)
+            ],
+            "deleted_employee_ids": sorted(deleted_employee_ids)
+        }
+        
+        if "menu_changed" in types:
+            price_book = await get_price_book(department_id)
+            changes["menu"] = {
+                "breakfast": [MenuItemBreakfast(**item) for item in price_book.breakfast_menu],
+                "toppings": [MenuItemToppings(**item) for item in price_book.toppings_menu],
+                "drinks": [MenuItemDrink(**item) for item in price_book.drinks_menu],
+                "sweets": [MenuItemSweet(**item) for item in price_book.sweets_menu],
+                "department_prices": price_book.department_prices
+            }
+        if types & {"breakfast_closed", "breakfast_reopened"}:
+            changes["breakfast_status"] = await get_breakfast_status(department_id)
+        if "sponsoring_applied" in types:
+            changes["sponsoring_status"] = await get_sponsoring_status(department_id)
+        if "temporary_employees_changed" in types:
+            changes["temporary_employees"] = await get_temporary_employees(department_id)
+        if order_ids or "sponsoring_applied" in types:
+            changes["daily_summary"] = await get_daily_summary(department_id)
+        return changes
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Änderungen: {str(e)}")
+
+# ===== DEPARTMENT BOOTSTRAP =====
+# Everything a department dashboard needs on open in one response instead of a dozen
+# requests: employees, 8H-Service, temporary and other-department employees, menus,
+# settings, breakfast/sponsoring status and the daily summary. The queries run
+# concurrently, employees and departments are read once for all lists, and the response
+# is gzip-compressed for the station tablets. The cursor continues with /changes.
+BOOTSTRAP_GZIP_MIN_BYTES = 1024
+
+def json_body(payload):
+    """Payload serialized like FastAPI's JSONResponse"""
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+def json_payload_response(request: Request, payload):
+    """JSON response, gzip-compressed when the client accepts it and it is worth it"""
+    body = json_body(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= BOOTSTRAP_GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def mongo_sort_key(field):
+    """Sort key like MongoDB's ascending sort: missing values first"""
+    return lambda doc: (doc.get(field) is not None, doc.get(field) if doc.get(field) is not None else 0)
+
+@api_router.get("/departments/{department_id}/bootstrap")
+async def get_department_bootstrap(department_id: str, request: Request):
+    """Initial dashboard data of a department in one (compressed) response
+
+    Same data as the single endpoints (employees, 8h-employees, temporary-employees,
+    other-employees, menu/*, department-settings, breakfast-status, sponsoring-status,
+    orders/daily-summary).
+    """
+    try:
+        # Taken before reading, so changes made while this request runs come with the first /changes call
+        cursor = event_bus.cursor()
+        now = datetime.now(timezone.utc)
+        employees, departments, assignments, price_book, breakfast_status, sponsoring_status, daily_summary = await asyncio.gather(
+            # Employees of the department, 8H-Service and everybody selectable as temporary employee
+            db.employees.find({
+                "$or": [{"department_id": department_id}, {"is_8h_service": True}, {"is_guest": False}]
+            }).to_list(None),
+            db.departments.find().to_list(None),
+            db.temporary_assignments.find({
+                "target_department_id": department_id,
+                **datetime_filter("expires_at", gte=now)
+            }).to_list(100),
+            get_price_book(department_id),
+            get_breakfast_status(department_id),
+            get_sponsoring_status(department_id),
+            get_daily_summary(department_id)
+        )
+        
+        department_employees = sorted(
+            (emp for emp in employees if emp.get("department_id") == department_id and not emp.get("is_8h_service")),
+            key=mongo_sort_key("sort_order")
+        )
+        eight_hour_employees = sorted(
+            (emp for emp in employees if emp.get("is_8h_service") is True), key=mongo_sort_key("sort_order")
+        )
+        other_employees = sorted(
+            (
+                emp for emp in employees
+                if emp.get("department_id") != department_id and emp.get("is_guest") is False and not emp.get("is_8h_service")
+            ),
+            key=lambda emp: emp["name"]
+        )
+        
+        departments_by_id = {dept["id"]: dept for dept in departments}
+        employees_by_id = {emp["id"]: emp for emp in employees}
+        # Guests of other departments are not in the shared list
+        employees_by_id.update(await load_employees_by_ids(
+            a["employee_id"] for a in assignments if a["employee_id"] not in employees_by_id
+        ))
+        
+        if price_book.department_settings:
+            department_settings = dict(price_book.department_settings)
+        else:
+            department_settings = await get_department_settings(department_id)
+        
+        return json_payload_response(request, {
+            "cursor": cursor,
+            "employees": await department_employee_models(department_employees),
+            "eight_hour_employees": eight_hour_employee_entries(eight_hour_employees, department_id),
+            "temporary_employees": temporary_employee_entries(assignments, employees_by_id, departments_by_id),
+            "other_employees": other_employees_by_department(other_employees, departments_by_id),
+            "menu": {
+                "breakfast": [MenuItemBreakfast(**item) for item in price_book.breakfast_menu],
+                "toppings": [MenuItemToppings(**item) for item in price_book.toppings_menu],
+                "drinks": [MenuItemDrink(**item) for item in price_book.drinks_menu],
+                "sweets": [MenuItemSweet(**item) for item in price_book.sweets_menu]
+            },
+            "department_settings": department_settings,
+            "breakfast_status": breakfast_status,
+            "sponsoring_status": sponsoring_status,
+            "daily_summary": daily_summary
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Abteilungsdaten: {str(e)}")
+
+# ===== COMBINED MENU =====
+# All menus of a department in one response, served from the cached price book. The ETag
+# identifies the menu version; clients revalidate with If-None-Match and get a 304 without
+# a database read or serialization while the price book is cached.
+def etag_matches(if_none_match: str, etag: str):
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)
+
+    Apache's mod_deflate appends -gzip to the ETag of responses it compresses.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/").replace('-gzip"', '"') == etag for tag in if_none_match.split(",")
+    )
+
+@api_router.get("/departments/{department_id}/menu")
+async def get_department_menu(department_id: str, if_none_match: Optional[str] = Header(None)):
+    """Breakfast, toppings, drinks and sweets menus plus egg/coffee prices of a department"""
+    price_book = await get_price_book(department_id)
+    etag, body = price_book.menu_response()
+    # no-cache: browsers keep the menu but revalidate it on every use
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# ===== BALANCE RECONCILIATION =====
+# Recomputes every balance from the history it is derived from and reports where the stored
+# (materialized) balance drifted away from it. Per order/payment the balance effect is:
+#   breakfast order: -total_price + sponsored_amount (refund from sponsoring)
+#   sponsor order (is_sponsor_order): -total_price (what the sponsor paid for the others)
+#   drinks/sweets order: +total_price (stored negative)
+#   payment log: +amount (payments, resets)
+# Everything is attributed to (employee, order/payment department, account). The main balance
+# of a normal employee is the bucket of their home department, subaccounts are one bucket
+# each (the home subaccount mirrors the main balance).
+# Ledger kinds of deliberate balance changes the history doesn't contain: admin balance reset,
+# clamped order deletion, saldo-neutral history deletion and the legacy mark-payment endpoint.
+MANUAL_LEDGER_KINDS = ("balance_reset", "order_deletion", "history_deletion", "legacy_payment")
+
+def mongo_cents_expression(amount_expression):
+    """Aggregation expression equivalent of to_cents() (half up, missing/non-numeric -> 0)"""
+    return {"$cond": [
+        {"$in": [{"$type": amount_expression}, ["double", "int", "long", "decimal"]]},
+        {"$multiply": [
+            {"$cond": [{"$lt": [amount_expression, 0]}, -1, 1]},
+            {"$floor": {"$add": [{"$multiply": [{"$abs": amount_expression}, 100]}, 0.5 + 1e-6]}}
+        ]},
+        0
+    ]}
+
+def mongo_stored_cents_expression(field, prefix=""):
+    """Aggregation expression equivalent of stored_cents() (prefix: path of a subdocument, e.g. "lunch.")"""
+    return {"$add": [
+        {"$ifNull": [f"${prefix}{cents_field(field)}", 0]},
+        mongo_cents_expression(f"${prefix}{field}")
+    ]}
+
+async def aggregate_balance_history(employee_ids=None):
+    """Balance effect of all non-cancelled orders and payment logs (optionally of some employees)
+
+    Returns {employee_id: {department_id: {"breakfast": cents, "drinks": cents, "legacy_sponsored_orders": n}}}.
+    One aggregation over orders with the payment logs appended ($unionWith), grouped per
+    employee, department and account on the server and streamed back.
+    """
+    employee_match = {"employee_id": {"$in": list(employee_ids)}} if employee_ids is not None else {}
+    is_breakfast = {"$eq": ["$order_type", "breakfast"]}
+    pipeline = [
+        {"$match": {
+            **employee_match,
+            "$or": [{"is_cancelled": {"$exists": False}}, {"is_cancelled": False}]
+        }},
+        {"$project": {
+            "_id": 0,
+            "employee_id": 1,
+            "department_id": 1,
+            "account": {"$cond": [is_breakfast, "breakfast", "drinks"]},
+            "cents": {"$add": [
+                {"$multiply": [{"$cond": [is_breakfast, -1, 1]}, mongo_stored_cents_expression("total_price")]},
+                mongo_stored_cents_expression("sponsored_amount")
+            ]},
+            # Sponsored before sponsored_amount was stored - their refund is unknown
+            "legacy_sponsored_orders": {"$cond": [
+                {"$and": [
+                    {"$eq": ["$is_sponsored", True]},
+                    {"$eq": [{"$type": "$sponsored_amount"}, "missing"]},
+                    {"$eq": [{"$type": "$sponsored_amount_cents"}, "missing"]}
+                ]}, 1, 0
+            ]}
+        }},
+        {"$unionWith": {"coll": "payment_logs", "pipeline": [
+            {"$match": employee_match},
+            {"$project": {
+                "_id": 0,
+                "employee_id": 1,
+                "department_id": 1,
+                "account": {"$cond": [{"$eq": ["$payment_type", "breakfast"]}, "breakfast", "drinks"]},
+                "cents": mongo_stored_cents_expression("amount"),
+                "legacy_sponsored_orders": {"$literal": 0}
+            }}
+        ]}},
+        {"$group": {
+            "_id": {"employee_id": "$employee_id", "department_id": "$department_id", "account": "$account"},
+            "cents": {"$sum": "$cents"},
+            "legacy_sponsored_orders": {"$sum": "$legacy_sponsored_orders"}
+        }}
+    ]
+    
+    history = {}
+    async for group in db.orders.aggregate(pipeline, allowDiskUse=True):
+        if not group["_id"].get("department_id"):
+            continue
+        entry = history.setdefault(group["_id"]["employee_id"], {}).setdefault(
+            group["_id"]["department_id"], {"breakfast": 0, "drinks": 0, "legacy_sponsored_orders": 0}
+        )
+        entry[group["_id"]["account"]] += int(group["cents"])
+        entry["legacy_sponsored_orders"] += group["legacy_sponsored_orders"]
+    return history
+
+def expected_balances(employee, history_by_department):
+    """Expected {path: cents} of an employee from the per-department history buckets"""
+    expected = {}
+    for department_id, history in history_by_department.items():
+        for account in SUBACCOUNT_ACCOUNTS:
+            expected[f"subaccount_balances.{department_id}.{cents_field(account)}"] = history.get(account, 0)
+    home_history = history_by_department.get(employee.get("department_id"), {})
+    expected[cents_field("breakfast_balance")] = home_history.get("breakfast", 0)
+    expected[cents_field("drinks_sweets_balance")] = home_history.get("drinks", 0)
+    return expected
+
+async def reconcile_balances(apply: bool = False, department_id: Optional[str] = None):
+    """Compare all stored balances with the balances recomputed from orders and payment logs
+
+    With apply=True every verifiable drift is corrected by a $inc of the difference (kind
+    "correction" in the ledger), guarded on the ledger_seq the balances were read at.
+    Employees are read after the history aggregation, and employees whose ledger_seq moved
+    while it ran are left for the next run - their history and balance may disagree only
+    because an order or payment is still in flight.
+
+    Not verifiable (reported, never corrected):
+    - 8H-Service employees: their flexible payments hit the main balance while their orders
+      only hit subaccounts, the payment logs don't tell these apart
+    - employees with orders sponsored before the refund was stored on the order
+    - employees with deliberate balance changes the history doesn't contain (MANUAL_LEDGER_KINDS)
+    
+    The ledger of every employee is checked for seqs without entry as well (a crash between
+    balance update and entry insert), apply=True repairs them (see repair_ledger_gaps).
+    """
+    started = time.perf_counter()
+    
+    employee_query = {"department_id": department_id} if department_id else {}
+    seqs_before = {
+        employee["id"]: employee.get("ledger_seq", 0)
+        async for employee in db.employees.find(employee_query, {"_id": 0, "id": 1, "ledger_seq": 1})
+    }
+    # Guest orders and payments of the employees can be in any department
+    history_by_employee = await aggregate_balance_history(list(seqs_before) if department_id else None)
+    manual_changes = {
+        group["_id"]: group["count"]
+        async for group in db.ledger_entries.aggregate([
+            {"$match": {"kind": {"$in": list(MANUAL_LEDGER_KINDS)}, **({"employee_id": {"$in": list(seqs_before)}} if department_id else {})}},
+            {"$group": {"_id": "$employee_id", "count": {"$sum": 1}}}
+        ])
+    }
+    
+    employees = await db.employees.find(
+        employee_query,
+        {"_id": 0, "id": 1, "name": 1, "department_id": 1, "is_8h_service": 1, "subaccount_balances": 1, "ledger_seq": 1,
+         **{field: 1 for field in MAIN_BALANCE_FIELDS}, **{cents_field(field): 1 for field in MAIN_BALANCE_FIELDS}}
+    ).to_list(None)
+    
+    ledger_gaps = await asyncio.gather(*(find_ledger_gaps(employee) for employee in employees))
+    ledger_gaps = {employee["id"]: gaps for employee, gaps in zip(employees, ledger_gaps) if gaps}
+    repaired_gaps = 0
+    if apply:
+        for employee in employees:
+            repaired_gaps += await repair_ledger_gaps(employee, ledger_gaps.get(employee["id"]))
+    
+    drifts = []
+    corrections = {}
+    skipped_8h_service = 0
+    unverifiable = 0
+    changed_while_checking = 0
+    total_drift_cents = 0
+    for employee in employees:
+        if employee.get("is_8h_service", False):
+            skipped_8h_service += 1
+            continue
+        history_by_department = history_by_employee.get(employee["id"], {})
+        stored = ledger_balances(employee)
+        expected = expected_balances(employee, history_by_department)
+        differences = {
+            path: expected.get(path, 0) - stored.get(path, 0)
+            for path in sorted(set(stored) | set(expected))
+            if expected.get(path, 0) != stored.get(path, 0)
+        }
+        if not differences:
+            continue
+        
+        legacy_sponsored_orders = sum(h["legacy_sponsored_orders"] for h in history_by_department.values())
+        manual_ledger_changes = manual_changes.get(employee["id"], 0)
+        verifiable = legacy_sponsored_orders == 0 and manual_ledger_changes == 0
+        if not verifiable:
+            unverifiable += 1
+        total_drift_cents += sum(abs(cents) for cents in differences.values())
+        drifts.append({
+            "employee_id": employee["id"],
+            "employee_name": employee.get("name", ""),
+            "department_id": employee.get("department_id"),
+            "verifiable": verifiable,
+            "legacy_sponsored_orders": legacy_sponsored_orders,
+            "manual_ledger_changes": manual_ledger_changes,
+            "differences": [
+                {
+                    "path": path[:-len("_cents")],
+                    "stored": from_cents(stored.get(path, 0)),
+                    "expected": from_cents(expected.get(path, 0)),
+                    "difference": from_cents(cents)
+                }
+                for path, cents in differences.items()
+            ]
+        })
+        if apply and verifiable:
+            if employee.get("ledger_seq", 0) != seqs_before.get(employee["id"]):
+                changed_while_checking += 1
+            else:
+                corrections[employee["id"]] = differences
+    
+    corrected = []
+    if corrections:
+        # Guarded on the ledger_seq read above - an employee written since is not touched
+        corrected = await apply_bulk_balance_increments(
+            corrections, kind="correction",
+            employees={employee["id"]: employee for employee in employees if employee["id"] in corrections},
+            retry_conflicts=False
+        )
+        changed_while_checking += len(corrections) - len(corrected)
+    
+    return {
+        "departments": len({dept_id for history in history_by_employee.values() for dept_id in history}),
+        "employees_checked": len(employees) - skipped_8h_service,
+        "employees_with_drift": len(drifts),
+        "unverifiable_employees": unverifiable,
+        "skipped_8h_service": skipped_8h_service,
+        "total_drift": from_cents(total_drift_cents),
+        "corrected_employees": len(corrected),
+        "changed_while_checking": changed_while_checking,
+        "ledger_gaps": sum(len(gaps) for gaps in ledger_gaps.values()),
+        "ledger_gaps_repaired": repaired_gaps,
+        "employees_with_ledger_gaps": sorted(ledger_gaps),
+        "duration_seconds": round(time.perf_counter() - started, 3),
+        "drifts": drifts
+    }
+
+@api_router.post("/admin/reconcile-balances")
+async def reconcile_balances_endpoint(apply: bool = False, department_id: Optional[str] = None):
+    """Admin: Recompute all balances from orders and payments, report (and optionally correct) drift"""
+    try:
+        result = await reconcile_balances(apply=apply, department_id=department_id)
+        if apply:
+            message = f"{result['corrected_employees']} Salden korrigiert"
+        else:
+            message = f"{result['employees_with_drift']} Mitarbeiter mit Saldo-Abweichungen gefunden"
+        return {
+            "message": message,
+            **result
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Saldo-Abgleich: {str(e)}")
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -5234,6 +7454,85 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def backfill_legacy_orders():
+    """Fields that orders created before them are missing"""
+    global _breakfast_day_keys_backfilled
+    try:
+        # Day queries filter on business_date - legacy orders need it before they show up
+        result = await backfill_business_dates()
+        if result["updated"] or result["skipped"]:
+            logger.info(f"Business date backfill: {result}")
+        if result["updated"]:
+            # Today's legacy orders only count in the live summaries once they have business_date
+            await rebuild_live_summaries()
+    except Exception as e:
+        logger.error(f"Business date backfill failed: {str(e)}")
+
+    try:
+        # The one-breakfast-per-day rule is enforced by a unique index on breakfast_day_key
+        result = await backfill_breakfast_day_keys()
+        if result["updated"] or result["duplicates"]:
+            logger.info(f"Breakfast day key backfill: {result}")
+        _breakfast_day_keys_backfilled = True
+    except Exception as e:
+        logger.error(f"Breakfast day key backfill failed: {str(e)}")
+
+async def run_background_migrations(build_rollups=False):
+    """Background part of startup: backfills and migrations that can take long on big collections
+
+    The read paths don't depend on them - stored_cents and mongo_stored_cents_expression
+    fold in legacy euro amounts that aren't migrated yet. build_rollups: there were no
+    rollups at startup (orders placed since then already have one, so it's decided before).
+    """
+    await backfill_legacy_orders()
+
+    try:
+        # First start with rollups - build them once from the existing order history
+        if build_rollups:
+            result = await rebuild_daily_rollups()
+            logger.info(f"Daily rollups built: {result}")
+    except Exception as e:
+        logger.error(f"Daily rollup build failed: {str(e)}")
+
+    try:
+        result = await migrate_money_to_cents()
+        if any(result.values()):
+            logger.info(f"Money migration to cents: {result}")
+    except Exception as e:
+        logger.error(f"Money migration to cents failed: {str(e)}")
+
+@app.on_event("startup")
+async def startup_db_client():
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        # Never block startup because of index problems - the app still works without them
+        logger.error(f"Index bootstrap failed: {str(e)}")
+
+    # Backfills and migrations can take long on big collections - they run while serving
+    try:
+        build_rollups = await db.daily_rollups.estimated_document_count() == 0
+    except Exception as e:
+        logger.error(f"Daily rollup check failed: {str(e)}")
+        build_rollups = False
+    app.state.background_migrations = asyncio.create_task(run_background_migrations(build_rollups))
+
+    try:
+        # Balance ledger - opening snapshot for employees that don't have one yet
+        created = await bootstrap_ledger()
+        if created:
+            logger.info(f"Balance ledger opening snapshots: {created}")
+    except Exception as e:
+        logger.error(f"Balance ledger bootstrap failed: {str(e)}")
+
+    try:
+        # Live daily summaries are kept in memory - build today's from the orders
+        departments = await rebuild_live_summaries()
+        logger.info(f"Live daily summaries built for {departments} departments")
+    except Exception as e:
+        logger.error(f"Live daily summary build failed: {str(e)}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.state.background_migrations.cancel()
     client.close()
\ No newline at end of file
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from "react";
+import React, { useState, useEffect, useCallback, useRef } from "react";
 import "./App.css";
 import axios from "axios";
 
@@ -6,6 +6,49 @@ import axios from "axios";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
 const API = `${BACKEND_URL}/api`;
 
+// Live updates: the backend pushes a department's change events as Server-Sent Events.
+// onEvent runs for the given event types only (and for "resync" after a reconnect);
+// bursts of events trigger a single call.
+const useDepartmentEvents = (departmentId, eventTypes, onEvent) => {
+  const onEventRef = useRef(onEvent);
+  onEventRef.current = onEvent;
+  const eventTypesKey = eventTypes.join(',');
+
+  useEffect(() => {
+    if (!departmentId || typeof EventSource === 'undefined') {
+      return undefined;
+    }
+    const types = eventTypesKey.split(',');
+    const source = new EventSource(`${API}/events/${departmentId}`);
+    let connected = false;
+    let timer = null;
+
+    source.onmessage = (message) => {
+      let event;
+      try {
+        event = JSON.parse(message.data);
+      } catch (error) {
+        return;
+      }
+      if (event.type === 'resync' && !connected) {
+        // First connect - the component loads its data itself
+        connected = true;
+        return;
+      }
+      if (event.type !== 'resync' && !types.includes(event.type)) {
+        return;
+      }
+      clearTimeout(timer);
+      timer = setTimeout(() => onEventRef.current(event), 300);
+    };
+
+    return () => {
+      clearTimeout(timer);
+      source.close();
+    };
+  }, [departmentId, eventTypesKey]);
+};
+
 // Calculate displayed price after sponsoring using backend-like calculation
 const calculateDisplayPrice = (item) => {
   if (!item.is_sponsored || item.is_sponsor_order) {
@@ -1390,12 +1433,26 @@ const DepartmentDashboard = () => {
 
   useEffect(() => {
     if (currentDepartment) {
+      fetchDashboardBootstrap();
+    }
+  }, [currentDepartment]);
+
+  // Alle Mitarbeiterlisten in einer (komprimierten) Anfrage laden
+  const fetchDashboardBootstrap = async () => {
+    try {
+      const response = await axios.get(`${API}/departments/${currentDepartment.department_id}/bootstrap`);
+      setEmployees(response.data.employees);
+      setOtherDepartmentEmployees(response.data.other_employees);
+      setTemporaryEmployees(response.data.temporary_employees);
+      setEightHourEmployees(response.data.eight_hour_employees);
+    } catch (error) {
+      console.error('Fehler beim Laden der Abteilungsdaten, lade einzeln:', error);
       fetchEmployees();
       fetchOtherDepartmentEmployees(); // ERWEITERT: Lade Mitarbeiter anderer Abteilungen
       fetchTemporaryEmployees(); // ERWEITERT: Lade temporäre Mitarbeiter (geräteübergreifend)
       fetch8HourEmployees(); // NEU: Lade 8H-Dienst Mitarbeiter
     }
-  }, [currentDepartment]);
+  };
 
   const fetch8HourEmployees = async () => {
     try {
@@ -2009,16 +2066,12 @@ const EmployeeMenu = ({ employee, onClose, onOrderComplete, fetchEmployees }) =>
       }
 
       const departmentId = currentDepartment.department_id;
-      const [breakfast, toppings, drinks, sweets] = await Promise.all([
-        axios.get(`${API}/menu/breakfast/${departmentId}`),
-        axios.get(`${API}/menu/toppings/${departmentId}`),
-        axios.get(`${API}/menu/drinks/${departmentId}`),
-        axios.get(`${API}/menu/sweets/${departmentId}`)
-      ]);
-      setBreakfastMenu(breakfast.data);
-      setToppingsMenu(toppings.data);
-      setDrinksMenu(drinks.data);
-      setSweetsMenu(sweets.data);
+      // Alle Menüs in einer Anfrage (ETag - unveränderte Menüs kommen aus dem Browser-Cache)
+      const menu = await axios.get(`${API}/departments/${departmentId}/menu`);
+      setBreakfastMenu(menu.data.breakfast);
+      setToppingsMenu(menu.data.toppings);
+      setDrinksMenu(menu.data.drinks);
+      setSweetsMenu(menu.data.sweets);
     } catch (error) {
       console.error('Fehler beim Laden der Menüs:', error);
       // Fallback to old endpoints if department-specific ones fail
@@ -3305,16 +3358,12 @@ const DepartmentAdminDashboard = () => {
       }
 
       const departmentId = currentDepartment.department_id;
-      const [breakfast, toppings, drinks, sweets] = await Promise.all([
-        axios.get(`${API}/menu/breakfast/${departmentId}`),
-        axios.get(`${API}/menu/toppings/${departmentId}`),
-        axios.get(`${API}/menu/drinks/${departmentId}`),
-        axios.get(`${API}/menu/sweets/${departmentId}`)
-      ]);
-      setBreakfastMenu(breakfast.data);
-      setToppingsMenu(toppings.data);
-      setDrinksMenu(drinks.data);
-      setSweetsMenu(sweets.data);
+      // Alle Menüs in einer Anfrage (ETag - unveränderte Menüs kommen aus dem Browser-Cache)
+      const menu = await axios.get(`${API}/departments/${departmentId}/menu`);
+      setBreakfastMenu(menu.data.breakfast);
+      setToppingsMenu(menu.data.toppings);
+      setDrinksMenu(menu.data.drinks);
+      setSweetsMenu(menu.data.sweets);
     } catch (error) {
       console.error('Fehler beim Laden der Menüs:', error);
       // Fallback to old endpoints if department-specific ones fail
@@ -3722,12 +3771,9 @@ const EmployeeOrdersModal = ({ employee, onClose, currentDepartment, onOrderUpda
         return;
       }
       const departmentId = currentDepartment.department_id;
-      const [drinks, sweets] = await Promise.all([
-        axios.get(`${API}/menu/drinks/${departmentId}`),
-        axios.get(`${API}/menu/sweets/${departmentId}`)
-      ]);
-      setDrinksMenu(drinks.data);
-      setSweetsMenu(sweets.data);
+      const menu = await axios.get(`${API}/departments/${departmentId}/menu`);
+      setDrinksMenu(menu.data.drinks);
+      setSweetsMenu(menu.data.sweets);
     } catch (error) {
       console.error('Fehler beim Laden der Menüs:', error);
       // Fallback to old endpoints if department-specific ones fail
@@ -5788,6 +5834,19 @@ const BreakfastSummaryTable = ({ departmentId, onClose }) => {
     fetchToppingsMenu();
   }, [departmentId]);
 
+  // Keep the overview current while it is open
+  useDepartmentEvents(
+    departmentId,
+    ['order_created', 'order_updated', 'order_cancelled', 'sponsoring_applied', 'menu_changed'],
+    (event) => {
+      if (event.type === 'menu_changed' || event.type === 'resync') {
+        fetchToppingsMenu();
+      }
+      // Silent refresh - no loading screen while the overview is being read
+      fetchDailySummary(false);
+    }
+  );
+
   const fetchToppingsMenu = async () => {
     try {
       if (!departmentId) {
@@ -5809,14 +5868,18 @@ const BreakfastSummaryTable = ({ departmentId, onClose }) => {
     }
   };
 
-  const fetchDailySummary = async () => {
+  const fetchDailySummary = async (showLoading = true) => {
     try {
-      setIsLoading(true);
+      if (showLoading) {
+        setIsLoading(true);
+      }
       const response = await axios.get(`${API}/orders/daily-summary/${departmentId}`);
       setDailySummary(response.data);
     } catch (error) {
       console.error('Fehler beim Laden der Tagesübersicht:', error);
-      alert('Fehler beim Laden der Übersicht');
+      if (showLoading) {
+        alert('Fehler beim Laden der Übersicht');
+      }
     } finally {
       setIsLoading(false);
     }
@@ -7686,8 +7749,18 @@ const OtherDepartmentsTab = ({ currentDepartment, setPaymentEmployeeData, setSho
     };
   }, [currentDepartment]);
 
-  // Add interval-based refresh every 10 seconds to ensure data stays current
+  // Refresh when balances change (pushed by the backend instead of polling)
+  useDepartmentEvents(
+    currentDepartment?.department_id,
+    ['balance_changed', 'payment_recorded'],
+    () => fetchOtherEmployeesWithBalances()
+  );
+
+  // Browsers without EventSource fall back to the 10 second interval refresh
   useEffect(() => {
+    if (typeof EventSource !== 'undefined') {
+      return undefined;
+    }
     const interval = setInterval(() => {
       if (currentDepartment?.department_id) {
         console.log('OtherDepartmentsTab: Interval refresh');